@@ -1,26 +1,75 @@
 import os
+import sys
 import json
+import asyncio
+import argparse
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import urlsplit
+from bs4 import BeautifulSoup, SoupStrainer
 from datetime import datetime
-from collections import Counter, defaultdict
+from bisect import bisect_left
+from collections import deque
 import re
 import time
+import gzip
+import struct
+import sqlite3
+import hashlib
+import shutil
+import tempfile
+import cProfile
+import pstats
+import tracemalloc
+import queue
+import threading
 import dotenv
+import numpy as np
 import pandas as pd
+from contextlib import closing, contextmanager, nullcontext
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
 import pytz
 
+# lxml is several times faster than the pure-Python parser; fall back when it isn't installed
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = 'lxml'
+except ImportError:
+    HTML_PARSER = 'html.parser'
+
+# pyarrow is only needed for the parquet archive
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
 dotenv.load_dotenv()
 
 HISTORY_FILE = 'data/history.json'
 LAST_RATES_FILE = 'data/last_rates.json'
 MARKET_RATES_HISTORY_FILE = 'data/market_rates_history.json'
+STRATEGY_STATE_FILE = 'data/scrape_strategy.json'
+HISTORY_LOG_FILE = 'data/history.ndjson'
+MARKET_RATES_LOG_FILE = 'data/market_rates_history.ndjson'
+SQLITE_DB_FILE = 'data/rates.db'
+BINARY_HISTORY_FILE = 'data/rates.bin'
+PARQUET_DIR = 'data/rates_parquet'
+ANALYTICS_STATE_FILE = 'data/analytics_state.json'
+JOURNAL_FILE = 'data/journal.json'
+BANK_IDENTITY_FILE = 'data/bank_identities.json'
+OBSERVATIONS_LOG_FILE = 'data/observations.ndjson'
+RUN_METRICS_FILE = 'data/run_metrics.jsonl'
+PROFILE_OUTPUT = 'profile/tracker'  # --profile writes tracker.prof and tracker.folded here
+BANK_IDENTITY_REVIEW_FILE = 'data/bank_identities_review.json'
+HTTP_CACHE_DIR = 'data/http_cache'
+HTTP_CACHE_INDEX_FILE = os.path.join(HTTP_CACHE_DIR, 'index.json')
 SLACK_WEBHOOK_URL = os.getenv('SLACK_WEBHOOK_URL')
 USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
 
@@ -39,22 +88,234 @@ MAIN_TRACKED_BANKS = ["Ally", "Sofi", "Capital One", "Marcus", "Barclays", "Appl
 # Define supplementary banks (scraped directly but not in main tracking)
 SUPPLEMENTARY_BANKS = ["Wealthfront", "Betterment"]
 
-# Define which banks require Selenium vs static HTML
-SELENIUM_BANKS = ["Ally", "Sofi", "Capital One", "Marcus", "Amex", "Betterment"]
-STATIC_BANKS = ["Wealthfront", "Barclays", "Apple"]
-
-LINKS = {
-    "Ally": "https://www.ally.com/bank/online-savings-account/?CP=ppc-google-bkws-dep-osa-high-yield-savings&source=Paid-Search-Web&d=c&ad=786445454317&gclsrc=aw.ds&gad_source=1&gad_campaignid=23323306552&gbraid=0AAAAAD06c9p7oxrieLdVq3tUSmWjOIoZg&gclid=Cj0KCQiAyP3KBhD9ARIsAAJLnnaSvS1j6x0x1rbfQTFSoPPvS3zfhj0YF0rbuuiwO57290ImCAP9HooaAnaMEALw_wcB",
-    "Sofi": "https://www.sofi.com/banking/savings-account/?campaign=MRKT_SEM_MCI_MON_BRAPLUS_ACQ_EXT_ALL_tCPA_E400_20241018_BANKING-SAVINGS_PSE_GOG_NONE_US_EN_SFrvp01jxcs2gykuhsx880_e_g_c_719673685616_sofi%20hysa&utm_source=MRKT_ADWORDS&utm_medium=SEM&utm_campaign=MRKT_SEM_MCI_MON_BRAPLUS_ACQ_EXT_ALL_tCPA_E400_20241018_BANKING-SAVINGS_PSE_GOG_NONE_US_EN_SFrvp01jxcs2gykuhsx880_e_g_c_719673685616_sofi%20hysa&cl_vend=google&cl_ch=sem&cl_camp=21828358234&cl_adg=173560417150&cl_crtv=719673685616&cl_kw=sofi%20hysa&cl_pub=google.com&cl_place=&cl_dvt=c&cl_pos=&cl_mt=e&cl_gtid=kwd-1657720290178&opti_ca=21828358234&opti_ag=173560417150&opti_ad=719673685616&opti_key=kwd-1657720290178&gclid=Cj0KCQiAyP3KBhD9ARIsAAJLnnYoSpzop_WcGE43gS_GSsMUPM91zRPqgyFawVo6vt9W5aFT8TDVSfMaAlFYEALw_wcB&adname=&gclsrc=aw.ds&gad_source=1&gad_campaignid=21828358234&gbraid=0AAAAADlA3c0QHObu0w6b0MT2I_R97mCnk#2",
-    "Capital One": "https://www.capitalone.com/bank/savings-accounts/online-performance-savings-account/?gclsrc=aw.ds&gad_source=1&gad_campaignid=23350992191&gbraid=0AAAAADtpBjeVFPsiqzh_12qEx3pSa0NyZ&gclid=Cj0KCQiAyP3KBhD9ARIsAAJLnnbB8dUxjgHb-nNKFQy817692dM9ciMoCIjYBEraM_DwyhUDxrDPfHkaAoszEALw_wcB",
-    "Marcus": "https://www.marcus.com/us/en/savings/high-yield-savings?prd=os&chl=ps&schl=psg&cid=1897658850&agp=134193963729&gclsrc=aw.ds&gad_source=1&gad_campaignid=1897658850&gbraid=0AAAAACy1HVIfp6lcgzWcb6Ox2E0T9khTS&gclid=Cj0KCQiAyP3KBhD9ARIsAAJLnnb9F4vc8a0P-6akWwAlDfC8q9eYYMah7Vis3ISr5ImpS1VYONIMwF0aAqLFEALw_wcB",
-    "Wealthfront": "https://www.wealthfront.com/cash",
-    "Barclays": "https://banking.us.barclays/tiered-savings.html?refid=BBDOUOUTO01",
-    "Apple": "https://learn.applecard.apple/savings?itscg=20201&itsct=crd-sem-161058037174-754940832708&mttnsubad=crd-sem-161058037174-754940832708&mttnsubkw=kwd-647220239413&mttnsubplmnt=c_adext:&mttnagencyid=c1a&mttncc=US&mttnpid=Google%20AdWords&cid=apy-318-100000070000-400000000000041",
-    "Amex": "https://www.americanexpress.com/en-us/banking/online-savings/high-yield-savings-account/?eep=81153&extlink=as=search_br=GGL=14869360742_136053249799_475163951998_686081261976&gclsrc=aw.ds&gad_source=1&gad_campaignid=14869360742&gbraid=0AAAAAClSvJV_UXcyplnb3qVQmlwvIYS1W&gclid=Cj0KCQiAyP3KBhD9ARIsAAJLnna93Hf-vIOl-LM_QC6XEM9kLf_qAK-IMrWjG80HBCCxcvlWVq59QiwaAmE0EALw_wcB",
-    "Betterment": "https://www.betterment.com/cash-reserve"
+# Selenium driver pool configuration
+# Number of headless Chrome instances kept warm for Selenium banks (defaults to CPU count)
+SELENIUM_POOL_SIZE = int(os.getenv('SELENIUM_POOL_SIZE', os.cpu_count() or 1))
+PAGE_LOAD_TIMEOUT = 30  # Seconds before a hung page load is abandoned and the driver recycled
+
+# Shared HTTP session configuration (used by every static fetch)
+HTTP_TIMEOUT = 15  # Seconds per request
+HTTP_RETRIES = 3  # Retries for connection errors and 429/5xx responses
+HTTP_BACKOFF = 0.5  # Exponential backoff factor between retries (0.5s, 1s, 2s)
+HTTP_POOL_SIZE = 20  # Keep-alive connections kept per host / number of hosts pooled
+# On-disk conditional-GET cache for static pages (least recently used bodies are evicted past this size, 0 disables)
+HTTP_CACHE_MAX_BYTES = int(os.getenv('HTTP_CACHE_MAX_BYTES', 20 * 1024 * 1024))
+
+# Single header profile sent with every static fetch
+HTTP_HEADERS = {
+    'User-Agent': USER_AGENT,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': requests.utils.DEFAULT_ACCEPT_ENCODING,  # gzip/deflate (+br/zstd when decoders are installed)
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Cache-Control': 'max-age=0'
+}
+
+def _extension_patterns(*extensions):
+    # CDNs version their assets ("app.css?v=123", "logo.png?w=200"), so match with and without a query string
+    return [pattern for extension in extensions for pattern in (f"*.{extension}", f"*.{extension}?*")]
+
+# Request blocking for headless Chrome (applied per page via the DevTools protocol)
+BLOCKED_URL_PATTERNS = {
+    "images": _extension_patterns("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico"),
+    "fonts": _extension_patterns("woff", "woff2", "ttf", "otf", "eot"),
+    "media": _extension_patterns("mp4", "webm", "mp3"),
+    "stylesheets": _extension_patterns("css"),
+    "analytics": [
+        "*googletagmanager.com*", "*google-analytics.com*", "*doubleclick.net*", "*googleadservices.com*",
+        "*googlesyndication.com*", "*facebook.net*", "*connect.facebook.com*", "*bat.bing.com*",
+        "*hotjar.com*", "*segment.com*", "*segment.io*", "*optimizely.com*", "*adobedtm.com*",
+        "*demdex.net*", "*omtrdc.net*", "*everesttech.net*", "*tiktok.com*", "*snapchat.com*",
+        "*px.ads.linkedin.com*", "*quantserve.com*", "*nr-data.net*", "*clarity.ms*", "*criteo.com*",
+        "*taboola.com*", "*outbrain.com*", "*quantummetric.com*", "*fullstory.com*", "*branch.io*"
+    ]
+}
+BLOCKING_PROFILES = {
+    "full": [],  # Load everything (fallback when a lighter profile hides the rate)
+    "light": ["images", "fonts", "media", "analytics"],
+    "lean": ["images", "fonts", "media", "stylesheets", "analytics"]
+}
+# Bank pages only need the text of one element, so they default to the leanest profile; Bankrate's
+# pagination checks button visibility, which needs stylesheets
+DEFAULT_BLOCKING_PROFILE = os.getenv('BLOCKING_PROFILE', 'lean')
+BANK_BLOCKING_PROFILES = {
+    "Bankrate": "light"
+}
+# A bank remembered as needing full page loads gets its lighter profile re-tried every N such runs
+BLOCKING_REPROBE_INTERVAL = 7
+
+# Bankrate "See more" pagination: poll the DOM instead of sleeping a fixed time per click
+BANKRATE_POLL_INTERVAL = 0.25  # Seconds between card-count checks
+BANKRATE_PAGE_TIMEOUT = 10  # Seconds to wait for a click to load more cards
+
+# Run mode: "threaded" scrapes banks first, then each aggregate site in turn;
+# "async" schedules every source as its own task so aggregate sites load alongside bank pages
+RUN_MODE = os.getenv('RUN_MODE', 'threaded')
+ASYNC_MAX_CONCURRENCY = int(os.getenv('ASYNC_MAX_CONCURRENCY', 8))  # Sources scraped at once in async mode
+SOURCE_TIMEOUTS = {"bank": 90, "Investopedia": 60, "Bankrate": 240}  # Seconds per source in async mode
+SOURCE_CANCEL_GRACE = 2  # Seconds a timed-out source's worker thread gets to stop before it is abandoned
+
+# Set by --offline: pages come from the HTTP cache only, with no network, Chrome or Slack
+OFFLINE_REPLAY = False
+
+# History storage: "ndjson" appends each run to append-only logs with an offset index
+# (migrated once from the JSON files); "sqlite" keeps one indexed (snapshot_ts, source, bank, apy)
+# table in SQLITE_DB_FILE; "parquet" appends to a month-partitioned columnar archive in PARQUET_DIR
+# (needs pyarrow); "json" rewrites the legacy JSON arrays every run
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'ndjson')
+# Trailing windows (days) computed by the analytics engine, and the half-life of its exponentially weighted trend
+ANALYSIS_WINDOWS = [7, 30, 90, 365]
+EWM_HALFLIFE_DAYS = 7
+
+# The NDJSON market log stores a full keyframe every N snapshots and only changed/removed banks in between
+MARKET_KEYFRAME_INTERVAL = 30
+
+# An aggregate card counts as a tracked bank only at this alias-match confidence or above
+# ("Apple Federal Credit Union" covers half of its distinctive tokens with "Apple" and stays a market bank)
+ALIAS_MIN_CONFIDENCE = 0.75
+
+# A new bank-name spelling joins an existing bank at this similarity; between the two thresholds
+# it is kept as its own bank and queued for review
+IDENTITY_MATCH_THRESHOLD = 0.85
+IDENTITY_REVIEW_THRESHOLD = 0.5
+
+# Reconciliation: quotes for a bank more than RECONCILE_TOLERANCE (APY %) apart disagree. Each source's
+# reliability starts at its prior (worth SOURCE_PRIOR_STRENGTH observations) and is updated from how
+# often it agreed with the other sources over the last RECONCILE_HISTORY_DAYS
+RECONCILE_TOLERANCE = 0.01
+RECONCILE_HISTORY_DAYS = 90
+SOURCE_RELIABILITY_PRIORS = {"direct": 0.95, "Investopedia": 0.75, "Bankrate": 0.75}
+SOURCE_PRIOR_STRENGTH = 20
+
+# Banks whose rate last needed Selenium still get a static probe every N runs,
+# in case the site starts serving the rate in its HTML again
+STATIC_REPROBE_INTERVAL = 7
+
+# Plausible APY range (%) - anything outside it is treated as a parse error
+DEFAULT_VALID_RANGE = (0.1, 10)
+
+# JSON keys that hold an APY in embedded page data and rate APIs (deliberately not annualPercentageRate
+# or interestRate, which bank pages also use for loan and card products)
+APY_JSON_KEYS = ["annualPercentageYield", "apy", "apyValue", "apyRate", "savingsApy", "currentApy"]
+
+# JSON keys that name the institution a rate belongs to (aggregate-site rate cards)
+BANK_NAME_JSON_KEYS = ["advertiserName", "institutionName", "bankName", "providerName", "displayName", "name"]
+# Bankrate's embedded data is only trusted over a full render when it lists at least this many banks
+BANKRATE_DIRECT_MIN_CARDS = 10
+
+# Every directly scraped bank, declared as data and executed by one generic engine
+# (see scrape_bank_adaptive). Each entry has:
+#   url                 page holding the savings rate
+#   strategies          allowed strategies, in the order tried: "static" (HTML), "direct" (JSON data), "selenium";
+#                       embedded JSON can hold other products' rates, so it only backs up the page's own selectors
+#   selectors           where the rate is, tried in order by the static and Selenium strategies:
+#                         css              CSS selector (shared by BeautifulSoup and Selenium)
+#                         contains         text (or list of texts) the element must contain
+#                         sibling_contains text a following sibling must contain (e.g. "APY")
+#                         text_from        "next_sibling" to read the rate from the next element instead
+#                         separator        joins text of child elements (default: none)
+#                         rate_index       which number in the text is the rate (default 0), optionally
+#                                          per strategy; falls back to the first number if out of range
+#   fallback_selectors  broader selectors tried by Selenium when the primary ones time out
+#   direct              JSON keys holding the APY, "pick" ("first" or "max") and an optional "endpoint"
+#   valid_range         plausible APY range for this bank
+#   parse_only          tags whose subtrees hold the rate; static parsing skips the rest of the page
+#                       (None parses the whole document, e.g. when sibling structure matters)
+BANK_REGISTRY = {
+    "Ally": {
+        "url": "https://www.ally.com/bank/online-savings-account/?CP=ppc-google-bkws-dep-osa-high-yield-savings&source=Paid-Search-Web&d=c&ad=786445454317&gclsrc=aw.ds&gad_source=1&gad_campaignid=23323306552&gbraid=0AAAAAD06c9p7oxrieLdVq3tUSmWjOIoZg&gclid=Cj0KCQiAyP3KBhD9ARIsAAJLnnaSvS1j6x0x1rbfQTFSoPPvS3zfhj0YF0rbuuiwO57290ImCAP9HooaAnaMEALw_wcB",
+        "strategies": ["static", "direct", "selenium"],
+        "selectors": [{"css": "span.allysf-rates-v1-value"}],
+        "fallback_selectors": [{"css": "h2", "contains": "%"}],
+        "direct": {"keys": APY_JSON_KEYS, "pick": "first"},
+        "valid_range": DEFAULT_VALID_RANGE,
+        "parse_only": ["span"]
+    },
+    "Sofi": {
+        "url": "https://www.sofi.com/banking/savings-account/?campaign=MRKT_SEM_MCI_MON_BRAPLUS_ACQ_EXT_ALL_tCPA_E400_20241018_BANKING-SAVINGS_PSE_GOG_NONE_US_EN_SFrvp01jxcs2gykuhsx880_e_g_c_719673685616_sofi%20hysa&utm_source=MRKT_ADWORDS&utm_medium=SEM&utm_campaign=MRKT_SEM_MCI_MON_BRAPLUS_ACQ_EXT_ALL_tCPA_E400_20241018_BANKING-SAVINGS_PSE_GOG_NONE_US_EN_SFrvp01jxcs2gykuhsx880_e_g_c_719673685616_sofi%20hysa&cl_vend=google&cl_ch=sem&cl_camp=21828358234&cl_adg=173560417150&cl_crtv=719673685616&cl_kw=sofi%20hysa&cl_pub=google.com&cl_place=&cl_dvt=c&cl_pos=&cl_mt=e&cl_gtid=kwd-1657720290178&opti_ca=21828358234&opti_ag=173560417150&opti_ad=719673685616&opti_key=kwd-1657720290178&gclid=Cj0KCQiAyP3KBhD9ARIsAAJLnnYoSpzop_WcGE43gS_GSsMUPM91zRPqgyFawVo6vt9W5aFT8TDVSfMaAlFYEALw_wcB&adname=&gclsrc=aw.ds&gad_source=1&gad_campaignid=21828358234&gbraid=0AAAAADlA3c0QHObu0w6b0MT2I_R97mCnk#2",
+        "strategies": ["static", "direct", "selenium"],
+        # The current Savings APY is the second number in the static text, the third once rendered
+        "selectors": [{"css": "p > strong", "contains": "SoFi Plus members can earn up to",
+                       "rate_index": {"static": 1, "selenium": 2}}],
+        "fallback_selectors": [{"css": "h2", "contains": "%"}],
+        "direct": {"keys": APY_JSON_KEYS, "pick": "max"},
+        "valid_range": DEFAULT_VALID_RANGE,
+        "parse_only": ["p"]
+    },
+    "Capital One": {
+        "url": "https://www.capitalone.com/bank/savings-accounts/online-performance-savings-account/?gclsrc=aw.ds&gad_source=1&gad_campaignid=23350992191&gbraid=0AAAAADtpBjeVFPsiqzh_12qEx3pSa0NyZ&gclid=Cj0KCQiAyP3KBhD9ARIsAAJLnnbB8dUxjgHb-nNKFQy817692dM9ciMoCIjYBEraM_DwyhUDxrDPfHkaAoszEALw_wcB",
+        "strategies": ["static", "direct", "selenium"],
+        "selectors": [{"css": 'rates-inline[rate-type="APY"]'}],
+        "fallback_selectors": [],
+        "direct": {"keys": APY_JSON_KEYS, "pick": "first"},
+        "valid_range": DEFAULT_VALID_RANGE,
+        "parse_only": ["rates-inline"]
+    },
+    "Marcus": {
+        "url": "https://www.marcus.com/us/en/savings/high-yield-savings?prd=os&chl=ps&schl=psg&cid=1897658850&agp=134193963729&gclsrc=aw.ds&gad_source=1&gad_campaignid=1897658850&gbraid=0AAAAACy1HVIfp6lcgzWcb6Ox2E0T9khTS&gclid=Cj0KCQiAyP3KBhD9ARIsAAJLnnb9F4vc8a0P-6akWwAlDfC8q9eYYMah7Vis3ISr5ImpS1VYONIMwF0aAqLFEALw_wcB",
+        "strategies": ["static", "direct", "selenium"],
+        # The headline rate is a large span followed by an "APY" sibling span
+        "selectors": [{"css": 'span[style*="font-size: 46.0px"]', "sibling_contains": "APY"}],
+        "fallback_selectors": [],
+        "direct": {"keys": APY_JSON_KEYS, "pick": "first"},
+        "valid_range": DEFAULT_VALID_RANGE,
+        "parse_only": None
+    },
+    "Wealthfront": {
+        "url": "https://www.wealthfront.com/cash",
+        "strategies": ["static", "direct", "selenium"],
+        "selectors": [{"css": 'p[data-testid="dynamic-yields-table"]'}],
+        "fallback_selectors": [{"css": "p", "contains": ["%", "APY"]}],
+        "direct": {"keys": APY_JSON_KEYS, "pick": "max"},
+        "valid_range": DEFAULT_VALID_RANGE,
+        "parse_only": ["p"]
+    },
+    "Barclays": {
+        "url": "https://banking.us.barclays/tiered-savings.html?refid=BBDOUOUTO01",
+        "strategies": ["static", "direct", "selenium"],
+        "selectors": [{"css": "td", "contains": "Less than $10,000", "text_from": "next_sibling"}],
+        "fallback_selectors": [{"css": "td", "contains": "%"}],
+        "direct": {"keys": APY_JSON_KEYS, "pick": "first"},
+        "valid_range": DEFAULT_VALID_RANGE,
+        "parse_only": ["tr"]
+    },
+    "Apple": {
+        "url": "https://learn.applecard.apple/savings?itscg=20201&itsct=crd-sem-161058037174-754940832708&mttnsubad=crd-sem-161058037174-754940832708&mttnsubkw=kwd-647220239413&mttnsubplmnt=c_adext:&mttnagencyid=c1a&mttncc=US&mttnpid=Google%20AdWords&cid=apy-318-100000070000-400000000000041",
+        "strategies": ["static", "direct", "selenium"],
+        "selectors": [{"css": "p.typography-intro", "separator": " "}],
+        "fallback_selectors": [{"css": "p", "contains": "%"}],
+        "direct": {"keys": APY_JSON_KEYS, "pick": "first"},
+        "valid_range": DEFAULT_VALID_RANGE,
+        "parse_only": ["p"]
+    },
+    "Amex": {
+        "url": "https://www.americanexpress.com/en-us/banking/online-savings/high-yield-savings-account/?eep=81153&extlink=as=search_br=GGL=14869360742_136053249799_475163951998_686081261976&gclsrc=aw.ds&gad_source=1&gad_campaignid=14869360742&gbraid=0AAAAAClSvJV_UXcyplnb3qVQmlwvIYS1W&gclid=Cj0KCQiAyP3KBhD9ARIsAAJLnna93Hf-vIOl-LM_QC6XEM9kLf_qAK-IMrWjG80HBCCxcvlWVq59QiwaAmE0EALw_wcB",
+        "strategies": ["static", "direct", "selenium"],
+        "selectors": [{"css": "h2.axp-us-consumer-banking__index__rate___botMw"}],
+        "fallback_selectors": [{"css": "h2", "contains": "%"}],
+        "direct": {"keys": APY_JSON_KEYS, "pick": "first"},
+        "valid_range": DEFAULT_VALID_RANGE,
+        "parse_only": ["h2"]
+    },
+    "Betterment": {
+        "url": "https://www.betterment.com/cash-reserve",
+        "strategies": ["static", "direct", "selenium"],
+        "selectors": [{"css": "h1.item-title"}],
+        "fallback_selectors": [{"css": "h1", "contains": ["%", "APY"]}],
+        "direct": {"keys": APY_JSON_KEYS, "pick": "max"},
+        "valid_range": DEFAULT_VALID_RANGE,
+        "parse_only": ["h1"]
+    }
 }
 
+LINKS = {bank_name: spec["url"] for bank_name, spec in BANK_REGISTRY.items()}
+SELENIUM_CAPABLE_BANKS = [bank_name for bank_name, spec in BANK_REGISTRY.items() if "selenium" in spec["strategies"]]
+
 # Aggregate rate comparison sites
 AGGREGATE_SOURCES = [
     "https://www.investopedia.com/high-yield-savings-accounts-4770633",
@@ -72,17 +333,59 @@ BANK_ALIASES = {
     "My Banking Direct": ["My Banking Direct", "MyBankingDirect"],
     "Everbank": ["Everbank", "EverBank", "EverBank Performance"],
     "Vio": ["Vio", "Vio Bank", "VioBank"],
-    "Jenius": ["Jenius", "Jenius Bank"]
+    "Jenius": ["Jenius", "Jenius Bank"],
+    "Bank5 Connect": ["Bank5 Connect", "BankFive"]
 }
 
+class SourceTimeout(BaseException):
+    """
+    The source a worker thread is scraping ran past its deadline or was given up on. A BaseException
+    (like asyncio.CancelledError) so the scrapers' `except Exception` fallbacks don't swallow it.
+    """
+
+# Deadline and cancel event of the source the current worker thread is scraping (async mode only)
+_source_deadline = threading.local()
+
+def run_with_deadline(timeout, cancel, func, *args):
+    """Run func(*args) in this thread with network and browser waits capped to `timeout` seconds from now."""
+    _source_deadline.at = time.monotonic() + timeout
+    _source_deadline.cancel = cancel
+    try:
+        return func(*args)
+    finally:
+        _source_deadline.at = _source_deadline.cancel = None
+
+def source_time_left(default=None):
+    """
+    `default` seconds capped to what is left of the current thread's source deadline (the remaining
+    time itself when `default` is None). Raises SourceTimeout once the deadline has passed or the
+    source was cancelled; outside a deadline just returns `default`.
+    """
+    deadline = getattr(_source_deadline, 'at', None)
+    if deadline is None:
+        return default
+    left = deadline - time.monotonic()
+    if left <= 0 or _source_deadline.cancel.is_set():
+        raise SourceTimeout("source deadline passed")
+    return left if default is None else min(default, left)
+
+def cap_driver_timeouts(driver):
+    """Cap the driver's page-load and script timeouts to the current source's deadline."""
+    timeout = source_time_left(PAGE_LOAD_TIMEOUT)
+    driver.set_page_load_timeout(timeout)
+    driver.set_script_timeout(timeout)
+
 def create_chrome_driver():
     """Create a Chrome WebDriver with proper configuration for all environments."""
+    source_time_left()
     chrome_options = Options()
     chrome_options.add_argument('--headless')
     chrome_options.add_argument('--disable-gpu')
     chrome_options.add_argument('--no-sandbox')
     chrome_options.add_argument('--disable-dev-shm-usage')
     chrome_options.add_argument(f'user-agent={USER_AGENT}')
+    # Hand control back once the DOM is parsed; every scraper waits for its own element anyway
+    chrome_options.page_load_strategy = 'eager'
     
     # Set Chrome binary location for GitHub Actions/Linux environments
     chrome_binary_path = os.getenv('CHROME_BINARY_PATH', '/usr/bin/google-chrome')
@@ -93,6 +396,145 @@ def create_chrome_driver():
     
     return webdriver.Chrome(options=chrome_options)
 
+def blocking_profile_for(name, state=None):
+    """
+    Request-blocking profile for a bank or aggregate site. A remembered fallback to full loading
+    is honoured, except every BLOCKING_REPROBE_INTERVAL full-load runs, when the lighter profile gets another try.
+    """
+    record = state.get(name, {}) if state else {}
+    if record.get('blocking') == 'full' and record.get('full_load_runs', 0) % BLOCKING_REPROBE_INTERVAL != 0:
+        return 'full'
+    return BANK_BLOCKING_PROFILES.get(name, DEFAULT_BLOCKING_PROFILE)
+
+def apply_blocking_profile(driver, profile):
+    """Block images, fonts, stylesheets and/or analytics requests for the driver's next page loads."""
+    patterns = [pattern for group in BLOCKING_PROFILES[profile] for pattern in BLOCKED_URL_PATTERNS[group]]
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+    except Exception as e:
+        print(f"  ⚠️ Could not apply '{profile}' request blocking: {str(e)}")
+
+class ChromeDriverPool:
+    """Bounded pool of warm headless Chrome drivers shared between worker threads.
+
+    At most `size` drivers exist at once. Drivers are reset before being handed
+    out again, and any driver that errors, hangs or fails its reset is quit and
+    replaced by a fresh one on the next checkout.
+    """
+
+    def __init__(self, size=SELENIUM_POOL_SIZE):
+        self.size = max(1, size)
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._live = set()
+        self._closed = False
+
+    def _launch(self):
+        driver = create_chrome_driver()
+        driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                self._live.add(driver)
+        if closed:
+            # A worker outlived the run: don't leave its Chrome behind
+            driver.quit()
+            raise RuntimeError("Chrome driver pool is closed")
+        return driver
+
+    def _discard(self, driver):
+        with self._lock:
+            self._live.discard(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _reset(self, driver):
+        """Clear per-site state; returns False if the driver is dead or hung."""
+        try:
+            driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+            driver.delete_all_cookies()
+            driver.get('about:blank')
+            return True
+        except Exception as e:
+            print(f"  ♻️ Recycling unhealthy Chrome driver: {str(e).splitlines()[0] if str(e) else type(e).__name__}")
+            return False
+
+    def prewarm(self, count=None):
+        """Launch drivers up front (in parallel) so the first checkouts don't pay Chrome startup."""
+        count = self.size if count is None else min(count, self.size)
+        
+        def launch_idle():
+            # Hold a slot while launching so warm-up never pushes the pool past its size
+            if not self._slots.acquire(blocking=False):
+                return
+            try:
+                self._idle.put(self._launch())
+            except Exception as e:
+                print(f"  ✗ Failed to launch Chrome driver: {str(e)}")
+            finally:
+                self._slots.release()
+        
+        missing = count - self._idle.qsize()
+        if missing <= 0:
+            return
+        with ThreadPoolExecutor(max_workers=missing) as executor:
+            for _ in range(missing):
+                executor.submit(launch_idle)
+
+    def acquire(self):
+        if self._closed:
+            raise RuntimeError("Chrome driver pool is closed")
+        if not self._slots.acquire(timeout=source_time_left()):
+            raise SourceTimeout("no Chrome driver free before the source deadline")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self._launch()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, driver, healthy=True):
+        try:
+            if healthy and not self._closed and self._reset(driver):
+                self._idle.put(driver)
+            else:
+                self._discard(driver)
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def driver(self):
+        """Check out a driver for the duration of a `with` block."""
+        driver = self.acquire()
+        healthy = True
+        try:
+            cap_driver_timeouts(driver)
+            yield driver
+        except BaseException:
+            healthy = False
+            raise
+        finally:
+            self.release(driver, healthy)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                break
+        with self._lock:
+            remaining = list(self._live)
+        for driver in remaining:
+            self._discard(driver)
+
 def extract_rate(text):
     """Extract APY percentage from text."""
     # Look for patterns like "4.35%", "4.35% APY", etc.
@@ -103,1173 +545,2540 @@ def extract_rate(text):
         return float(matches[0])
     return None
 
-def scrape_ally_page(bank_name, url, driver=None):
-    """Ally requires Selenium - can accept reused driver for efficiency"""
+_http_session = None
+_http_session_lock = threading.Lock()
+_http_seen_hosts = set()
+http_timings = []  # One record per HTTP request made this run
+run_spans = []  # One record per instrumented stage this run
+
+@contextmanager
+def span(stage, name, **fields):
+    """
+    Time one stage of the run ("fetch", "render", "parse", "match", "persist" or "notify") for
+    `name`, a bank, source or data file. Yields the record so the body can add bytes, retries,
+    strategy and the like; an exception is noted in the record and re-raised.
+    """
+    record = {"stage": stage, "name": name, **fields}
+    start = time.perf_counter()
     try:
-        print(f"Attempting to scrape {bank_name}...")
-        
-        # If driver provided, skip static HTML and use it directly
-        if driver is not None:
-            try:
-                driver.get(url)
-                wait = WebDriverWait(driver, 10)
-                # Find all elements with the target class
-                rate_elems = wait.until(
-                    lambda d: d.find_elements(By.CSS_SELECTOR, 'span.allysf-rates-v1-value')
-                )
-                for idx, rate_elem in enumerate(rate_elems):
-                    rate_text = rate_elem.text.strip()
-                    rate = extract_rate(rate_text)
-                    if rate and 0.1 <= rate <= 10:
-                        print(f"✓ Selenium scrape successful (element {idx+1}): {rate}%")
-                        return rate
-                print(f"✗ Could not extract valid rate from any matching element.")
-            except Exception as e:
-                print(f"✗ Selenium error: {str(e)}")
-            return None
-        
-        # Original code path if no driver provided (fallback)
-        # Try static HTML first
-        headers = {
-            'User-Agent': USER_AGENT,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Cache-Control': 'max-age=0'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=15, allow_redirects=True)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Try to find all rate elements with the specific class
-        rate_elems = soup.find_all('span', class_='allysf-rates-v1-value')
-        for idx, rate_elem in enumerate(rate_elems):
-            rate_text = rate_elem.get_text(strip=True)
-            rate = extract_rate(rate_text)
-            if rate and 0.1 <= rate <= 10:
-                print(f"✓ Static scrape successful (element {idx+1}): {rate}%")
-                return rate
-        
-        # If static scraping failed, use Selenium
-        print("Static HTML didn't work, trying Selenium with JavaScript rendering...")
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument(f'user-agent={USER_AGENT}')
-        driver = create_chrome_driver()
-        try:
-            driver.get(url)
-            wait = WebDriverWait(driver, 10)
-            # Find all elements with the target class
-            rate_elems = wait.until(
-                lambda d: d.find_elements(By.CSS_SELECTOR, 'span.allysf-rates-v1-value')
+        yield record
+    except (Exception, SourceTimeout) as e:
+        record["error"] = type(e).__name__
+        raise
+    finally:
+        record["ms"] = round((time.perf_counter() - start) * 1000, 1)
+        run_spans.append(record)
+
+def get_http_session():
+    """
+    Shared requests.Session with per-host keep-alive pools, retries with backoff and
+    the common header profile. urllib3's connection pools are thread-safe, so worker
+    threads share one session and reuse each other's TCP+TLS connections.
+    """
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            retry = Retry(
+                total=HTTP_RETRIES,
+                backoff_factor=HTTP_BACKOFF,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(['GET', 'HEAD']),
+                raise_on_status=False
             )
-            found_valid = False
-            for idx, rate_elem in enumerate(rate_elems):
-                rate_text = rate_elem.text.strip()
-                print(f"Found element {idx+1} with Selenium. Text: '{rate_text}'")
-                rate = extract_rate(rate_text)
-                if rate and 0.1 <= rate <= 10:
-                    print(f"✓ Selenium scrape successful (element {idx+1}): {rate}%")
-                    found_valid = True
-                    driver.quit()
-                    return rate
-            if not found_valid:
-                print(f"✗ Could not extract valid rate from any matching element.")
-        except Exception as e:
-            print(f"✗ Selenium error: {str(e)}")
-            # Try alternative selectors
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            session.headers.update(HTTP_HEADERS)
+            _http_session = session
+        return _http_session
+
+def http_get(url, headers=None, timeout=HTTP_TIMEOUT):
+    """
+    GET a URL through the shared session and record its timing.
+    
+    `wait` is the time to response headers: for the first request to a host it includes
+    DNS + TCP + TLS handshake, afterwards the pooled connection is reused. `transfer` is
+    the time spent downloading (and decompressing) the body.
+    """
+    if OFFLINE_REPLAY:
+        raise RuntimeError(f"Offline replay: not fetching {url}")
+    host = urlsplit(url).netloc
+    with _http_session_lock:
+        first_to_host = host not in _http_seen_hosts
+        _http_seen_hosts.add(host)
+    
+    start = time.perf_counter()
+    response = get_http_session().get(url, headers=headers, timeout=source_time_left(timeout), allow_redirects=True, stream=True)
+    wait = time.perf_counter() - start
+    body = response.content
+    transfer = time.perf_counter() - start - wait
+    
+    retries = response.raw.retries.history if response.raw is not None and response.raw.retries else ()
+    timing = {
+        "host": host,
+        "status": response.status_code,
+        "new_connection": first_to_host,
+        "wait_ms": round(wait * 1000, 1),
+        "transfer_ms": round(transfer * 1000, 1),
+        "bytes": len(body),
+        "retries": len(retries)
+    }
+    http_timings.append(timing)
+    response.timing = timing
+    print(f"    ⏱ {host}: {timing['wait_ms']:.0f}ms to headers{' (new connection)' if first_to_host else ''}, "
+          f"{timing['transfer_ms']:.0f}ms transfer, {len(body) / 1024:.1f} KB"
+          f"{f', {len(retries)} retries' if retries else ''}")
+    
+    response.raise_for_status()
+    return response
+
+def print_http_timing_summary():
+    """Print handshake-vs-transfer cost for the HTTP requests made this run."""
+    if not http_timings:
+        return
+    new_conn = [t for t in http_timings if t['new_connection']]
+    reused = [t for t in http_timings if not t['new_connection']]
+    print(f"\nHTTP: {len(http_timings)} request(s), {sum(t['bytes'] for t in http_timings) / 1024:.0f} KB, "
+          f"{sum(t['retries'] for t in http_timings)} retries")
+    if new_conn:
+        print(f"  New connections:    avg {sum(t['wait_ms'] for t in new_conn) / len(new_conn):.0f}ms to headers "
+              f"(incl. handshake), avg {sum(t['transfer_ms'] for t in new_conn) / len(new_conn):.0f}ms transfer")
+    if reused:
+        print(f"  Reused connections: avg {sum(t['wait_ms'] for t in reused) / len(reused):.0f}ms to headers, "
+              f"avg {sum(t['transfer_ms'] for t in reused) / len(reused):.0f}ms transfer")
+
+def print_run_metrics(spans, total_ms, top=15):
+    """Table of the slowest (stage, name) pairs this run, plus time per stage."""
+    if not spans:
+        return
+    rows = {}
+    for record in spans:
+        row = rows.setdefault((record['stage'], record['name']), {"ms": 0.0, "bytes": 0, "retries": 0, "strategies": []})
+        row["ms"] += record['ms']
+        row["bytes"] += record.get('bytes', 0)
+        row["retries"] += record.get('retries', 0)
+        if record.get('strategy') and record['strategy'] not in row["strategies"]:
+            row["strategies"].append(record['strategy'])
+    print(f"\nRun metrics: {total_ms / 1000:.1f}s wall clock, {len(spans)} spans (slowest {min(top, len(rows))} shown)")
+    print(f"  {'Stage':<8} {'Name':<20} {'Time':>8} {'KB':>8} {'Retries':>7}  Strategy")
+    for (stage, name), row in sorted(rows.items(), key=lambda item: item[1]["ms"], reverse=True)[:top]:
+        print(f"  {stage:<8} {name[:20]:<20} {row['ms'] / 1000:>7.2f}s {row['bytes'] / 1024:>8.1f} {row['retries']:>7}  "
+              f"{'/'.join(row['strategies'])}")
+    stage_totals = {}
+    for record in spans:
+        stage_totals[record['stage']] = stage_totals.get(record['stage'], 0.0) + record['ms']
+    # Spans on worker threads overlap, so stage totals can add up to more than the wall clock
+    print("  Per stage: " + ", ".join(f"{stage} {ms / 1000:.1f}s" for stage, ms in
+                                      sorted(stage_totals.items(), key=lambda item: item[1], reverse=True)))
+
+def save_run_metrics(started):
+    """Append this run's spans to RUN_METRICS_FILE as one JSON line and print the summary table."""
+    total_ms = round((time.time() - started) * 1000, 1)
+    if os.path.isdir(os.path.dirname(RUN_METRICS_FILE)):
+        append_log_record(RUN_METRICS_FILE, {"ts": int(started), "mode": RUN_MODE, "total_ms": total_ms, "spans": run_spans})
+    print_run_metrics(run_spans, total_ms)
+
+def print_run_metrics_history(days=90, top=15):
+    """Mean and worst time per (stage, name) over the runs recorded in the last N days."""
+    runs = read_log_records(RUN_METRICS_FILE, since=int(time.time()) - days * 86400)
+    spans = pd.DataFrame([{"run": position, **record} for position, run in enumerate(runs) for record in run["spans"]],
+                         columns=['run', 'stage', 'name', 'ms'])
+    if spans.empty:
+        print(f"No run metrics in {RUN_METRICS_FILE} for the last {days} days")
+        return
+    per_run = spans.groupby(['stage', 'name', 'run'])['ms'].sum()
+    summary = per_run.groupby(level=['stage', 'name']).agg(['mean', 'max', 'count']).sort_values('mean', ascending=False)
+    print(f"Stage timings over {len(runs)} run(s) in the last {days} days "
+          f"(mean wall clock {np.mean([run['total_ms'] for run in runs]) / 1000:.1f}s):")
+    print(f"  {'Stage':<8} {'Name':<20} {'Mean':>8} {'Worst':>8} {'Runs':>5}")
+    for (stage, name), row in summary.head(top).iterrows():
+        print(f"  {stage:<8} {name[:20]:<20} {row['mean'] / 1000:>7.2f}s {row['max'] / 1000:>7.2f}s {int(row['count']):>5}")
+
+_http_cache_index = None
+_http_cache_lock = threading.Lock()
+
+class CachedPage:
+    """Body of a static fetch, and whether the server answered 304 Not Modified."""
+    def __init__(self, url, body, not_modified=False, retries=0):
+        self.url = url
+        self.body = body
+        self.not_modified = not_modified
+        self.retries = retries
+
+    def metrics(self):
+        """Span fields for the fetch that produced this page."""
+        return {"bytes": len(self.body), "retries": self.retries, "cached": self.not_modified}
+
+def _http_cache_path(entry):
+    return os.path.join(HTTP_CACHE_DIR, entry['file'])
+
+def load_http_cache_index():
+    global _http_cache_index
+    with _http_cache_lock:
+        if _http_cache_index is None:
+            _http_cache_index = {}
+            if os.path.exists(HTTP_CACHE_INDEX_FILE):
+                try:
+                    with open(HTTP_CACHE_INDEX_FILE, 'r') as f:
+                        _http_cache_index = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    print("⚠️ HTTP cache index unreadable, starting with an empty cache")
+        return _http_cache_index
+
+def save_http_cache_index():
+    """Evict least recently used bodies until the cache fits HTTP_CACHE_MAX_BYTES, then persist the index."""
+    index = load_http_cache_index()
+    with _http_cache_lock:
+        total = sum(entry['size'] for entry in index.values())
+        for url, entry in sorted(index.items(), key=lambda item: item[1]['last_used']):
+            if total <= HTTP_CACHE_MAX_BYTES:
+                break
             try:
-                print("Trying alternative selector strategies...")
-                h2_elements = driver.find_elements(By.TAG_NAME, 'h2')
-                for elem in h2_elements:
-                    text = elem.text.strip()
-                    if '%' in text:
-                        rate = extract_rate(text)
-                        if rate and 0.1 <= rate <= 10:
-                            print(f"✓ Found rate via alternative method: {rate}%")
-                            driver.quit()
-                            return rate
-            except:
+                os.remove(_http_cache_path(entry))
+            except FileNotFoundError:
                 pass
-        finally:
-            driver.quit()
+            total -= entry['size']
+            del index[url]
+        
+        os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+        tmp_path = HTTP_CACHE_INDEX_FILE + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f, indent=4)
+        os.replace(tmp_path, HTTP_CACHE_INDEX_FILE)
+
+def fetch_page(url, headers=None):
+    """
+    Static fetch through the on-disk HTTP cache.
+    
+    Sends If-None-Match / If-Modified-Since when a body for the URL is cached; on
+    304 Not Modified the gzip-compressed body is served from data/http_cache instead.
+    """
+    if OFFLINE_REPLAY:
+        index = load_http_cache_index()
+        with _http_cache_lock:
+            entry = index.get(url)
+        if entry is None or not os.path.exists(_http_cache_path(entry)):
+            raise RuntimeError(f"Offline replay: no cached copy of {url}")
+        with gzip.open(_http_cache_path(entry), 'rb') as f:
+            # Served as a fresh page so the replay parses it instead of reusing the stored result
+            return CachedPage(url, f.read())
+    
+    if HTTP_CACHE_MAX_BYTES <= 0:
+        response = http_get(url, headers=headers)
+        return CachedPage(url, response.content, retries=response.timing['retries'])
+    
+    index = load_http_cache_index()
+    with _http_cache_lock:
+        entry = index.get(url)
+    if entry is not None and not os.path.exists(_http_cache_path(entry)):
+        entry = None
+    
+    request_headers = dict(headers or {})
+    if entry is not None:
+        if entry.get('etag'):
+            request_headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            request_headers['If-Modified-Since'] = entry['last_modified']
+    
+    response = http_get(url, headers=request_headers)
+    
+    if response.status_code == 304 and entry is not None:
+        with gzip.open(_http_cache_path(entry), 'rb') as f:
+            body = f.read()
+        with _http_cache_lock:
+            entry['last_used'] = time.time()
+        print(f"    ↺ Not modified, using cached copy ({len(body) / 1024:.1f} KB)")
+        return CachedPage(url, body, not_modified=True, retries=response.timing['retries'])
+    
+    body = response.content
+    compressed = gzip.compress(body)
+    entry = {
+        'file': hashlib.sha256(url.encode('utf-8')).hexdigest()[:32] + '.html.gz',
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'size': len(compressed),
+        'fetched': time.time(),
+        'last_used': time.time(),
+        'parsed': {}  # Results parsed from this exact body, reused on 304
+    }
+    os.makedirs(HTTP_CACHE_DIR, exist_ok=True)
+    with open(_http_cache_path(entry), 'wb') as f:
+        f.write(compressed)
+    with _http_cache_lock:
+        index[url] = entry
+    return CachedPage(url, body, retries=response.timing['retries'])
+
+def get_cached_parse(page, key):
+    """Previous run's parsed result for this page, only if the server said the page is unchanged."""
+    if not page.not_modified:
         return None
-        
-    except Exception as e:
-        print(f"✗ Error scraping {bank_name}: {str(e)}")
+    with _http_cache_lock:
+        entry = (_http_cache_index or {}).get(page.url)
+        return entry['parsed'].get(key) if entry else None
+
+def remember_parse(page, key, value):
+    """Store a parsed result alongside the cached body so a later 304 can skip parsing."""
+    with _http_cache_lock:
+        entry = (_http_cache_index or {}).get(page.url)
+        if entry is not None:
+            entry['parsed'][key] = value
+
+def make_soup(markup, parse_only=None):
+    """
+    Parse HTML with the fastest available parser. `parse_only` (a SoupStrainer, tag name or
+    list of tag names) keeps only the matching subtrees, so the rest of the page is never built.
+    """
+    if parse_only is not None and not isinstance(parse_only, SoupStrainer):
+        parse_only = SoupStrainer(parse_only)
+    return BeautifulSoup(markup, HTML_PARSER, parse_only=parse_only)
+
+def _text_matches(text, spec):
+    required = spec.get('contains', [])
+    if isinstance(required, str):
+        required = [required]
+    return all(fragment in text for fragment in required)
+
+def rate_from_text(text, spec, strategy, valid_range=DEFAULT_VALID_RANGE):
+    """Pick the rate out of an element's text according to a selector spec, or None if implausible."""
+    numbers = re.findall(r'(\d+\.\d+)', text)
+    if not numbers:
         return None
+    index = spec.get('rate_index', 0)
+    if isinstance(index, dict):
+        index = index.get(strategy, 0)
+    rate = float(numbers[index] if -len(numbers) <= index < len(numbers) else numbers[0])
+    low, high = valid_range
+    return rate if low <= rate <= high else None
 
-def scrape_sofi_page(bank_name, url, driver=None):
-    """Sofi requires Selenium - can accept reused driver for efficiency"""
-    try:
-        print(f"Attempting to scrape {bank_name}...")
-        
-        # If driver provided, skip static HTML and use it directly
-        if driver is not None:
-            try:
-                driver.get(url)
-                wait = WebDriverWait(driver, 10)
-                wait.until(EC.presence_of_element_located((By.XPATH, "//p/strong[contains(text(), 'SoFi Plus members can earn up to')]")
-))
-                strong_elems = driver.find_elements(By.XPATH, "//p/strong")
-                for strong in strong_elems:
-                    text = strong.text
-                    if "SoFi Plus members can earn up to" in text:
-                        rates = re.findall(r'(\d+\.\d+)', text)
-                        if rates:
-                            rate = float(rates[2]) if len(rates) > 2 else float(rates[0])
-                            if 0.1 <= rate <= 10:
-                                print(f"✓ Selenium scrape successful: {rate}%")
-                                return rate
-            except Exception as e:
-                print(f"✗ Selenium error: {str(e)}")
-            return None
-        
-        # Original code path if no driver provided (fallback)
-        # Try static HTML first
-        headers = {
-            'User-Agent': USER_AGENT,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Cache-Control': 'max-age=0'
-        }
-        
-        response = requests.get(url, headers=headers, timeout=15, allow_redirects=True)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        for p in soup.find_all('p'):
-            strong = p.find('strong')
-            if strong and "SoFi Plus members can earn up to" in strong.get_text():
-                text = strong.get_text()
-                # Find all rates in the text
-                rates = re.findall(r'(\d+\.\d+)', text)
-                if rates:
-                    # The "current Savings APY" is usually the second number
-                    if len(rates) > 1:
-                        rate = float(rates[1])
-                    else:
-                        rate = float(rates[0])
-                    if 0.1 <= rate <= 10:
-                        print(f"✓ Static scrape successful: {rate}%")
-                        return rate
-        
-        # If static scraping failed, use Selenium
-        print("Static HTML didn't work, trying Selenium with JavaScript rendering...")
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument(f'user-agent={USER_AGENT}')
-        
-        driver = create_chrome_driver()
-        
-        try:
-            driver.get(url)
-            wait = WebDriverWait(driver, 10)
-            wait.until(EC.presence_of_element_located((By.XPATH, "//p/strong[contains(text(), 'SoFi Plus members can earn up to')]")))
-            # Find all <strong> tags inside <p> tags
-            strong_elems = driver.find_elements(By.XPATH, "//p/strong")
-            for strong in strong_elems:
-                text = strong.text
-                if "SoFi Plus members can earn up to" in text:
-                    rates = re.findall(r'(\d+\.\d+)', text)
-                    if rates:
-                        # The "current Savings APY" is usually the second number
-                        rate = float(rates[2]) if len(rates) > 1 else float(rates[0])
-                        if 0.1 <= rate <= 10:
-                            print(f"✓ Selenium scrape successful: {rate}%")
-                            driver.quit()
-                            return rate
-                
-        except Exception as e:
-            print(f"✗ Selenium error: {str(e)}")
-            # Try alternative selectors
+def rate_from_soup(soup, selectors, valid_range=DEFAULT_VALID_RANGE):
+    """Run selector specs against parsed static HTML; returns the first valid rate."""
+    for spec in selectors:
+        separator = spec.get('separator', '')
+        for elem in soup.select(spec['css']):
+            text = elem.get_text(separator, strip=True)
+            if not _text_matches(text, spec):
+                continue
+            if spec.get('sibling_contains') and not any(spec['sibling_contains'] in sibling.get_text()
+                                                        for sibling in elem.find_next_siblings()):
+                continue
+            if spec.get('text_from') == 'next_sibling':
+                sibling = elem.find_next_sibling()
+                if sibling is None:
+                    continue
+                text = sibling.get_text(separator, strip=True)
+            rate = rate_from_text(text, spec, 'static', valid_range)
+            if rate is not None:
+                return rate
+    return None
+
+def rate_from_driver(driver, selectors, valid_range=DEFAULT_VALID_RANGE):
+    """Run selector specs against the rendered page; returns the first valid rate (or None, for waits)."""
+    for spec in selectors:
+        for elem in driver.find_elements(By.CSS_SELECTOR, spec['css']):
             try:
-                print("Trying alternative selector strategies...")
-                # Look for any h2 with APY text
-                h2_elements = driver.find_elements(By.TAG_NAME, 'h2')
-                for elem in h2_elements:
-                    text = elem.text.strip()
-                    if '%' in text:
-                        rate = extract_rate(text)
-                        if rate and 0.1 <= rate <= 10:
-                            print(f"✓ Found rate via alternative method: {rate}%")
-                            driver.quit()
-                            return rate
-            except:
-                pass
-        finally:
-            driver.quit()
-        
+                text = elem.text.strip()
+                if not _text_matches(text, spec):
+                    continue
+                if spec.get('sibling_contains') and not any(spec['sibling_contains'] in sibling.text
+                                                            for sibling in elem.find_elements(By.XPATH, 'following-sibling::*')):
+                    continue
+                if spec.get('text_from') == 'next_sibling':
+                    siblings = elem.find_elements(By.XPATH, 'following-sibling::*[1]')
+                    if not siblings:
+                        continue
+                    text = siblings[0].text.strip()
+            except StaleElementReferenceException:
+                continue
+            rate = rate_from_text(text, spec, 'selenium', valid_range)
+            if rate is not None:
+                return rate
+    return None
+
+def scrape_static_page(bank_name, url, page=None):
+    """Cheap strategy: plain HTTP fetch + BeautifulSoup, no browser. Returns None on any failure."""
+    spec = BANK_REGISTRY.get(bank_name)
+    if spec is None or not spec['selectors']:
         return None
-        
+    try:
+        page = page or fetch_page(url)
+        rate = get_cached_parse(page, bank_name)
+        if rate is not None:
+            print(f"✓ Page unchanged, reusing last parsed rate: {rate}%")
+            return rate
+        rate = rate_from_soup(make_soup(page.body, spec['parse_only']), spec['selectors'], spec['valid_range'])
+        if rate is not None:
+            remember_parse(page, bank_name, rate)
+            print(f"✓ Static scrape successful: {rate}%")
+        return rate
     except Exception as e:
-        print(f"✗ Error scraping {bank_name}: {str(e)}")
+        print(f"✗ Static scrape error for {bank_name}: {str(e)}")
         return None
 
-def scrape_capitalone_page(bank_name, url, driver=None):
-    """Capital One requires Selenium - can accept reused driver for efficiency"""
+def scrape_selenium_page(bank_name, url, driver):
+    """Render a bank page on the given driver and read its rate with the registry's selectors."""
+    spec = BANK_REGISTRY[bank_name]
     try:
-        print(f"Attempting to scrape {bank_name}...")
-        
-        # If driver provided, skip static HTML and use it directly
-        if driver is not None:
-            try:
-                wait = WebDriverWait(driver, 10)
-                driver.get(url)
-                rate_elem = wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, 'rates-inline[rate-type="APY"]'))
-                )
-                rate_text = rate_elem.text.strip()
-                rate = extract_rate(rate_text)
-                if rate and 0.1 <= rate <= 10:
-                    print(f"✓ Selenium scrape successful: {rate}%")
-                    return rate
-                else:
-                    print(f"✗ Could not extract valid rate from text: '{rate_text}'")
-            except Exception as e:
-                print(f"✗ Selenium error: {str(e)}")
-            return None
-        
-        # Original code path if no driver provided (fallback)
-        # Try static HTML first
-        headers = {
-            'User-Agent': USER_AGENT,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Cache-Control': 'max-age=0'
-        }
-        response = requests.get(url, headers=headers, timeout=15, allow_redirects=True)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Try to find rate element with the specific class
-        rate_elem = soup.find('rates-inline', {'rate-type': 'APY'})
-        
-        if rate_elem:
-            rate_text = rate_elem.get_text(strip=True)
-            rate = extract_rate(rate_text)
-            if rate and 0.1 <= rate <= 10:
-                print(f"✓ Static scrape successful: {rate}%")
-                return rate
-        
-        # If static scraping failed, use Selenium
-        print("Static HTML didn't work, trying Selenium with JavaScript rendering...")
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument(f'user-agent={USER_AGENT}')
-        
-        driver = create_chrome_driver()
-        
+        driver.get(url)
         try:
-            driver.get(url)
-            
-            # Wait up to 10 seconds for the rate element to appear
-            wait = WebDriverWait(driver, 10)
-            
-            # Use CSS selector instead of CLASS_NAME for compound classes
-            rate_elem = wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, 'rates-inline[rate-type="APY"]'))
+            # Wait up to 10 seconds for a selector to yield a valid rate
+            rate = WebDriverWait(driver, source_time_left(10), ignored_exceptions=(StaleElementReferenceException,)).until(
+                lambda d: rate_from_driver(d, spec['selectors'], spec['valid_range'])
             )
-            
-            rate_text = rate_elem.text.strip()
-            print(f"Found element with Selenium. Text: '{rate_text}'")
-            
-            rate = extract_rate(rate_text)
-            
-            if rate and 0.1 <= rate <= 10:
-                print(f"✓ Selenium scrape successful: {rate}%")
-                driver.quit()
+            print(f"✓ Selenium scrape successful: {rate}%")
+            return rate
+        except TimeoutException:
+            print(f"✗ Rate selector not found for {bank_name}")
+
+        if spec['fallback_selectors']:
+            print("Trying alternative selector strategies...")
+            rate = rate_from_driver(driver, spec['fallback_selectors'], spec['valid_range'])
+            if rate is not None:
+                print(f"✓ Found rate via alternative method: {rate}%")
                 return rate
-            else:
-                print(f"✗ Could not extract valid rate from text: '{rate_text}'")
-                
-        except Exception as e:
-            print(f"✗ Selenium error: {str(e)}")
-            # Try alternative selectors
-            try:
-                print("Trying alternative selector strategies...")
-                # Look for any rates-inline with APY text
-                rates_inline_elements = driver.find_elements(By.CSS_SELECTOR, 'rates-inline[rate-type="APY"]')
-                for elem in rates_inline_elements:
-                    text = elem.text.strip()
-                    if '%' in text:
-                        rate = extract_rate(text)
-                        if rate and 0.1 <= rate <= 10:
-                            print(f"✓ Found rate via alternative method: {rate}%")
-                            driver.quit()
-                            return rate
-            except:
-                pass
-        finally:
-            driver.quit()
-        
-        return None
-        
     except Exception as e:
-        print(f"✗ Error scraping {bank_name}: {str(e)}")
-        return None
+        print(f"✗ Selenium error: {str(e)}")
+    return None
 
-def scrape_marcus_page(bank_name, url, driver=None):
-    """Marcus always requires Selenium - can accept reused driver for efficiency"""
-    try:
-        print(f"Attempting to scrape {bank_name}... (Selenium-only)")
-        
-        # If driver provided, use it directly
-        if driver is not None:
-            try:
-                driver.get(url)
-                wait = WebDriverWait(driver, 10)
-                rate_elem = wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, 'span[style*="font-size: 46.0px"]'))
-                )
-                rate_text = rate_elem.text.strip()
-                apy_elem = rate_elem.find_element(By.XPATH, 'following-sibling::span[contains(text(), "APY")]')
-                if apy_elem:
-                    rate = extract_rate(rate_text)
-                    if rate and 0.1 <= rate <= 10:
-                        print(f"✓ Selenium scrape successful: {rate}%")
-                        return rate
-            except Exception as e:
-                print(f"✗ Selenium error: {str(e)}")
-            return None
-        
-        # Original code path if no driver provided (fallback - creates own driver)
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument(f'user-agent={USER_AGENT}')
-        driver = create_chrome_driver()
+def extract_embedded_json(soup):
+    """Parse JSON-LD, Next.js __NEXT_DATA__ and other JSON <script> blobs out of static HTML."""
+    blobs = []
+    for script in soup.find_all('script'):
+        script_type = (script.get('type') or '').lower()
+        if script_type not in ('application/ld+json', 'application/json') and script.get('id') != '__NEXT_DATA__':
+            continue
+        text = script.string or script.get_text()
+        if not text or not text.strip():
+            continue
         try:
-            driver.get(url)
-            # Wait for the large rate span to appear
-            wait = WebDriverWait(driver, 10)
-            rate_elem = wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, 'span[style*="font-size: 46.0px"]'))
-            )
-            rate_text = rate_elem.text.strip()
-            # Optionally check for APY in the next sibling
-            apy_elem = rate_elem.find_element(By.XPATH, 'following-sibling::span[contains(text(), "APY")]')
-            if apy_elem:
-                rate = extract_rate(rate_text)
-                if rate and 0.1 <= rate <= 10:
-                    print(f"✓ Selenium scrape successful: {rate}%")
-                    driver.quit()
-                    return rate
-        except Exception as e:
-            print(f"✗ Selenium error: {str(e)}")
-        finally:
-            driver.quit()
+            blobs.append(json.loads(text))
+        except ValueError:
+            continue
+    return blobs
+
+def _json_rate(value):
+    """Turn an APY-looking JSON value (3.8, "3.80%", "3.80% APY", 0.038) into a percentage, or None."""
+    if isinstance(value, bool):
         return None
-    except Exception as e:
-        print(f"✗ Error scraping {bank_name}: {str(e)}")
+    if isinstance(value, (int, float)):
+        rate = float(value)
+    elif isinstance(value, str):
+        rate = extract_rate(value)
+        if rate is None:
+            return None
+    elif isinstance(value, dict):
+        # {"value": 3.8} / {"@type": "QuantitativeValue", "value": "3.8"}
+        return _json_rate(value.get('value'))
+    else:
         return None
+    # Some APIs return fractions (0.038 for 3.80%)
+    if 0 < rate < 0.1:
+        rate = round(rate * 100, 4)
+    return rate if 0.1 <= rate <= 10 else None
+
+def find_json_rates(data, keys):
+    """All valid APYs stored under any of `keys`, anywhere in a JSON document, in document order."""
+    wanted = {key.lower() for key in keys}
+    rates = []
+    
+    def walk(node):
+        if isinstance(node, dict):
+            for key, value in node.items():
+                if key.lower() in wanted:
+                    rate = _json_rate(value)
+                    if rate is not None:
+                        rates.append(rate)
+                        continue
+                walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+    
+    walk(data)
+    return rates
 
-def scrape_barclays_page(bank_name, url):
+def scrape_direct_data(bank_name, url, page=None):
+    """
+    Cheapest strategy: read the rate as data, either from a bank's JSON rate endpoint or
+    from JSON embedded in its static HTML. Returns None on any failure.
+    """
+    spec = BANK_REGISTRY.get(bank_name)
+    source = spec.get('direct') if spec else None
+    if source is None:
+        return None
     try:
-        print(f"Attempting to scrape {bank_name}...")
-        
-        # Try static HTML first
-        headers = {
-            'User-Agent': USER_AGENT,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Cache-Control': 'max-age=0'
-        }
-        response = requests.get(url, headers=headers, timeout=15, allow_redirects=True)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Try to find rate element with the specific class
-        for row in soup.find_all('tr'):
-            cells = row.find_all('td')
-            for i, cell in enumerate(cells):
-                if "Less than $10,000" in cell.get_text():
-                    # Get the next <td> (the rate)
-                    if i + 1 < len(cells):
-                        rate_text = cells[i + 1].get_text(strip=True)
-                        rate = extract_rate(rate_text)
-                        if rate and 0.1 <= rate <= 10:
-                            print(f"✓ Static scrape successful: {rate}%")
-                            return rate
-        # If static scraping failed, use Selenium
-        print("Static HTML didn't work, trying Selenium with JavaScript rendering...")
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument(f'user-agent={USER_AGENT}')
-        
-        driver = create_chrome_driver()
-        
-        try:
-            driver.get(url)
-            
-            # Wait up to 10 seconds for the rate element to appear
-            wait = WebDriverWait(driver, 10)
-            
-            # Use CSS selector instead of CLASS_NAME for compound classes
-            rate_elem = wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, 'td:contains("Less than $10,000") + td'))
-            )
-            
-            rate_text = rate_elem.text.strip()
-            print(f"Found element with Selenium. Text: '{rate_text}'")
-            
-            rate = extract_rate(rate_text)
-            
-            if rate and 0.1 <= rate <= 10:
-                print(f"✓ Selenium scrape successful: {rate}%")
-                driver.quit()
+        if source.get('endpoint'):
+            blobs = [http_get(source['endpoint'], headers={'Accept': 'application/json'}).json()]
+        else:
+            page = page or fetch_page(url)
+            rate = get_cached_parse(page, f"{bank_name}:direct")
+            if rate is not None:
+                print(f"✓ Page unchanged, reusing last embedded-data rate: {rate}%")
                 return rate
-            else:
-                print(f"✗ Could not extract valid rate from text: '{rate_text}'")
-                
-        except Exception as e:
-            print(f"✗ Selenium error: {str(e)}")
-            # Try alternative selectors
-            try:
-                print("Trying alternative selector strategies...")
-                
-                # Look for any td with APY text
-                td_elements = driver.find_elements(By.TAG_NAME, 'td')
-                for elem in td_elements:
-                    text = elem.text.strip()
-                    if '%' in text:
-                        rate = extract_rate(text)
-                        if rate and 0.1 <= rate <= 10:
-                            print(f"✓ Found rate via alternative method: {rate}%")
-                            driver.quit()
-                            return rate
-            except:
-                pass
-        finally:
-            driver.quit()
-        
-        return None
+            blobs = extract_embedded_json(make_soup(page.body, 'script'))
         
+        low, high = spec['valid_range']
+        rates = [rate for blob in blobs for rate in find_json_rates(blob, source['keys']) if low <= rate <= high]
+        if not rates:
+            return None
+        rate = max(rates) if source.get('pick') == 'max' else rates[0]
+        if page is not None and not source.get('endpoint'):
+            remember_parse(page, f"{bank_name}:direct", rate)
+        print(f"✓ Direct data scrape successful: {rate}%")
+        return rate
     except Exception as e:
-        print(f"✗ Error scraping {bank_name}: {str(e)}")
+        print(f"✗ Direct data error for {bank_name}: {str(e)}")
         return None
 
-def scrape_apple_page(bank_name, url):
-    try:
-        print(f"Attempting to scrape {bank_name}...")
-        
-        # Try static HTML first
-        headers = {
-            'User-Agent': USER_AGENT,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Cache-Control': 'max-age=0'
-        }
-        response = requests.get(url, headers=headers, timeout=15, allow_redirects=True)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Try to find rate element with the specific class
-        for p in soup.find_all('p', class_='typography-intro'):
-            text = p.get_text(" ", strip=True)  # get all text, including from children, as a single string
-            rate = extract_rate(text)
-            if rate and 0.1 <= rate <= 10:
-                print(f"✓ Static scrape successful: {rate}%")
-                return rate
-        
-        # If static scraping failed, use Selenium
-        print("Static HTML didn't work, trying Selenium with JavaScript rendering...")
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument(f'user-agent={USER_AGENT}')
-        
-        driver = create_chrome_driver()
-        
+def load_strategy_state():
+    """Load which scraping strategy last worked for each bank."""
+    if os.path.exists(STRATEGY_STATE_FILE):
         try:
-            driver.get(url)
-            
-            # Wait up to 10 seconds for the rate element to appear
-            wait = WebDriverWait(driver, 10)
-            
-            # Use CSS selector instead of CLASS_NAME for compound classes
-            rate_elem = wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, 'p.typography-intro'))
-            )
-            
-            rate_text = rate_elem.text.strip()
-            print(f"Found element with Selenium. Text: '{rate_text}'")
-            
-            rate = extract_rate(rate_text)
-            
-            if rate and 0.1 <= rate <= 10:
-                print(f"✓ Selenium scrape successful: {rate}%")
-                driver.quit()
-                return rate
-            else:
-                print(f"✗ Could not extract valid rate from text: '{rate_text}'")
-                
-        except Exception as e:
-            print(f"✗ Selenium error: {str(e)}")
-            # Try alternative selectors
-            try:
-                print("Trying alternative selector strategies...")
-                # Look for any p with APY text
-                p_elements = driver.find_elements(By.TAG_NAME, 'p')
-                for elem in p_elements:
-                    text = elem.text.strip()
-                    if '%' in text:
-                        rate = extract_rate(text)
-                        if rate and 0.1 <= rate <= 10:
-                            print(f"✓ Found rate via alternative method: {rate}%")
-                            driver.quit()
-                            return rate
-            except:
-                pass
-        finally:
-            driver.quit()
-        
-        return None
-        
-    except Exception as e:
-        print(f"✗ Error scraping {bank_name}: {str(e)}")
-        return None
+            with open(STRATEGY_STATE_FILE, 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            pass
+    return {}
 
-def scrape_amex_page(bank_name, url, driver=None):
-    """Amex requires Selenium - can accept reused driver for efficiency"""
-    try:
-        print(f"Attempting to scrape {bank_name}...")
-        
-        # If driver provided, skip static HTML and use it directly
-        if driver is not None:
-            try:
-                driver.get(url)
-                wait = WebDriverWait(driver, 10)
-                rate_elem = wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, 'h2.axp-us-consumer-banking__index__rate___botMw'))
-                )
-                rate_text = rate_elem.text.strip()
-                rate = extract_rate(rate_text)
-                if rate and 0.1 <= rate <= 10:
-                    print(f"✓ Selenium scrape successful: {rate}%")
-                    return rate
-                else:
-                    print(f"✗ Could not extract valid rate from text: '{rate_text}'")
-            except Exception as e:
-                print(f"✗ Selenium error: {str(e)}")
-            return None
-        
-        # Original code path if no driver provided (fallback)
-        # Try static HTML first
-        headers = {
-            'User-Agent': USER_AGENT,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Cache-Control': 'max-age=0'
-        }
-        response = requests.get(url, headers=headers, timeout=15, allow_redirects=True)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
+def save_strategy_state(state):
+    atomic_write_json(STRATEGY_STATE_FILE, state)
+
+def plan_strategies(bank_name, state):
+    """
+    Order in which to try scraping strategies for a bank.
+    
+    The strategy that last worked goes first, then the rest in registry order. Banks known to
+    need JavaScript only re-probe the browser-free strategies every STATIC_REPROBE_INTERVAL runs.
+    Embedded data never jumps ahead of the page's selectors: it shares their page fetch, and a
+    remembered "direct" would otherwise lock in whatever JSON rate it last picked.
+    """
+    strategies = BANK_REGISTRY[bank_name]['strategies']
+    record = state.get(bank_name, {})
+    last = record.get('strategy')
+    if last == 'selenium' and record.get('static_misses', 0) % STATIC_REPROBE_INTERVAL == 0:
+        last = None
+    if last == 'direct':
+        last = None
+    if OFFLINE_REPLAY:
+        strategies = [strategy for strategy in strategies if strategy != 'selenium']
+    if last in strategies:
+        return [last] + [strategy for strategy in strategies if strategy != last]
+    return list(strategies)
+
+def scrape_bank_adaptive(pool, bank_name, url, state):
+    """Scrape a bank with the cheapest working strategy, only checking out a Chrome driver if needed."""
+    print(f"Scraping {bank_name}...")
+    rate = None
+    used = None
+    page = None  # Static HTML, fetched once and shared by the direct-data and static strategies
+    
+    for strategy in plan_strategies(bank_name, state):
+        source_time_left()
+        if strategy in ('direct', 'static') and page is None:
+            with span("fetch", bank_name) as record:
+                try:
+                    page = fetch_page(url)
+                    record.update(page.metrics())
+                except Exception as e:
+                    print(f"✗ Static fetch error for {bank_name}: {str(e)}")
+                    record["error"] = type(e).__name__
+                    page = False
+        
+        if strategy == 'direct':
+            with span("parse", bank_name, strategy=strategy) as record:
+                rate = scrape_direct_data(bank_name, url, page) if page or BANK_REGISTRY[bank_name]['direct'].get('endpoint') else None
+                record["found"] = rate is not None
+        elif strategy == 'static':
+            with span("parse", bank_name, strategy=strategy) as record:
+                rate = scrape_static_page(bank_name, url, page) if page else None
+                record["found"] = rate is not None
+        elif strategy == 'selenium':
+            profile = blocking_profile_for(bank_name, state)
+            print(f"  {bank_name}: rendering with Selenium ('{profile}' request blocking)...")
+            with span("render", bank_name, strategy=strategy, blocking=profile, retries=0) as record:
+                try:
+                    with pool.driver() as driver:
+                        apply_blocking_profile(driver, profile)
+                        rate = scrape_selenium_page(bank_name, url, driver)
+                        
+                        # Blocked assets can occasionally hide the rate - retry with everything loaded
+                        if rate is None and profile != 'full':
+                            print(f"  {bank_name}: rate not found with '{profile}' blocking, retrying with full page load...")
+                            record["retries"] = 1
+                            apply_blocking_profile(driver, 'full')
+                            rate = scrape_selenium_page(bank_name, url, driver)
+                            if rate is not None:
+                                profile = 'full'
+                except Exception as e:
+                    print(f"  ✗ {bank_name}: Chrome driver error: {str(e)}")
+                    record["error"] = type(e).__name__
+                record["found"] = rate is not None
+        if rate is not None:
+            used = strategy
+            break
+    
+    # Remember what worked so the next run can skip straight to it (unless the run already gave up on this bank)
+    source_time_left()
+    record = dict(state.get(bank_name, {}))
+    if used is not None:
+        record['strategy'] = used
+        record['last_success'] = datetime.now().strftime("%Y-%m-%d %H:%M")
+    if used == 'selenium':
+        # Remember when only a full page load worked so the next run doesn't waste a blocked attempt
+        if profile == 'full' and blocking_profile_for(bank_name) != 'full':
+            record['blocking'] = 'full'
+            # Its own counter: static_misses paces the static re-probe and resets independently
+            record['full_load_runs'] = record.get('full_load_runs', 0) + 1
+        else:
+            record.pop('blocking', None)
+            record.pop('full_load_runs', None)
+    # Runs since a browser-free strategy last worked
+    record['static_misses'] = 0 if used in ('direct', 'static') else record.get('static_misses', 0) + 1
+    state[bank_name] = record
+    
+    if rate is not None:
+        print(f"  ✓ {bank_name}: {rate}% (via {used})")
+    else:
+        print(f"  ✗ {bank_name}: Failed to scrape")
+    
+    return bank_name, rate, used
+
+def parse_investopedia_cards(soup):
+    """Extract [bank name, rate] pairs from the Investopedia list."""
+    cards = []
+    
+    # Find all list items with bank data
+    # Look for <li> elements that contain both a link and a strong tag with APY
+    for item in soup.find_all('li'):
+        # Look for bank name in <a> tag
+        link = item.find('a')
+        if not link:
+            continue
         
-        # Try to find rate element with the specific class
-        rate_elem = soup.find('h2', class_='axp-us-consumer-banking__index__rate___botMw')
+        bank_name = link.get_text(strip=True)
         
-        if rate_elem:
-            rate_text = rate_elem.get_text(strip=True)
-            rate = extract_rate(rate_text)
-            if rate and 0.1 <= rate <= 10:
-                print(f"✓ Static scrape successful: {rate}%")
-                return rate
-        
-        # If static scraping failed, use Selenium
-        print("Static HTML didn't work, trying Selenium with JavaScript rendering...")
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument(f'user-agent={USER_AGENT}')
+        # Look for APY in <strong> tag
+        rate = None
+        for strong in item.find_all('strong'):
+            text = strong.get_text(strip=True)
+            if 'APY' in text:
+                # Extract rate like "4.05% APY"
+                rate_match = re.search(r'(\d+\.\d+)%', text)
+                if rate_match:
+                    rate = float(rate_match.group(1))
+                    break
         
-        driver = create_chrome_driver()
+        if rate and 0.1 <= rate <= 10:
+            cards.append([bank_name, rate])
+    
+    return cards
+
+# Kinds of institution ("Federal", "Community", "Mutual"): shared by unrelated market banks, so generic
+# to the identity registry, but no tracked bank's name has them, so they still count against an alias match
+INSTITUTION_TYPE_TOKENS = {"association", "community", "cooperative", "federal", "mutual"}
+# Tokens too common in bank names to count towards a match's confidence
+ALIAS_GENERIC_TOKENS = {"a", "and", "bank", "by", "co", "company", "credit", "direct", "fcu", "financial", "fsb", "high",
+                        "hysa", "n", "na", "national", "of", "online", "savings", "the", "trust", "union", "yield"}
+GENERIC_NAME_TOKENS = ALIAS_GENERIC_TOKENS | INSTITUTION_TYPE_TOKENS
+
+def normalize_bank_name(name):
+    """Case-folded word tokens of a bank name, without ®/™ signs or punctuation ("&" reads as "and")."""
+    cleaned = re.sub(r"[®™©℠]", "", name).replace("&", " and ")
+    return tuple(re.findall(r"[^\W_]+", cleaned.casefold()))
+
+
+class AliasMatcher:
+    """Token index over bank aliases, built once.
+
+    Names are normalized to word tokens and an alias matches only as a contiguous run of whole
+    tokens, so "C1" can't match inside another word. Candidates are looked up by their first
+    token instead of scanning every alias for every card.
+    """
+
+    def __init__(self, aliases):
+        self.index = {}
+        for canonical, names in aliases.items():
+            for alias in {canonical, *names}:
+                tokens = normalize_bank_name(alias)
+                if tokens:
+                    self.index.setdefault(tokens[0], []).append((tokens, canonical))
+
+    def match(self, name):
+        """
+        (canonical name, confidence) for the longest alias found in `name`, or (None, 0.0).
+        Confidence is 1.0 for an exact alias, otherwise the share of the name's distinctive
+        (non-generic) tokens that the alias covers.
+        """
+        tokens = normalize_bank_name(name)
+        best, best_tokens = None, ()
+        for start, token in enumerate(tokens):
+            for alias_tokens, canonical in self.index.get(token, ()):
+                if len(alias_tokens) > len(best_tokens) and tokens[start:start + len(alias_tokens)] == alias_tokens:
+                    best, best_tokens = canonical, alias_tokens
+        if best is None:
+            return None, 0.0
+        if len(best_tokens) == len(tokens):
+            return best, 1.0
+        distinctive = [token for token in tokens if token not in ALIAS_GENERIC_TOKENS] or tokens
+        covered = [token for token in best_tokens if token not in ALIAS_GENERIC_TOKENS] or best_tokens
+        return best, round(min(len(covered) / len(distinctive), 1.0), 2)
+
+
+# Tracked banks and their aliases, compiled once at startup for the aggregate-site scrapers
+TRACKED_ALIAS_MATCHER = AliasMatcher({bank_name: BANK_ALIASES.get(bank_name, [bank_name]) for bank_name in LINKS})
+
+class BankIdentityRegistry:
+    """
+    Canonical name for every bank spelling seen on the aggregate sites, persisted in BANK_IDENTITY_FILE.
+
+    A new spelling is compared only with the known spellings that share a distinctive token or a
+    compact key (the name with spaces removed), not with every bank. Scores: 1.0 for the same compact
+    key, 0.9 when one name's two or more distinctive tokens open the other's ("E*TRADE" / "E*TRADE from
+    Morgan Stanley"), 0.75 when a single token opens it or the tokens appear elsewhere in it, otherwise
+    token-set Jaccard similarity. A unique candidate at
+    IDENTITY_MATCH_THRESHOLD or above absorbs the spelling; anything else starts a new bank, and near
+    misses or ties are queued in BANK_IDENTITY_REVIEW_FILE. Tracked banks (LINKS) are only reached
+    through TRACKED_ALIAS_MATCHER: the registry never files a new spelling under one.
+    """
+
+    def __init__(self, banks, review=None):
+        self.banks = {}  # canonical name -> spellings
+        self.canonical = {}  # spelling -> canonical name
+        self.keys = {}  # compact key -> spelling
+        self.blocks = {}  # distinctive token -> spellings
+        self.tokens = {}  # spelling -> distinctive tokens, in order
+        self.dirty = False
+        for canonical, spellings in banks.items():
+            for spelling in spellings:
+                self._add(canonical, spelling)
+        # Entries whose spelling was moved to another bank in the registry file count as reviewed
+        self.review = {name: entry for name, entry in (review or {}).items()
+                       if self.canonical.get(name) == entry.get("assigned")}
+
+    @staticmethod
+    def _name_keys(name):
+        tokens = normalize_bank_name(name)
+        distinctive = tuple(token for token in tokens if token not in GENERIC_NAME_TOKENS)
+        return distinctive, {key for key in (''.join(tokens), ''.join(distinctive)) if key}
+
+    def _add(self, canonical, spelling):
+        if spelling in self.canonical:
+            return
+        self.banks.setdefault(canonical, []).append(spelling)
+        self.canonical[spelling] = canonical
+        distinctive, keys = self._name_keys(spelling)
+        self.tokens[spelling] = distinctive
+        for key in keys:
+            self.keys.setdefault(key, spelling)
+        for token in set(distinctive):
+            self.blocks.setdefault(token, set()).add(spelling)
+
+    @staticmethod
+    def similarity(tokens, other):
+        if not tokens or not other:
+            return 0.0
+        shorter, longer = sorted((tokens, other), key=len)
+        # A single shared token ("Capital Bank" / "Capital One") is too weak to merge on its own
+        if len(shorter) >= 2 and longer[:len(shorter)] == shorter:
+            return 0.9
+        if set(shorter) <= set(longer):
+            return 0.75
+        return len(set(tokens) & set(other)) / len(set(tokens) | set(other))
+
+    def candidates(self, name):
+        """{canonical name: best similarity} for the known banks sharing a block with `name`."""
+        distinctive, keys = self._name_keys(name)
+        scores = {self.canonical[self.keys[key]]: 1.0 for key in keys if key in self.keys}
+        for spelling in set().union(*(self.blocks.get(token, ()) for token in distinctive)):
+            canonical = self.canonical[spelling]
+            if scores.get(canonical, 0.0) < 1.0:
+                scores[canonical] = max(scores.get(canonical, 0.0), self.similarity(distinctive, self.tokens[spelling]))
+        return scores
+
+    def resolve(self, name):
+        """
+        Canonical market name for a scraped spelling that isn't a tracked bank, registering it if it
+        hasn't been seen before. A spelling close to a tracked bank is kept as its own bank and queued
+        for review.
+        """
+        if name in self.canonical:
+            canonical = self.canonical[name]
+            return name if canonical in LINKS else canonical
+        scores = sorted(((score, canonical) for canonical, score in self.candidates(name).items()
+                         if score >= IDENTITY_REVIEW_THRESHOLD), reverse=True)
+        matches = [canonical for score, canonical in scores if score >= IDENTITY_MATCH_THRESHOLD]
+        canonical = matches[0] if len(matches) == 1 and matches[0] not in LINKS else name
+        if canonical == name and scores:
+            self.review[name] = {"assigned": name, "candidates": {other: round(score, 2) for score, other in scores[:3]}}
+        self._add(canonical, name)
+        self.dirty = True
+        return canonical
+
+    def canonical_name(self, name):
+        """The tracked bank TRACKED_ALIAS_MATCHER confidently matches `name` to, otherwise resolve(name)."""
+        tracked, confidence = TRACKED_ALIAS_MATCHER.match(name)
+        return tracked if tracked and confidence >= ALIAS_MIN_CONFIDENCE else self.resolve(name)
+
+    def canonicalize(self, rates):
+        """Re-key a {bank name: rate} dict by canonical name, keeping the highest rate where spellings collide."""
+        merged = {}
+        for name, rate in rates.items():
+            canonical = self.canonical_name(name)
+            if canonical not in merged or rate > merged[canonical]:
+                merged[canonical] = rate
+        return merged
+
+    def save(self, journal=None):
+        """Write the registry and review queue if anything was registered (staged in `journal` when given)."""
+        if not self.dirty:
+            return
+        write = journal.write_json if journal else atomic_write_json
+        write(BANK_IDENTITY_FILE, {canonical: self.banks[canonical] for canonical in sorted(self.banks)})
+        write(BANK_IDENTITY_REVIEW_FILE, self.review)
+        self.dirty = False
+
+def load_bank_identities():
+    """The persisted bank identity registry, seeded from BANK_ALIASES on first use."""
+    banks = load_json_file(BANK_IDENTITY_FILE, None)
+    if banks is None:
+        banks = {bank_name: BANK_ALIASES.get(bank_name, [bank_name]) for bank_name in LINKS}
+        for canonical, aliases in BANK_ALIASES.items():
+            banks.setdefault(canonical, aliases)
+        registry = BankIdentityRegistry(banks)
+        registry.dirty = True
+        return registry
+    return BankIdentityRegistry(banks, load_json_file(BANK_IDENTITY_REVIEW_FILE, {}, required=False))
+
+
+def match_aggregate_cards(source, cards):
+    """
+    Split [bank name, rate] pairs from an aggregate site into tracked banks (from LINKS) and all other banks.
+    Alias matches below ALIAS_MIN_CONFIDENCE are kept as other banks.
+    """
+    my_banks = {}  # Banks from LINKS
+    other_banks = {}  # Other banks not in LINKS
+    
+    for bank_name, rate in cards:
+        # Check if this matches any of tracked banks
+        my_bank, confidence = TRACKED_ALIAS_MATCHER.match(bank_name)
+        if my_bank and confidence >= ALIAS_MIN_CONFIDENCE:
+            my_banks[my_bank] = rate
+            print(f"    ✓ {source}: matched {my_bank} (as '{bank_name}', confidence {confidence:.2f}): {rate}%")
+        else:
+            if my_bank:
+                print(f"    ⚠️  {source}: '{bank_name}' looks like {my_bank} (confidence {confidence:.2f}), kept as another bank")
+            # If not matched to my banks, add to other banks
+            other_banks[bank_name] = rate
+    
+    print(f"    {source}: {len(my_banks)} tracked banks, {len(other_banks)} other banks")
+    return my_banks, other_banks
+
+def fetch_investopedia_cards():
+    """Fetch the Investopedia list as [bank name, rate] pairs (reusing the parse if the page is unchanged)."""
+    with span("fetch", "Investopedia") as record:
+        page = fetch_page(AGGREGATE_SOURCES[0], headers={'Referer': 'https://www.google.com/'})
+        record.update(page.metrics())
+    
+    with span("parse", "Investopedia") as record:
+        cards = get_cached_parse(page, 'investopedia')
+        if cards is None:
+            cards = parse_investopedia_cards(make_soup(page.body, 'li'))
+            remember_parse(page, 'investopedia', cards)
+        else:
+            print(f"    Investopedia unchanged, reusing {len(cards)} parsed entries")
+        record["cards"] = len(cards)
+    return cards
+
+BANKRATE_CARD_STRAINER = SoupStrainer('div', class_='wrt-RateCard-content')
+
+def parse_bankrate_cards(soup):
+    """Extract [bank name, rate] pairs from rendered Bankrate rate cards."""
+    results = []
+    
+    # Find all rate cards
+    cards = soup.find_all('div', class_='wrt-RateCard-content')
+    print(f"Found {len(cards)} .wrt-RateCard-content cards")
+    
+    for card in cards:
+        # Try to get bank name from logo alt or label
+        bank_name = None
+        logo_img = card.find('img', class_='wrt-AdvertiserLogo-img')
+        if logo_img and logo_img.has_attr('alt'):
+            bank_name = logo_img['alt'].strip()
+        if not bank_name:
+            label = card.find('p', class_='wrt-RateCard-advertiserLabel')
+            if label:
+                bank_name = label.get_text(strip=True)
+        if not bank_name:
+            print("  ⚠️ Skipping card: No bank name found")
+            continue
+        bank_name = re.sub(r'[®™]', '', bank_name).strip()
+        print(f"  Processing bank: {bank_name}")
+
+        # Find APY value - need to find the first wrt-Stat that contains APY label
+        rate = None
+        stats = card.find_all('div', class_='wrt-Stat')
+        for stat in stats:
+            label_elem = stat.find('div', class_='wrt-Stat-label')
+            if label_elem and 'APY' in label_elem.get_text():
+                rate_elem = stat.find('div', class_='wrt-Stat-amount')
+                if rate_elem:
+                    # Get only direct text, not from child elements like tooltips
+                    rate_text = ''.join(rate_elem.find_all(string=True, recursive=False)).strip()
+                    print(f"    Found APY text: '{rate_text}'")
+                    try:
+                        # Remove any % signs and commas
+                        rate_text_clean = rate_text.replace('%', '').replace(',', '').strip()
+                        rate = float(rate_text_clean)
+                        print(f"    Converted to float: {rate}")
+                        break
+                    except ValueError as e:
+                        print(f"    ✗ Could not convert '{rate_text}' to float: {e}")
+                        continue
         
+        if rate and 0.1 <= rate <= 10:
+            results.append([bank_name, rate])
+        elif rate:
+            print(f"    ✗ Rate {rate} out of valid range")
+        else:
+            print(f"    ✗ No valid APY found for {bank_name}")
+    
+    return results
+
+def find_bankrate_show_more(driver):
+    """The visible, enabled "See more rates" button, or None once everything is loaded."""
+    for button in driver.find_elements(By.CLASS_NAME, 'wrt-ShowMore-button'):
         try:
-            driver.get(url)
-            
-            # Wait up to 10 seconds for the rate element to appear
-            wait = WebDriverWait(driver, 10)
-            
-            # Use CSS selector instead of CLASS_NAME for compound classes
-            rate_elem = wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, 'h2.axp-us-consumer-banking__index__rate___botMw'))
-            )
-            
-            rate_text = rate_elem.text.strip()
-            print(f"Found element with Selenium. Text: '{rate_text}'")
-            
-            rate = extract_rate(rate_text)
-            
-            if rate and 0.1 <= rate <= 10:
-                print(f"✓ Selenium scrape successful: {rate}%")
-                driver.quit()
-                return rate
-            else:
-                print(f"✗ Could not extract valid rate from text: '{rate_text}'")
-                
-        except Exception as e:
-            print(f"✗ Selenium error: {str(e)}")
-            # Try alternative selectors
-            try:
-                print("Trying alternative selector strategies...")
-                # Look for any h2 with APY text
-                h2_elements = driver.find_elements(By.TAG_NAME, 'h2')
-                for elem in h2_elements:
-                    text = elem.text.strip()
-                    if '%' in text:
-                        rate = extract_rate(text)
-                        if rate and 0.1 <= rate <= 10:
-                            print(f"✓ Found rate via alternative method: {rate}%")
-                            driver.quit()
-                            return rate
-            except:
-                pass
-        finally:
-            driver.quit()
-        
-        return None
-        
-    except Exception as e:
-        print(f"✗ Error scraping {bank_name}: {str(e)}")
-        return None
+            if button.is_displayed() and button.is_enabled():
+                return button
+        except StaleElementReferenceException:
+            continue
+    return None
+
+def bankrate_cards_loaded(previous_count):
+    """Wait condition: more rate cards than before, or the "See more" button is gone."""
+    def condition(driver):
+        if len(driver.find_elements(By.CLASS_NAME, 'wrt-RateCard-content')) > previous_count:
+            return True
+        return find_bankrate_show_more(driver) is None
+    return condition
 
-def scrape_wealthfront_page(bank_name, url):
+def render_bankrate_cards():
+    """Render Bankrate with Selenium, expand all "See more" pages and return [bank name, rate] pairs."""
+    print("Using Selenium to fetch Bankrate page...")
+    with span("render", "Bankrate", strategy="selenium") as record:
+        html = _render_bankrate_html(record)
+    with span("parse", "Bankrate", strategy="selenium") as record:
+        cards = parse_bankrate_cards(make_soup(html, BANKRATE_CARD_STRAINER))
+        record["cards"] = len(cards)
+    return cards
+
+def _render_bankrate_html(record):
+    """Load every Bankrate rate card in Chrome and return their markup; pagination stats go into the span `record`."""
+    driver = create_chrome_driver()
     try:
-        print(f"Attempting to scrape {bank_name}...")
-        
-        # Try static HTML first
-        headers = {
-            'User-Agent': USER_AGENT,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Cache-Control': 'max-age=0'
-        }
-        response = requests.get(url, headers=headers, timeout=15, allow_redirects=True)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Try to find rate element with data-testid="dynamic-yields-table"
-        rate_elem = soup.find('p', {'data-testid': 'dynamic-yields-table'})
-        
-        if rate_elem:
-            rate_text = rate_elem.get_text(strip=True)
-            rate = extract_rate(rate_text)
-            if rate and 0.1 <= rate <= 10:
-                print(f"✓ Static scrape successful: {rate}%")
-                return rate
+        cap_driver_timeouts(driver)
+        apply_blocking_profile(driver, blocking_profile_for("Bankrate"))
+        driver.get(AGGREGATE_SOURCES[1])
         
-        # If static scraping failed, use Selenium
-        print("Static HTML didn't work, trying Selenium with JavaScript rendering...")
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument(f'user-agent={USER_AGENT}')
+        # Wait for initial cards to load
+        WebDriverWait(driver, source_time_left(15)).until(
+            lambda d: len(d.find_elements(By.CLASS_NAME, 'wrt-RateCard-content')) > 0
+        )
         
-        driver = create_chrome_driver()
+        # Click "See more rates" until the button disappears, waiting on the card count itself
+        # instead of fixed sleeps (previously 3s idle per click, up to 75s per run)
+        max_attempts = 25  # Prevent infinite loop
+        clicks = 0
+        waited = 0.0
         
-        try:
-            driver.get(url)
-            
-            # Wait up to 10 seconds for the rate element to appear
-            wait = WebDriverWait(driver, 10)
-            
-            # Use CSS selector for data-testid attribute
-            rate_elem = wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, 'p[data-testid="dynamic-yields-table"]'))
-            )
+        while clicks < max_attempts:
+            page_wait = WebDriverWait(driver, source_time_left(BANKRATE_PAGE_TIMEOUT), poll_frequency=BANKRATE_POLL_INTERVAL,
+                                      ignored_exceptions=(StaleElementReferenceException,))
+            current_count = len(driver.find_elements(By.CLASS_NAME, 'wrt-RateCard-content'))
+            print(f"  Currently loaded {current_count} cards...")
             
-            rate_text = rate_elem.text.strip()
-            print(f"Found element with Selenium. Text: '{rate_text}'")
+            see_more_button = find_bankrate_show_more(driver)
+            if see_more_button is None:
+                print(f"  No 'See more' button left. Finished loading all cards.")
+                break
             
-            rate = extract_rate(rate_text)
+            # Scroll instantly (no smooth-scroll animation to wait out) and click with JavaScript
+            # to avoid any interception issues
+            driver.execute_script("arguments[0].scrollIntoView({block: 'center'}); arguments[0].click();", see_more_button)
+            clicks += 1
             
-            if rate and 0.1 <= rate <= 10:
-                print(f"✓ Selenium scrape successful: {rate}%")
-                driver.quit()
-                return rate
-            else:
-                print(f"✗ Could not extract valid rate from text: '{rate_text}'")
-                
-        except Exception as e:
-            print(f"✗ Selenium error: {str(e)}")
-            # Try alternative selectors
+            start = time.perf_counter()
             try:
-                print("Trying alternative selector strategies...")
-                # Look for any p with APY text
-                p_elements = driver.find_elements(By.TAG_NAME, 'p')
-                for elem in p_elements:
-                    text = elem.text.strip()
-                    if '%' in text and 'APY' in text:
-                        rate = extract_rate(text)
-                        if rate and 0.1 <= rate <= 10:
-                            print(f"✓ Found rate via alternative method: {rate}%")
-                            driver.quit()
-                            return rate
-            except:
-                pass
-        finally:
-            driver.quit()
-        
-        return None
-        
-    except Exception as e:
-        print(f"✗ Error scraping {bank_name}: {str(e)}")
-        return None
-
-def scrape_betterment_page(bank_name, url, driver=None):
-    """Betterment requires Selenium - can accept reused driver for efficiency"""
-    try:
-        print(f"Attempting to scrape {bank_name}...")
-        
-        # If driver provided, skip static HTML and use it directly
-        if driver is not None:
-            try:
-                driver.get(url)
-                wait = WebDriverWait(driver, 10)
-                rate_elem = wait.until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, 'h1.item-title'))
-                )
-                rate_text = rate_elem.text.strip()
-                rate = extract_rate(rate_text)
-                if rate and 0.1 <= rate <= 10:
-                    print(f"✓ Selenium scrape successful: {rate}%")
-                    return rate
-                else:
-                    print(f"✗ Could not extract valid rate from text: '{rate_text}'")
-            except Exception as e:
-                print(f"✗ Selenium error: {str(e)}")
-            return None
-        
-        # Original code path if no driver provided (fallback)
-        # Try static HTML first
-        headers = {
-            'User-Agent': USER_AGENT,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1',
-            'Sec-Fetch-Dest': 'document',
-            'Sec-Fetch-Mode': 'navigate',
-            'Sec-Fetch-Site': 'none',
-            'Cache-Control': 'max-age=0'
-        }
-        response = requests.get(url, headers=headers, timeout=15, allow_redirects=True)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Try to find rate element - h1 with class="item-title"
-        rate_elem = soup.find('h1', class_='item-title')
-        
-        if rate_elem:
-            rate_text = rate_elem.get_text(strip=True)
-            rate = extract_rate(rate_text)
-            if rate and 0.1 <= rate <= 10:
-                print(f"✓ Static scrape successful: {rate}%")
-                return rate
-        
-        # If static scraping failed, use Selenium
-        print("Static HTML didn't work, trying Selenium with JavaScript rendering...")
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument(f'user-agent={USER_AGENT}')
+                page_wait.until(bankrate_cards_loaded(current_count))
+                # The button can vanish just before the last page of cards renders
+                if len(driver.find_elements(By.CLASS_NAME, 'wrt-RateCard-content')) == current_count:
+                    WebDriverWait(driver, source_time_left(2), poll_frequency=BANKRATE_POLL_INTERVAL).until(
+                        lambda d: len(d.find_elements(By.CLASS_NAME, 'wrt-RateCard-content')) > current_count
+                    )
+            except TimeoutException:
+                print(f"  No new cards after clicking 'See more'. Total: {current_count}")
+                break
+            finally:
+                waited += time.perf_counter() - start
         
-        driver = create_chrome_driver()
+        fixed_sleep_cost = clicks * 3
+        print(f"  {clicks} 'See more' click(s), {waited:.1f}s waiting for cards "
+              f"(fixed sleeps: {fixed_sleep_cost}s, saved ~{max(fixed_sleep_cost - waited, 0):.1f}s)")
+        record.update(clicks=clicks, wait_ms=round(waited * 1000, 1))
         
+        # Hand only the rate cards' markup to the parser instead of the whole rendered page
         try:
-            driver.get(url)
-            
-            # Wait up to 10 seconds for the rate element to appear
-            wait = WebDriverWait(driver, 10)
-            
-            # Use CSS selector for h1.item-title
-            rate_elem = wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, 'h1.item-title'))
+            html = driver.execute_script(
+                "return Array.from(document.querySelectorAll('div.wrt-RateCard-content')).map(e => e.outerHTML).join('');"
             )
-            
-            rate_text = rate_elem.text.strip()
-            print(f"Found element with Selenium. Text: '{rate_text}'")
-            
-            rate = extract_rate(rate_text)
-            
-            if rate and 0.1 <= rate <= 10:
-                print(f"✓ Selenium scrape successful: {rate}%")
-                driver.quit()
-                return rate
-            else:
-                print(f"✗ Could not extract valid rate from text: '{rate_text}'")
-                
-        except Exception as e:
-            print(f"✗ Selenium error: {str(e)}")
-            # Try alternative selectors
-            try:
-                print("Trying alternative selector strategies...")
-                # Look for any h1 with APY text
-                h1_elements = driver.find_elements(By.TAG_NAME, 'h1')
-                for elem in h1_elements:
-                    text = elem.text.strip()
-                    if '%' in text and 'APY' in text:
-                        rate = extract_rate(text)
-                        if rate and 0.1 <= rate <= 10:
-                            print(f"✓ Found rate via alternative method: {rate}%")
-                            driver.quit()
-                            return rate
-            except:
-                pass
-        finally:
-            driver.quit()
-        
+        except Exception:
+            html = None
+        if not html:
+            html = driver.page_source
+        record["bytes"] = len(html)
+    finally:
+        driver.quit()
+    return html
+
+def find_json_rate_cards(data, rate_keys=APY_JSON_KEYS, name_keys=BANK_NAME_JSON_KEYS):
+    """[bank name, rate] for every JSON object that carries both an institution name and an APY."""
+    wanted_rates = {key.lower() for key in rate_keys}
+    cards = []
+    
+    def object_name(node):
+        # Prefer the institution (JSON-LD provider/brand) over a product name
+        for parent_key in ('provider', 'brand', 'advertiser', 'institution'):
+            parent = node.get(parent_key)
+            if isinstance(parent, dict) and isinstance(parent.get('name'), str):
+                return parent['name']
+        for key in name_keys:
+            if isinstance(node.get(key), str) and node[key].strip():
+                return node[key]
         return None
-        
+    
+    def walk(node):
+        if isinstance(node, dict):
+            name = object_name(node)
+            if name:
+                for key, value in node.items():
+                    if key.lower() in wanted_rates:
+                        rate = _json_rate(value)
+                        if rate is not None:
+                            cards.append([re.sub(r'[®™]', '', name).strip(), rate])
+                            return
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for item in node:
+                walk(item)
+    
+    walk(data)
+    return cards
+
+def fetch_bankrate_cards_direct():
+    """Read Bankrate's rate cards from JSON embedded in the static page; None if it isn't a full listing."""
+    try:
+        with span("fetch", "Bankrate") as record:
+            page = fetch_page(AGGREGATE_SOURCES[1])
+            record.update(page.metrics())
+        with span("parse", "Bankrate", strategy="direct") as record:
+            cards = get_cached_parse(page, 'bankrate:direct')
+            if cards is None:
+                soup = make_soup(page.body, 'script')
+                best = {}
+                for blob in extract_embedded_json(soup):
+                    for bank_name, rate in find_json_rate_cards(blob):
+                        if bank_name not in best or rate > best[bank_name]:
+                            best[bank_name] = rate
+                cards = [[bank_name, rate] for bank_name, rate in best.items()]
+                remember_parse(page, 'bankrate:direct', cards)
+            record["cards"] = len(cards)
     except Exception as e:
-        print(f"✗ Error scraping {bank_name}: {str(e)}")
+        print(f"  ✗ Bankrate direct data error: {str(e)}")
+        return None
+    
+    if len(cards) < BANKRATE_DIRECT_MIN_CARDS:
+        print(f"  Bankrate embedded data has {len(cards)} rate card(s), rendering the page instead...")
+        return None
+    print(f"  ✓ Read {len(cards)} Bankrate rate cards from embedded page data (no browser needed)")
+    return cards
+
+def fetch_bankrate_cards():
+    """Bankrate [bank name, rate] pairs: embedded page data when it's complete, otherwise a Selenium render."""
+    cards = fetch_bankrate_cards_direct()
+    if cards is None and OFFLINE_REPLAY:
+        print("  Offline replay: no Chrome to render Bankrate, skipping it")
         return None
+    return cards or render_bankrate_cards()
+
+AGGREGATE_FETCHERS = {
+    "Investopedia": fetch_investopedia_cards,
+    "Bankrate": fetch_bankrate_cards
+}
+
+def scrape_aggregate_source(source):
+    """
+    Fetch one aggregate site. Returns (source, [bank name, rate] pairs, fetched_at), with None in
+    place of the pairs if it failed.
+    """
+    try:
+        return source, AGGREGATE_FETCHERS[source](), int(time.time())
+    except Exception as e:
+        print(f"Error scraping {source}: {str(e)}")
+        return source, None, int(time.time())
+
+def join_aggregate_results(aggregate_cards, observations, failed_scrapes):
+    """
+    Match aggregate-site cards against tracked banks once every source has finished and record each
+    card as a (source, bank, rate, fetched_at) observation. Sources are joined in AGGREGATE_FETCHERS
+    order regardless of which finished first.
+    """
+    for source in AGGREGATE_FETCHERS:
+        cards, fetched_at = aggregate_cards.get(source, (None, None))
+        if cards is None:
+            failed_scrapes.append(source)
+            continue
+        
+        with span("match", source, cards=len(cards)):
+            my_banks, other_banks = match_aggregate_cards(source, cards)
+        for bank, rate in list(my_banks.items()) + list(other_banks.items()):
+            observations.append((source, bank, rate, fetched_at))
+
+def load_observation_frame(since=None):
+    """Stored observations (taken at or after `since`) as a (ts, source, bank, rate, fetched_at) frame."""
+    rows = [(record["ts"], *observation)
+            for record in read_log_records(OBSERVATIONS_LOG_FILE, since=since)
+            for observation in record["observations"]]
+    return pd.DataFrame(rows, columns=['ts', 'source', 'bank', 'rate', 'fetched_at'])
+
+def learn_source_weights(frame):
+    """
+    Vote weight per source: the log-odds of how often it agreed with the other sources listing the same
+    bank in the same run, smoothed towards SOURCE_RELIABILITY_PRIORS. Log-odds make the votes add up
+    like independent evidence, so a source that is right 95% of the time outweighs two at 75%.
+    """
+    priors = pd.Series(SOURCE_RELIABILITY_PRIORS, dtype=float)
+    agreements = pd.Series(0.0, index=priors.index)
+    counts = pd.Series(0.0, index=priors.index)
+    if not frame.empty:
+        pairs = frame.merge(frame, on=['ts', 'bank'], suffixes=('', '_other'))
+        pairs = pairs[pairs['source'] != pairs['source_other']]
+        pairs['agree'] = (pairs['rate'] - pairs['rate_other']).abs() <= RECONCILE_TOLERANCE
+        per_observation = pairs.groupby(['ts', 'bank', 'source'])['agree'].mean()
+        totals = per_observation.groupby(level='source').agg(['sum', 'count'])
+        agreements = totals['sum'].reindex(priors.index, fill_value=0.0)
+        counts = totals['count'].reindex(priors.index, fill_value=0.0)
+    reliability = (agreements + SOURCE_PRIOR_STRENGTH * priors) / (counts + SOURCE_PRIOR_STRENGTH)
+    return np.log(reliability / (1 - reliability)).clip(lower=0.01)
+
+def reconcile_observations(observations, weights):
+    """
+    Consensus table, one row per bank: the rate with the most source weight behind it (ties go to the
+    higher rate), the share of weight it got, the low/high quotes, how many sources listed the bank,
+    whether an aggregate site listed it, and a disagreement flag when quotes differ by more than
+    RECONCILE_TOLERANCE.
+    """
+    frame = pd.DataFrame(observations, columns=['source', 'bank', 'rate', 'fetched_at'])
+    if frame.empty:
+        return pd.DataFrame(columns=['rate', 'support', 'low', 'high', 'sources', 'listed', 'fetched_at', 'disagreement'])
+    # A source listing a bank under two spellings counts once, at its higher rate
+    frame = frame.sort_values('rate', kind='stable').drop_duplicates(['source', 'bank'], keep='last')
+    frame['weight'] = frame['source'].map(weights).fillna(float(weights.min()))
+    frame['listed'] = frame['source'] != 'direct'
+    
+    votes = frame.groupby(['bank', 'rate'], as_index=False)['weight'].sum()
+    winners = votes.sort_values(['weight', 'rate'], kind='stable').drop_duplicates('bank', keep='last').set_index('bank')
+    table = frame.groupby('bank').agg(low=('rate', 'min'), high=('rate', 'max'), sources=('source', 'size'),
+                                      listed=('listed', 'any'), fetched_at=('fetched_at', 'max'), total=('weight', 'sum'))
+    table['rate'] = winners['rate']
+    table['support'] = (winners['weight'] / table['total']).round(2)
+    table['disagreement'] = (table['high'] - table['low']) > RECONCILE_TOLERANCE
+    table = table[['rate', 'support', 'low', 'high', 'sources', 'listed', 'fetched_at', 'disagreement']]
+    
+    for bank in table.index[table['disagreement']]:
+        quotes = frame[frame['bank'] == bank].sort_values('weight', ascending=False)
+        print(f"⚠️ Sources disagree on {bank}: " + ", ".join(f"{source} {rate:.2f}%" for source, rate in zip(quotes['source'], quotes['rate']))
+              + f" -> using {table.at[bank, 'rate']:.2f}% ({table.at[bank, 'support']:.0%} of the weight)")
+    return table
+
+def _fsync_dir(path):
+    """Flush a directory entry so a rename inside it survives a crash (no-op where unsupported)."""
+    try:
+        fd = os.open(os.path.dirname(path) or '.', os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _same_content(path, payload):
+    try:
+        if os.path.getsize(path) != len(payload):
+            return False
+        with open(path, 'rb') as f:
+            return f.read() == payload
+    except OSError:
+        return False
+
+def _stage_file(path, payload):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    return tmp_path
+
+def _install_file(path, tmp_path):
+    """Rename a staged file into place; the version it replaces is kept as the .bak recovery copy."""
+    if os.path.exists(path):
+        backup_path = path + '.bak'
+        if os.path.exists(backup_path):
+            os.remove(backup_path)
+        try:
+            os.link(path, backup_path)
+        except OSError:
+            shutil.copy2(path, backup_path)
+    os.replace(tmp_path, path)
+    _fsync_dir(path)
+
+def atomic_write_json(path, data, indent=4):
+    """
+    Write JSON via a temp file renamed into place, so readers only ever see the old or the new file.
+    Returns False, writing nothing, when the content is unchanged.
+    """
+    payload = json.dumps(data, indent=indent).encode('utf-8')
+    if _same_content(path, payload):
+        return False
+    _install_file(path, _stage_file(path, payload))
+    return True
+
+def load_json_file(path, default, required=True):
+    """
+    Load a JSON data file, detecting corruption. A missing file gives `default`; a corrupt one is restored
+    from its .bak copy. With no readable copy a required file raises instead of letting the run overwrite
+    it with an empty default; other files fall back to `default` with a warning.
+    """
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ {path} is unreadable ({str(e)})")
+    backup_path = path + '.bak'
+    try:
+        with open(backup_path, 'rb') as f:
+            payload = f.read()
+        data = json.loads(payload)
+    except (OSError, ValueError):
+        if required:
+            raise RuntimeError(f"{path} is corrupt and has no readable backup - restore it before running again")
+        print(f"⚠️ No readable backup of {path}, continuing with an empty default")
+        return default
+    os.replace(_stage_file(path, payload), path)
+    _fsync_dir(path)
+    print(f"✓ Recovered {path} from {backup_path}")
+    return data
+
+
+class PersistJournal:
+    """Makes one run's writes land together.
+
+    Files that will be appended to have their sizes recorded first, so an interrupted run is
+    rolled back by truncating them; whole-file JSON writes are staged as .tmp files and only
+    renamed into place once the journal is marked committed. recover_journal() finishes or
+    rolls back a run that died part-way, on the next start.
+    """
+
+    def __init__(self, append_paths=()):
+        self.appends = {path: os.path.getsize(path) if os.path.exists(path) else None for path in append_paths}
+        self.staged = {}
+        self._save(committed=False)
+
+    def _save(self, committed):
+        payload = json.dumps({"committed": committed, "appends": self.appends, "staged": self.staged}).encode('utf-8')
+        os.replace(_stage_file(JOURNAL_FILE, payload), JOURNAL_FILE)
+        _fsync_dir(JOURNAL_FILE)
+
+    def write_json(self, path, data, indent=4):
+        """Stage a whole-file JSON write; returns False (nothing staged) when the content is unchanged."""
+        return self.write_bytes(path, json.dumps(data, indent=indent).encode('utf-8'))
+
+    def write_bytes(self, path, payload):
+        """Stage a whole-file write; returns False (nothing staged) when the content is unchanged."""
+        if _same_content(path, payload):
+            return False
+        self.staged[path] = _stage_file(path, payload)
+        self._save(committed=False)
+        return True
+
+    def commit(self):
+        self._save(committed=True)
+        _roll_forward(self.staged)
+
+    def rollback(self):
+        _roll_back(self.appends, self.staged)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+
+def _roll_forward(staged):
+    for path, tmp_path in staged.items():
+        if os.path.exists(tmp_path):
+            _install_file(path, tmp_path)
+    os.remove(JOURNAL_FILE)
+
+def _roll_back(appends, staged):
+    for path, size in appends.items():
+        if not os.path.exists(path):
+            continue
+        if size is None:
+            os.remove(path)
+        elif os.path.getsize(path) > size:
+            with open(path, 'r+b') as f:
+                f.truncate(size)
+                os.fsync(f.fileno())
+    for tmp_path in staged.values():
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    os.remove(JOURNAL_FILE)
+
+def recover_journal():
+    """Finish (if it had committed) or roll back (if not) a run that was interrupted while saving."""
+    if not os.path.exists(JOURNAL_FILE):
+        return
+    with open(JOURNAL_FILE, 'r') as f:
+        journal = json.load(f)
+    if journal["committed"]:
+        print("⚠️ Previous run stopped while committing its data - finishing the commit")
+        _roll_forward(journal["staged"])
+    else:
+        print("⚠️ Previous run stopped while saving its data - rolling back its partial writes")
+        _roll_back(journal["appends"], journal["staged"])
+
+def journaled_append_paths():
+    """Append-only files each run writes: the observation log plus the configured storage's (SQLite and parquet commit on their own)."""
+    paths = [OBSERVATIONS_LOG_FILE, _log_index_path(OBSERVATIONS_LOG_FILE)]
+    if STORAGE_BACKEND == "ndjson":
+        for path in (HISTORY_LOG_FILE, MARKET_RATES_LOG_FILE):
+            paths += [path, _log_index_path(path)]
+    if os.path.exists(BINARY_HISTORY_FILE):
+        paths.append(BINARY_HISTORY_FILE)
+    return paths
+
+def parse_snapshot_date(date):
+    """
+    Epoch seconds for a snapshot's "date" label. Current labels are "%Y-%m-%d %I:%M %p CT" (Chicago time);
+    the oldest snapshots used a bare "%Y-%m-%d %H:%M" written on the UTC runner.
+    """
+    if date.endswith(' CT'):
+        local_time = datetime.strptime(date[:-3], "%Y-%m-%d %I:%M %p")
+        return int(pytz.timezone("America/Chicago").localize(local_time).timestamp())
+    return int(pytz.utc.localize(datetime.strptime(date, "%Y-%m-%d %H:%M")).timestamp())
+
+def entry_ts(entry):
+    """A snapshot's canonical UTC epoch seconds ("ts"), parsing the label for records written before it existed."""
+    return entry['ts'] if 'ts' in entry else parse_snapshot_date(entry['date'])
+
+def _epoch_seconds(times):
+    return (times - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)
+
+def add_epoch_timestamps(records):
+    """
+    Vectorized parse of every record's "date" label into a leading "ts" field (records that already
+    have one are kept as-is). Same rules as parse_snapshot_date: "CT" labels are Chicago time, bare ones UTC.
+    """
+    missing = [i for i, record in enumerate(records) if 'ts' not in record]
+    if not missing:
+        return records
+    dates = pd.Series([records[i]['date'] for i in missing])
+    central = dates.str.endswith(' CT')
+    parsed = pd.Series(0, index=dates.index, dtype='int64')
+    if central.any():
+        local_times = pd.to_datetime(dates[central].str[:-3], format="%Y-%m-%d %I:%M %p")
+        parsed[central] = _epoch_seconds(local_times.dt.tz_localize(
+            "America/Chicago", ambiguous=np.zeros(len(local_times), dtype=bool), nonexistent='shift_forward'))
+    if (~central).any():
+        parsed[~central] = _epoch_seconds(pd.to_datetime(dates[~central], format="%Y-%m-%d %H:%M").dt.tz_localize("UTC"))
+    records = list(records)
+    for i, ts in zip(missing, parsed.tolist()):
+        records[i] = {"ts": ts, **records[i]}
+    return records
+
+LOG_OFFSET = struct.Struct('<Q')  # One little-endian uint64 byte offset per record in a log's .idx sidecar
+
+def _log_index_path(path):
+    return path + '.idx'
+
+def _rebuild_log_index(path):
+    """Rescan a log and rewrite its offset index, truncating a torn final line left by a crash mid-append."""
+    offsets = []
+    with open(path, 'r+b') as f:
+        offset = 0
+        for line in iter(f.readline, b''):
+            if not line.endswith(b'\n'):
+                f.truncate(offset)
+                break
+            offsets.append(offset)
+            offset += len(line)
+    with open(_log_index_path(path), 'wb') as f:
+        f.write(b''.join(LOG_OFFSET.pack(offset) for offset in offsets))
+        f.flush()
+        os.fsync(f.fileno())
+    return offsets
+
+def _check_log(path):
+    """
+    O(1) consistency check: the index must point at a complete last line that ends exactly at EOF.
+    Anything else (missing index, append interrupted between log and index) triggers a rebuild.
+    """
+    index_path = _log_index_path(path)
+    if not os.path.exists(index_path):
+        _rebuild_log_index(path)
+        return
+    index_size = os.path.getsize(index_path)
+    log_size = os.path.getsize(path)
+    if index_size % LOG_OFFSET.size:
+        _rebuild_log_index(path)
+        return
+    if index_size == 0:
+        if log_size:
+            _rebuild_log_index(path)
+        return
+    with open(index_path, 'rb') as f:
+        f.seek(index_size - LOG_OFFSET.size)
+        last_offset, = LOG_OFFSET.unpack(f.read(LOG_OFFSET.size))
+    with open(path, 'rb') as f:
+        f.seek(last_offset)
+        line = f.readline()
+        if not line.endswith(b'\n') or f.tell() != log_size:
+            _rebuild_log_index(path)
+
+def count_log_records(path):
+    if not os.path.exists(path):
+        return 0
+    _check_log(path)
+    return os.path.getsize(_log_index_path(path)) // LOG_OFFSET.size
+
+def _log_offset(index_file, position):
+    index_file.seek(position * LOG_OFFSET.size)
+    return LOG_OFFSET.unpack(index_file.read(LOG_OFFSET.size))[0]
+
+def _log_record_at(index_file, f, position):
+    f.seek(_log_offset(index_file, position))
+    return json.loads(f.readline())
+
+def _read_log(path, last=None, since=None, keyframe_key=None):
+    """
+    Records from the first one selected by `last`/`since` to the end, plus how many leading records
+    were read only as context: with `keyframe_key`, reading starts at the nearest earlier record holding that key.
+    """
+    total = count_log_records(path)
+    if total == 0:
+        return [], 0
+    start = 0 if last is None else max(total - last, 0)
+    with open(_log_index_path(path), 'rb') as index_file, open(path, 'rb') as f:
+        if since is not None:
+            low, high = start, total
+            while low < high:
+                middle = (low + high) // 2
+                if entry_ts(_log_record_at(index_file, f, middle)) < since:
+                    low = middle + 1
+                else:
+                    high = middle
+            start = low
+        if start == total:
+            return [], 0
+        first = start
+        if keyframe_key is not None:
+            while first > 0 and keyframe_key not in _log_record_at(index_file, f, first):
+                first -= 1
+        f.seek(_log_offset(index_file, first))
+        return [json.loads(line) for line in f], start - first
+
+def read_log_records(path, last=None, since=None):
+    """
+    Read a log's records in order. `last` seeks straight to the final N via the offset index;
+    `since` (epoch seconds) binary-searches the index on each record's timestamp.
+    """
+    return _read_log(path, last, since)[0]
+
+def _write_log(path, records):
+    """Replace a whole log (and its index) with `records`, via temp files renamed into place."""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        for record in records:
+            f.write((json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8'))
+        f.flush()
+        os.fsync(f.fileno())
+    _rebuild_log_index(tmp_path)
+    os.replace(_log_index_path(tmp_path), _log_index_path(path))
+    os.replace(tmp_path, path)
+
+def append_log_record(path, record):
+    """Append one record as a JSON line, fsync it, then fsync its offset into the index."""
+    if os.path.exists(path):
+        _check_log(path)
+    line = (json.dumps(record, separators=(',', ':')) + '\n').encode('utf-8')
+    with open(path, 'ab') as f:
+        offset = f.seek(0, os.SEEK_END)
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+    with open(_log_index_path(path), 'ab') as f:
+        f.write(LOG_OFFSET.pack(offset))
+        f.flush()
+        os.fsync(f.fileno())
+
+def _load_json_list(path):
+    return load_json_file(path, [])
+
+def migrate_json_history():
+    """
+    One-time conversion of the legacy history JSON arrays into append-only logs.
+    Logs that already exist are left alone; the JSON files are kept as a backup but no longer written.
+    """
+    for json_path, log_path in ((HISTORY_FILE, HISTORY_LOG_FILE), (MARKET_RATES_HISTORY_FILE, MARKET_RATES_LOG_FILE)):
+        if os.path.exists(log_path) or not os.path.exists(json_path):
+            continue
+        records = add_epoch_timestamps(_load_json_list(json_path))
+        _write_log(log_path, encode_market_snapshots(records) if log_path == MARKET_RATES_LOG_FILE else records)
+        print(f"✓ Migrated {len(records)} snapshots from {json_path} to {log_path}")
+
+def market_log_record(snapshot, previous_banks=None, since_keyframe=0):
+    """
+    Encode a market snapshot for the log: a keyframe with the full "banks" dict, or a delta holding only
+    "changed" (new or re-rated) and "removed" banks against the previous snapshot. A keyframe is written
+    when there is no previous snapshot, every MARKET_KEYFRAME_INTERVAL records, or when most banks changed.
+    """
+    banks = snapshot['banks']
+    if previous_banks is None or since_keyframe + 1 >= MARKET_KEYFRAME_INTERVAL:
+        return snapshot
+    changed = {bank: rate for bank, rate in banks.items() if previous_banks.get(bank) != rate}
+    removed = [bank for bank in previous_banks if bank not in banks]
+    if len(changed) + len(removed) > len(banks) / 2:
+        return snapshot
+    record = {"ts": snapshot['ts'], "date": snapshot['date'], "changed": changed}
+    if removed:
+        record["removed"] = removed
+    return record
+
+def encode_market_snapshots(snapshots):
+    """Keyframe + delta log records for a full list of market snapshots."""
+    records = []
+    previous_banks = None
+    since_keyframe = 0
+    for snapshot in snapshots:
+        record = market_log_record(snapshot, previous_banks, since_keyframe)
+        since_keyframe = 0 if 'banks' in record else since_keyframe + 1
+        previous_banks = snapshot['banks']
+        records.append(record)
+    return records
+
+def decode_market_records(records):
+    """Expand keyframe + delta records (starting at a keyframe) into full {"ts", "date", "banks"} snapshots."""
+    snapshots = []
+    banks = {}
+    for record in records:
+        if 'banks' in record:
+            banks = dict(record['banks'])
+        else:
+            banks = dict(banks)
+            for bank in record.get('removed', []):
+                banks.pop(bank, None)
+            banks.update(record['changed'])
+        snapshots.append({"ts": entry_ts(record), "date": record['date'], "banks": banks})
+    return snapshots
+
+def read_market_log(last=None, since=None):
+    """Market snapshots from the delta-encoded log; only the records back to the preceding keyframe are replayed."""
+    records, skip = _read_log(MARKET_RATES_LOG_FILE, last, since, keyframe_key='banks')
+    return decode_market_records(records)[skip:]
+
+def append_market_snapshot(snapshot):
+    """Append a market snapshot as a delta against the latest one (or as a keyframe)."""
+    records, _ = _read_log(MARKET_RATES_LOG_FILE, last=1, keyframe_key='banks')
+    previous_banks = decode_market_records(records)[-1]['banks'] if records else None
+    append_log_record(MARKET_RATES_LOG_FILE, market_log_record(snapshot, previous_banks, len(records) - 1))
+
+def compact_market_history():
+    """Re-encode the whole market log as keyframes + deltas (e.g. after migrating full snapshots)."""
+    if not os.path.exists(MARKET_RATES_LOG_FILE):
+        print(f"No market log at {MARKET_RATES_LOG_FILE}")
+        return
+    size_before = os.path.getsize(MARKET_RATES_LOG_FILE)
+    records = encode_market_snapshots(read_market_log())
+    _write_log(MARKET_RATES_LOG_FILE, records)
+    keyframes = sum('banks' in record for record in records)
+    print(f"✓ Compacted {MARKET_RATES_LOG_FILE}: {len(records)} snapshots ({keyframes} keyframes), "
+          f"{size_before / 1024:.0f}KB -> {os.path.getsize(MARKET_RATES_LOG_FILE) / 1024:.0f}KB")
+
+def load_legacy_snapshots(source):
+    """All snapshots of a source from the NDJSON logs if they exist, else from the JSON files."""
+    if source == "tracked":
+        return read_log_records(HISTORY_LOG_FILE) if os.path.exists(HISTORY_LOG_FILE) else _load_json_list(HISTORY_FILE)
+    return read_market_log() if os.path.exists(MARKET_RATES_LOG_FILE) else _load_json_list(MARKET_RATES_HISTORY_FILE)
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    snapshot_ts INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    date TEXT NOT NULL,
+    PRIMARY KEY (snapshot_ts, source)
+);
+CREATE TABLE IF NOT EXISTS rates (
+    snapshot_ts INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    bank TEXT NOT NULL,
+    apy REAL NOT NULL,
+    PRIMARY KEY (snapshot_ts, source, bank)
+);
+CREATE INDEX IF NOT EXISTS idx_rates_bank_ts ON rates (bank, snapshot_ts);
+CREATE INDEX IF NOT EXISTS idx_rates_ts ON rates (snapshot_ts);
+"""
+
+# Snapshot source in the rate store -> key holding its rates in the JSON snapshot shape
+SNAPSHOT_SOURCES = {"tracked": "rates", "market": "banks"}
+
+def open_rate_db(path=SQLITE_DB_FILE):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SQLITE_SCHEMA)
+    return conn
+
+def sqlite_insert_snapshots(conn, source, entries):
+    """Batch-insert JSON-shaped snapshots as (snapshot_ts, date) + one rate row per bank, in one transaction."""
+    rates_key = SNAPSHOT_SOURCES[source]
+    snapshot_rows = []
+    rate_rows = []
+    for entry in entries:
+        snapshot_ts = entry_ts(entry)
+        snapshot_rows.append((snapshot_ts, source, entry['date']))
+        rate_rows.extend((snapshot_ts, source, bank, apy) for bank, apy in entry[rates_key].items())
+    with conn:
+        conn.executemany("INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?)", snapshot_rows)
+        conn.executemany("INSERT OR REPLACE INTO rates VALUES (?, ?, ?, ?)", rate_rows)
+
+def sqlite_load_snapshots(source, last=None, since=None):
+    """Rebuild the last N snapshots (or those at/after `since`) of a source in the JSON shape, oldest first."""
+    rates_key = SNAPSHOT_SOURCES[source]
+    with closing(open_rate_db()) as conn:
+        snapshots = conn.execute(
+            "SELECT snapshot_ts, date FROM snapshots WHERE source = ? AND snapshot_ts >= ? ORDER BY snapshot_ts DESC LIMIT ?",
+            (source, since or 0, -1 if last is None else last)
+        ).fetchall()
+        if not snapshots:
+            return []
+        snapshots.reverse()
+        entries = {snapshot_ts: {"ts": snapshot_ts, "date": date, rates_key: {}} for snapshot_ts, date in snapshots}
+        rows = conn.execute(
+            "SELECT snapshot_ts, bank, apy FROM rates WHERE snapshot_ts >= ? AND source = ? ORDER BY snapshot_ts, rowid",
+            (snapshots[0][0], source)
+        )
+        for snapshot_ts, bank, apy in rows:
+            entries[snapshot_ts][rates_key][bank] = apy
+    return list(entries.values())
+
+def migrate_history_to_sqlite():
+    """One-time load of the existing history (NDJSON logs, else the JSON files) into an empty rate store."""
+    with closing(open_rate_db()) as conn:
+        if conn.execute("SELECT 1 FROM snapshots LIMIT 1").fetchone():
+            return
+        for source in SNAPSHOT_SOURCES:
+            entries = load_legacy_snapshots(source)
+            sqlite_insert_snapshots(conn, source, entries)
+            print(f"✓ Migrated {len(entries)} {source} snapshots into {SQLITE_DB_FILE}")
+
+def _require_parquet():
+    if not PARQUET_AVAILABLE:
+        raise RuntimeError("The parquet archive needs pyarrow (pip install pyarrow)")
+
+def snapshots_to_frame(source, entries):
+    """Long (snapshot_ts, date, source, bank, apy, month) frame for JSON-shaped snapshots."""
+    rates_key = SNAPSHOT_SOURCES[source]
+    rows = []
+    for entry in entries:
+        snapshot_ts = entry_ts(entry)
+        rows.extend((snapshot_ts, entry['date'], bank, apy) for bank, apy in entry[rates_key].items())
+        if not entry[rates_key]:
+            # Placeholder row so a run that found no banks still round-trips as an (empty) snapshot
+            rows.append((snapshot_ts, entry['date'], None, float('nan')))
+    frame = pd.DataFrame(rows, columns=['snapshot_ts', 'date', 'bank', 'apy'])
+    frame['snapshot_ts'] = frame['snapshot_ts'].astype('int64')
+    frame['source'] = source
+    frame['apy'] = frame['apy'].astype('float32')
+    frame['month'] = pd.to_datetime(frame['snapshot_ts'], unit='s', utc=True).dt.strftime('%Y-%m')
+    for column in ('date', 'source', 'bank'):
+        frame[column] = frame[column].astype('category')
+    return frame
+
+def write_parquet_snapshots(source, entries, path=PARQUET_DIR):
+    """Append snapshots to the month-partitioned dataset; each write adds new files, never rewrites old months."""
+    _require_parquet()
+    frame = snapshots_to_frame(source, entries)
+    if not frame.empty:
+        frame.to_parquet(path, engine='pyarrow', partition_cols=['month'], index=False)
+
+def _finish_parquet_swap():
+    """Complete an archive swap interrupted between its two renames (the staged archive was already complete)."""
+    staging, retired = PARQUET_DIR + '.tmp', PARQUET_DIR + '.old'
+    if not os.path.exists(PARQUET_DIR) and os.path.exists(retired):
+        os.replace(staging if os.path.exists(staging) else retired, PARQUET_DIR)
+    shutil.rmtree(retired, ignore_errors=True)
+
+def rewrite_parquet_archive(sources):
+    """
+    Replace the whole archive with (source, entries) pairs. The new archive is written to a sibling
+    directory and swapped in, so a failed write leaves the old one (tracked history included) intact.
+    """
+    _require_parquet()
+    _finish_parquet_swap()
+    staging, retired = PARQUET_DIR + '.tmp', PARQUET_DIR + '.old'
+    shutil.rmtree(staging, ignore_errors=True)
+    for source, entries in sources:
+        write_parquet_snapshots(source, entries, staging)
+    if os.path.exists(PARQUET_DIR):
+        os.replace(PARQUET_DIR, retired)
+    if os.path.exists(staging):
+        os.replace(staging, PARQUET_DIR)
+    shutil.rmtree(retired, ignore_errors=True)
+
+def read_parquet_rows(source, since=None, columns=('snapshot_ts', 'date', 'bank', 'apy')):
+    """Rows for one source, pruned to the month partitions on/after `since` (epoch seconds)."""
+    _require_parquet()
+    if not os.path.exists(PARQUET_DIR):
+        return pd.DataFrame(columns=list(columns))
+    filters = [('source', '==', source)]
+    if since is not None:
+        filters.append(('month', '>=', datetime.fromtimestamp(since, pytz.utc).strftime('%Y-%m')))
+    frame = pd.read_parquet(PARQUET_DIR, engine='pyarrow', columns=list(columns), filters=filters)
+    if since is not None:
+        frame = frame[frame['snapshot_ts'] >= since]
+    # A re-run within the same minute appends the snapshot again; keep one row per bank per snapshot
+    return frame.drop_duplicates(['snapshot_ts', 'bank'], keep='last').sort_values('snapshot_ts', kind='stable')
+
+def parquet_load_snapshots(source, last=None, since=None):
+    """Rebuild the last N snapshots (or those at/after `since`) of a source in the JSON shape, oldest first."""
+    rates_key = SNAPSHOT_SOURCES[source]
+    frame = read_parquet_rows(source, since)
+    if frame.empty:
+        return []
+    snapshot_times = frame['snapshot_ts'].unique()
+    if last is not None:
+        frame = frame[frame['snapshot_ts'] >= snapshot_times[-last:][0]]
+    entries = []
+    for (snapshot_ts, date), group in frame.groupby(['snapshot_ts', 'date'], sort=True, observed=True):
+        group = group.dropna(subset=['apy'])
+        entries.append({"ts": int(snapshot_ts), "date": date, rates_key: dict(zip(group['bank'].astype(str), group['apy'].astype(float).round(4)))})
+    return entries
+
+def migrate_history_to_parquet():
+    """One-time load of the existing history (NDJSON logs, else the JSON files) into an empty archive."""
+    _require_parquet()
+    _finish_parquet_swap()
+    if os.path.exists(PARQUET_DIR):
+        return
+    sources = [(source, load_legacy_snapshots(source)) for source in SNAPSHOT_SOURCES]
+    rewrite_parquet_archive(sources)
+    for source, entries in sources:
+        print(f"✓ Migrated {len(entries)} {source} snapshots into {PARQUET_DIR}")
+
+def export_history_parquet():
+    """Rebuild the parquet archive from the configured backend's full history."""
+    _require_parquet()
+    # Read everything first: with STORAGE_BACKEND=parquet the source is the archive being replaced
+    sources = (("tracked", load_history()), ("market", load_market_history()))
+    rewrite_parquet_archive(sources)
+    for source, entries in sources:
+        print(f"✓ Exported {len(entries)} {source} snapshots to {PARQUET_DIR}")
+
+def migrate_epoch_timestamps():
+    """
+    One-time pass adding "ts" to log/JSON snapshots written before it existed.
+    The SQLite and parquet stores already key every row by snapshot_ts.
+    """
+    if STORAGE_BACKEND == "ndjson":
+        for path in (HISTORY_LOG_FILE, MARKET_RATES_LOG_FILE):
+            if not os.path.exists(path):
+                continue
+            with open(path, 'rb') as f:
+                first_line = f.readline()
+            # Every record appended since "ts" was introduced has one, so the oldest record decides
+            if not first_line or 'ts' in json.loads(first_line):
+                continue
+            records = add_epoch_timestamps(read_log_records(path))
+            _write_log(path, records)
+            print(f"✓ Added epoch timestamps to {len(records)} snapshots in {path}")
+    elif STORAGE_BACKEND == "json":
+        for path in (HISTORY_FILE, MARKET_RATES_HISTORY_FILE):
+            records = _load_json_list(path)
+            if all('ts' in record for record in records):
+                continue
+            atomic_write_json(path, add_epoch_timestamps(records))
+            print(f"✓ Added epoch timestamps to {len(records)} snapshots in {path}")
+
+def replace_market_history(entries):
+    """Overwrite the configured backend's market history with `entries`."""
+    if STORAGE_BACKEND == "json":
+        atomic_write_json(MARKET_RATES_HISTORY_FILE, entries)
+    elif STORAGE_BACKEND == "sqlite":
+        with closing(open_rate_db()) as conn:
+            # sqlite_insert_snapshots commits the delete together with the inserts
+            conn.execute("DELETE FROM rates WHERE source = 'market'")
+            sqlite_insert_snapshots(conn, "market", entries)
+    elif STORAGE_BACKEND == "parquet":
+        rewrite_parquet_archive((("tracked", load_history()), ("market", entries)))
+    else:
+        _write_log(MARKET_RATES_LOG_FILE, encode_market_snapshots(entries))
+
+def canonicalize_market_history():
+    """
+    Register every bank spelling in the market history and rewrite it under canonical names
+    (re-run after editing the registry file). The binary history is rebuilt if there is one.
+    """
+    identities = load_bank_identities()
+    entries = load_market_history()
+    spellings = set()
+    for entry in entries:
+        spellings.update(entry["banks"])
+        entry["banks"] = identities.canonicalize(entry["banks"])
+    replace_market_history(entries)
+    identities.dirty = True
+    identities.save()
+    names = {bank for entry in entries for bank in entry["banks"]}
+    print(f"✓ Canonicalized {len(entries)} market snapshots: {len(spellings)} spellings -> {len(names)} banks "
+          f"({len(identities.review)} queued for review in {BANK_IDENTITY_REVIEW_FILE})")
+    if os.path.exists(BINARY_HISTORY_FILE):
+        convert_history_to_binary()
+
+def migrate_history():
+    """Bring the configured storage backend up to date with the legacy history files (no-op once done)."""
+    if STORAGE_BACKEND == "ndjson":
+        migrate_json_history()
+        migrate_epoch_timestamps()
+    elif STORAGE_BACKEND == "sqlite":
+        migrate_history_to_sqlite()
+    elif STORAGE_BACKEND == "parquet":
+        migrate_history_to_parquet()
+    else:
+        migrate_epoch_timestamps()
+    if not os.path.exists(BANK_IDENTITY_FILE):
+        canonicalize_market_history()
+
+def _load_snapshots(source, last=None, since=None):
+    if STORAGE_BACKEND == "json":
+        path = HISTORY_FILE if source == "tracked" else MARKET_RATES_HISTORY_FILE
+        entries = _load_json_list(path)
+        if since is not None:
+            entries = entries[bisect_left([entry_ts(entry) for entry in entries], since):]
+        return entries if last is None else entries[-last:]
+    if STORAGE_BACKEND == "sqlite":
+        return sqlite_load_snapshots(source, last, since)
+    if STORAGE_BACKEND == "parquet":
+        return parquet_load_snapshots(source, last, since)
+    if source == "market":
+        return read_market_log(last, since)
+    return read_log_records(HISTORY_LOG_FILE, last, since)
+
+def load_history(last=None, since=None):
+    """
+    Tracked-bank snapshots ({"ts", "date", "rates"}), oldest first.
+    `last` limits it to the most recent N, `since` (epoch seconds) to those taken at or after it.
+    """
+    return _load_snapshots("tracked", last, since)
+
+def load_market_history(last=None, since=None):
+    """Market snapshots ({"ts", "date", "banks"}), oldest first; `last` and `since` as for load_history."""
+    return _load_snapshots("market", last, since)
+
+def load_bank_history(bank, days=90):
+    """
+    (snapshot_ts, source, apy) for one bank over the last N days, oldest first.
+    An index range lookup on the SQLite store; other backends scan their snapshots.
+    """
+    since = int(time.time()) - days * 86400
+    if STORAGE_BACKEND == "sqlite":
+        with closing(open_rate_db()) as conn:
+            return conn.execute(
+                "SELECT snapshot_ts, source, apy FROM rates WHERE bank = ? AND snapshot_ts >= ? ORDER BY snapshot_ts",
+                (bank, since)
+            ).fetchall()
+    rows = []
+    for source, entries in (("tracked", load_history(since=since)), ("market", load_market_history(since=since))):
+        rates_key = SNAPSHOT_SOURCES[source]
+        for entry in entries:
+            snapshot_ts = entry_ts(entry)
+            if bank in entry[rates_key]:
+                rows.append((snapshot_ts, source, entry[rates_key][bank]))
+    rows.sort(key=lambda row: row[0])
+    return rows
+
+def save_snapshot(ts, timestamp, main_tracked_rates, other_rates, journal=None):
+    """
+    Persist one run (UTC epoch `ts`, display label `timestamp`): the tracked-bank and market snapshots.
+    Whole-file JSON writes are staged in `journal` when one is given.
+    """
+    history_entry = {"ts": ts, "date": timestamp, "rates": main_tracked_rates}
+    market_entry = {"ts": ts, "date": timestamp, "banks": other_rates}
+    if STORAGE_BACKEND == "json":
+        for path, entry in ((HISTORY_FILE, history_entry), (MARKET_RATES_HISTORY_FILE, market_entry)):
+            records = _load_json_list(path)
+            records.append(entry)
+            (journal.write_json if journal else atomic_write_json)(path, records)
+        return
+    if STORAGE_BACKEND == "sqlite":
+        with closing(open_rate_db()) as conn:
+            sqlite_insert_snapshots(conn, "tracked", [history_entry])
+            sqlite_insert_snapshots(conn, "market", [market_entry])
+        return
+    if STORAGE_BACKEND == "parquet":
+        write_parquet_snapshots("tracked", [history_entry])
+        write_parquet_snapshots("market", [market_entry])
+        return
+    append_log_record(HISTORY_LOG_FILE, history_entry)
+    append_market_snapshot(market_entry)
 
-def scrape_investopedia(scraped_banks):
-    """Scrape ALL rates from Investopedia."""
-    my_banks = {}  # Banks from LINKS
-    other_banks = {}  # Other banks not in LINKS
-    failed = []
+def export_history_json():
+    """Write the configured backend's history back out in the original JSON array shape."""
+    for path, entries in ((HISTORY_FILE, load_history()), (MARKET_RATES_HISTORY_FILE, load_market_history())):
+        atomic_write_json(path, entries)
+        print(f"✓ Exported {len(entries)} snapshots to {path}")
+
+def benchmark_parsers(repeat=5):
+    """
+    Micro-benchmark on pages saved in the HTTP cache: the old full html.parser parse versus
+    make_soup's fast parser restricted to the subtree each scraper reads.
+    """
+    targets = {spec['url']: (bank_name, spec['parse_only']) for bank_name, spec in BANK_REGISTRY.items()}
+    targets[AGGREGATE_SOURCES[0]] = ("Investopedia", 'li')
+    targets[AGGREGATE_SOURCES[1]] = ("Bankrate", BANKRATE_CARD_STRAINER)
     
-    try:
-        headers = {
-            'User-Agent': USER_AGENT,
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Referer': 'https://www.google.com/',
-            'DNT': '1',
-            'Connection': 'keep-alive',
-            'Upgrade-Insecure-Requests': '1'
-        }
-        response = requests.get(AGGREGATE_SOURCES[0], headers=headers, timeout=15, allow_redirects=True)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Find all list items with bank data
-        # Look for <li> elements that contain both a link and a strong tag with APY
-        list_items = soup.find_all('li')
-        
-        for item in list_items:
-            # Look for bank name in <a> tag
-            link = item.find('a')
-            if not link:
-                continue
-            
-            bank_name = link.get_text(strip=True)
-            
-            # Look for APY in <strong> tag
-            strong_tags = item.find_all('strong')
-            rate = None
-            
-            for strong in strong_tags:
-                text = strong.get_text(strip=True)
-                if 'APY' in text:
-                    # Extract rate like "4.05% APY"
-                    rate_match = re.search(r'(\d+\.\d+)%', text)
-                    if rate_match:
-                        rate = float(rate_match.group(1))
-                        break
-            
-            if rate and 0.1 <= rate <= 10:
-                # Check if this matches any of tracked banks
-                matched = False
-                for my_bank in LINKS.keys():
-                    if my_bank in scraped_banks:
-                        continue
-                    
-                    aliases = BANK_ALIASES.get(my_bank, [my_bank])
-                    for alias in aliases:
-                        if alias.lower() in bank_name.lower():
-                            my_banks[my_bank] = rate
-                            print(f"    Found {my_bank} (as '{bank_name}'): {rate}%")
-                            matched = True
-                            break
-                    if matched:
-                        break
-                
-                # If not matched to my banks, add to other banks
-                if not matched:
-                    other_banks[bank_name] = rate
-        
-        print(f"    Investopedia: {len(my_banks)} tracked banks, {len(other_banks)} other banks")
-        
-    except Exception as e:
-        print(f"Error scraping Investopedia: {str(e)}")
-        failed.append("Investopedia")
+    def best_time(func):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
     
-    return my_banks, other_banks, failed
+    index = load_http_cache_index()
+    rows = []
+    for url, entry in index.items():
+        if url not in targets or not os.path.exists(_http_cache_path(entry)):
+            continue
+        label, parse_only = targets[url]
+        with gzip.open(_http_cache_path(entry), 'rb') as f:
+            body = f.read()
+        baseline = best_time(lambda: BeautifulSoup(body, 'html.parser'))
+        fast = best_time(lambda: make_soup(body, parse_only))
+        rows.append((label, len(body), baseline, fast))
+    
+    if not rows:
+        print(f"No saved pages in {HTTP_CACHE_DIR} - run the tracker once to populate the cache.")
+        return rows
+    
+    print(f"\n{'Page':<14}{'Size':>10}{'html.parser':>14}{HTML_PARSER + ' + strainer':>22}{'Speedup':>10}")
+    for label, size, baseline, fast in rows:
+        print(f"{label:<14}{size / 1024:>8.0f}KB{baseline * 1000:>12.1f}ms{fast * 1000:>20.1f}ms{baseline / fast:>9.1f}x")
+    total_baseline = sum(row[2] for row in rows)
+    total_fast = sum(row[3] for row in rows)
+    print(f"{'Total':<14}{sum(row[1] for row in rows) / 1024:>8.0f}KB{total_baseline * 1000:>12.1f}ms"
+          f"{total_fast * 1000:>20.1f}ms{total_baseline / total_fast:>9.1f}x")
+    return rows
 
-def scrape_bankrate(scraped_banks):
-    """Scrape ALL rates from Bankrate."""
-    my_banks = {}  # Banks from LINKS
-    other_banks = {}  # Other banks not in LINKS
-    failed = []
-    try:
-        print("Using Selenium to fetch Bankrate page...")
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        chrome_options.add_argument('--disable-gpu')
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument(f'user-agent={USER_AGENT}')
-        driver = create_chrome_driver()
-        driver.get(AGGREGATE_SOURCES[1])
-        
-        # Wait for initial cards to load
-        WebDriverWait(driver, 15).until(
-            lambda d: len(d.find_elements(By.CLASS_NAME, 'wrt-RateCard-content')) > 0
-        )
-        
-        # Click "See more rates" button repeatedly until all cards are loaded
-        max_attempts = 25  # Prevent infinite loop
-        attempt = 0
-        previous_count = 0
-        
-        while attempt < max_attempts:
-            current_count = len(driver.find_elements(By.CLASS_NAME, 'wrt-RateCard-content'))
-            print(f"  Currently loaded {current_count} cards...")
-            
-            # If no new cards loaded, we're done
-            if current_count == previous_count and previous_count > 0:
-                print(f"  No more cards to load. Total: {current_count}")
-                break
-            
-            previous_count = current_count
-            
-            # Try to find and click the "See more" button
-            try:
-                # Look for button with the specific class
-                see_more_button = driver.find_element(By.CLASS_NAME, 'wrt-ShowMore-button')
-                
-                # Check if button is visible and enabled
-                if see_more_button.is_displayed() and see_more_button.is_enabled():
-                    # Scroll to button and click it
-                    driver.execute_script("arguments[0].scrollIntoView({behavior: 'smooth', block: 'center'});", see_more_button)
-                    time.sleep(1)  # Wait for scroll
-                    
-                    # Click using JavaScript to avoid any interception issues
-                    driver.execute_script("arguments[0].click();", see_more_button)
-                    print(f"  Clicked 'See more rates' button...")
-                    
-                    # Wait for new cards to load
-                    time.sleep(2)
-                else:
-                    print(f"  'See more' button not clickable. Finished loading.")
-                    break
-                
-            except Exception as e:
-                # No more "See more" button found, we've loaded everything
-                print(f"  No 'See more' button found. Finished loading all cards.")
-                break
-            
-            attempt += 1
-        
-        html = driver.page_source
-        driver.quit()
-        soup = BeautifulSoup(html, 'html.parser')
+class BankNameTable:
+    """Canonical bank-name table: each distinct name is interned once and referred to by an integer ID."""
 
-        # Find all rate cards
-        cards = soup.find_all('div', class_='wrt-RateCard-content')
-        print(f"Found {len(cards)} .wrt-RateCard-content cards")
-        
-        for card in cards:
-            # Try to get bank name from logo alt or label
-            bank_name = None
-            logo_img = card.find('img', class_='wrt-AdvertiserLogo-img')
-            if logo_img and logo_img.has_attr('alt'):
-                bank_name = logo_img['alt'].strip()
-            if not bank_name:
-                label = card.find('p', class_='wrt-RateCard-advertiserLabel')
-                if label:
-                    bank_name = label.get_text(strip=True)
-            if not bank_name:
-                print("  ⚠️ Skipping card: No bank name found")
-                continue
-            bank_name = re.sub(r'[®™]', '', bank_name).strip()
-            print(f"  Processing bank: {bank_name}")
-
-            # Find APY value - need to find the first wrt-Stat that contains APY label
-            rate = None
-            stats = card.find_all('div', class_='wrt-Stat')
-            for stat in stats:
-                label_elem = stat.find('div', class_='wrt-Stat-label')
-                if label_elem and 'APY' in label_elem.get_text():
-                    rate_elem = stat.find('div', class_='wrt-Stat-amount')
-                    if rate_elem:
-                        # Get only direct text, not from child elements like tooltips
-                        rate_text = ''.join(rate_elem.find_all(string=True, recursive=False)).strip()
-                        print(f"    Found APY text: '{rate_text}'")
-                        try:
-                            # Remove any % signs and commas
-                            rate_text_clean = rate_text.replace('%', '').replace(',', '').strip()
-                            rate = float(rate_text_clean)
-                            print(f"    Converted to float: {rate}")
-                            break
-                        except ValueError as e:
-                            print(f"    ✗ Could not convert '{rate_text}' to float: {e}")
-                            continue
-            
-            if rate and 0.1 <= rate <= 10:
-                # Check if this matches any of my tracked banks
-                matched = False
-                for my_bank in LINKS.keys():
-                    if my_bank in scraped_banks:
-                        continue
-                    aliases = BANK_ALIASES.get(my_bank, [my_bank])
-                    for alias in aliases:
-                        if alias.lower() in bank_name.lower():
-                            my_banks[my_bank] = rate
-                            print(f"    ✓ Matched to tracked bank: {my_bank} (as '{bank_name}'): {rate}%")
-                            matched = True
-                            break
-                    if matched:
-                        break
-                if not matched:
-                    other_banks[bank_name] = rate
-                    print(f"    → Added to other banks: {bank_name}: {rate}%")
+    def __init__(self, names=()):
+        self.names = []
+        self.ids = {}
+        for name in names:
+            self.intern(name)
+
+    def intern(self, name):
+        bank_id = self.ids.get(name)
+        if bank_id is None:
+            bank_id = len(self.names)
+            name = sys.intern(name)
+            self.names.append(name)
+            self.ids[name] = bank_id
+        return bank_id
+
+    def __len__(self):
+        return len(self.names)
+
+
+class RateMatrix:
+    """Snapshots x banks APY matrix for analysis.
+
+    Rates are a dense float32 array with NaN where a bank wasn't listed in a snapshot,
+    `ts` holds each row's UTC epoch seconds (ascending) and `banks` maps columns to names.
+    """
+
+    def __init__(self, ts, rates, banks, dates=None):
+        self.ts = ts
+        self.rates = rates
+        self.banks = banks
+        self.dates = dates if dates is not None else [None] * len(ts)
+
+    @classmethod
+    def from_snapshots(cls, entries, rates_key="rates", banks=None):
+        """Build from JSON-shaped snapshots; names are interned into `banks` (a shared table may be passed)."""
+        banks = banks if banks is not None else BankNameTable()
+        rows = [[(banks.intern(bank), apy) for bank, apy in entry[rates_key].items()] for entry in entries]
+        rates = np.full((len(entries), len(banks)), np.nan, dtype=np.float32)
+        for i, row in enumerate(rows):
+            if row:
+                columns, values = zip(*row)
+                rates[i, list(columns)] = values
+        ts = np.array([entry_ts(entry) for entry in entries], dtype=np.int64)
+        return cls(ts, rates, banks, [entry['date'] for entry in entries])
+
+    @classmethod
+    def from_rates(cls, *rates):
+        """One row per {bank: rate} dict (e.g. this run's rates and the last run's), over one bank-name table."""
+        return cls.from_snapshots([{"ts": row, "date": None, "rates": values} for row, values in enumerate(rates)])
+
+    @property
+    def mask(self):
+        """True where a bank has a rate in a snapshot."""
+        return ~np.isnan(self.rates)
+
+    @property
+    def nbytes(self):
+        return self.ts.nbytes + self.rates.nbytes
+
+    def __len__(self):
+        return len(self.ts)
+
+    def since(self, cutoff):
+        """Rows taken at or after `cutoff` (epoch seconds); a binary search on the sorted timestamps."""
+        start = int(np.searchsorted(self.ts, cutoff, side='left'))
+        return RateMatrix(self.ts[start:], self.rates[start:], self.banks, self.dates[start:])
+
+    def column(self, name):
+        bank_id = self.banks.ids.get(name)
+        if bank_id is None or bank_id >= self.rates.shape[1]:
+            return np.full(len(self), np.nan, dtype=np.float32)
+        return self.rates[:, bank_id]
+
+    def snapshot(self, row):
+        """One row back as a {bank: rate} dict."""
+        values = self.rates[row]
+        return {self.banks.names[bank_id]: round(float(values[bank_id]), 4) for bank_id in np.flatnonzero(~np.isnan(values))}
+
+    def top(self, row, n=None):
+        """Column indices of the `n` highest rates in a row, highest first (ties keep column order)."""
+        values = self.rates[row]
+        listed = np.flatnonzero(~np.isnan(values))
+        return listed[np.argsort(-values[listed], kind='stable')][:n]
+
+    def winners(self):
+        """Column index of the top rate in each row (-1 for an empty snapshot); ties go to the alphabetically first bank."""
+        has_rates = self.mask.any(axis=1)
+        winners = np.full(len(self), -1, dtype=np.int64)
+        if has_rates.any():
+            rates = self.rates[has_rates]
+            at_top = rates == np.nanmax(rates, axis=1, keepdims=True)
+            name_rank = np.argsort(np.argsort(self.banks.names[:rates.shape[1]]))
+            winners[has_rates] = np.argmin(np.where(at_top, name_rank, len(name_rank)), axis=1)
+        return winners
+
+    def to_frame(self):
+        """Wide DataFrame (UTC snapshot time x bank name)."""
+        return pd.DataFrame(self.rates, index=pd.to_datetime(self.ts, unit='s', utc=True),
+                            columns=self.banks.names[:self.rates.shape[1]])
+
+
+# Fixed-size records of the binary history: 16 bytes each, appended in time order
+BINARY_RECORD = np.dtype([('ts', '<i8'), ('bank', '<u2'), ('source', 'u1'), ('pad', 'u1'), ('rate', '<f4')])
+BINARY_HEADER = struct.Struct('<8sIII')  # magic, version, name-table capacity, names in use
+BINARY_MAGIC = b'HYSARATE'
+BINARY_HEADER_SIZE = 64
+BINARY_NAME_SIZE = 64  # UTF-8 bytes per bank-name slot, NUL padded
+BINARY_SOURCES = {"tracked": 0, "market": 1}
+# Bank id of the NaN-rate placeholder record that keeps a snapshot with no rates in the history
+BINARY_NO_BANK = 0xFFFF
+
+def _binary_data_offset(capacity):
+    return BINARY_HEADER_SIZE + capacity * BINARY_NAME_SIZE
+
+def _read_binary_header(f):
+    """(capacity, names) from an open binary history file."""
+    f.seek(0)
+    magic, version, capacity, count = BINARY_HEADER.unpack(f.read(BINARY_HEADER.size))
+    if magic != BINARY_MAGIC or version != 1:
+        raise ValueError(f"{BINARY_HISTORY_FILE} is not a version 1 binary rate history")
+    f.seek(BINARY_HEADER_SIZE)
+    table = f.read(count * BINARY_NAME_SIZE)
+    # 'ignore' drops a character split by files written before names were cut on character boundaries
+    names = [table[i:i + BINARY_NAME_SIZE].rstrip(b'\0').decode('utf-8', 'ignore') for i in range(0, len(table), BINARY_NAME_SIZE)]
+    if len(set(names)) != len(names):
+        raise ValueError(f"{BINARY_HISTORY_FILE} has duplicate bank names in its name table; rebuild it with --convert-binary")
+    return capacity, names
+
+def binary_bank_name(name):
+    """
+    `name` as stored in the binary name table: unchanged when its UTF-8 fits a BINARY_NAME_SIZE slot,
+    otherwise cut on a character boundary and suffixed with a hash of the full name, so two long
+    names sharing a prefix stay two banks.
+    """
+    encoded = name.encode('utf-8')
+    if len(encoded) <= BINARY_NAME_SIZE:
+        return name
+    digest = hashlib.sha1(encoded).hexdigest()[:8]
+    return encoded[:BINARY_NAME_SIZE - len(digest) - 1].decode('utf-8', 'ignore') + '~' + digest
+
+def _encode_bank_name(name):
+    encoded = name.encode('utf-8')
+    if len(encoded) > BINARY_NAME_SIZE:
+        raise ValueError(f"Bank name too long for the binary name table: {name!r}")
+    return encoded.ljust(BINARY_NAME_SIZE, b'\0')
+
+def _binary_records(snapshots, banks):
+    """
+    Structured records for (source, JSON-shaped snapshot) pairs, interning names into `banks`.
+    A snapshot without rates gets one BINARY_NO_BANK placeholder so its row isn't lost.
+    """
+    rows = []
+    for source, entry in snapshots:
+        rates = entry[SNAPSHOT_SOURCES[source]]
+        rows.extend((entry_ts(entry), banks.intern(binary_bank_name(bank)), BINARY_SOURCES[source], 0, apy)
+                    for bank, apy in rates.items())
+        if not rates:
+            rows.append((entry_ts(entry), BINARY_NO_BANK, BINARY_SOURCES[source], 0, np.nan))
+    return np.array(rows, dtype=BINARY_RECORD)
+
+def _binary_history_bytes(names, records):
+    capacity = 256
+    while capacity < 2 * len(names):
+        capacity *= 2
+    return (BINARY_HEADER.pack(BINARY_MAGIC, 1, capacity, len(names)).ljust(BINARY_HEADER_SIZE, b'\0')
+            + b''.join(_encode_bank_name(name) for name in names).ljust(capacity * BINARY_NAME_SIZE, b'\0')
+            + records.tobytes())
+
+def write_binary_history(path, names, records):
+    """Write a complete binary history (header, name table, records) via a temp file renamed into place."""
+    os.replace(_stage_file(path, _binary_history_bytes(names, records)), path)
+
+def open_binary_history(path=BINARY_HISTORY_FILE):
+    """
+    (bank names, records) with the records memory-mapped read-only: opening costs O(1) whatever the
+    history length, and slicing only touches the pages of the rows used.
+    """
+    with open(path, 'rb') as f:
+        capacity, names = _read_binary_header(f)
+    offset = _binary_data_offset(capacity)
+    count = (os.path.getsize(path) - offset) // BINARY_RECORD.itemsize
+    if count <= 0:
+        return names, np.empty(0, dtype=BINARY_RECORD)
+    return names, np.memmap(path, dtype=BINARY_RECORD, mode='r', offset=offset, shape=(count,))
+
+def append_binary_snapshot(entries, journal=None):
+    """
+    Append (source, snapshot) pairs to the binary history, adding new bank names to the header table.
+    When the table is full the whole file is rewritten instead, staged in `journal` when given: a
+    rollback truncates the file to its old size, which only makes sense for the old layout.
+    """
+    with open(BINARY_HISTORY_FILE, 'r+b') as f:
+        capacity, names = _read_binary_header(f)
+        banks = BankNameTable(names)
+        records = _binary_records(entries, banks)
+        if len(banks) > capacity:
+            # Name table is full: rewrite the file once with a larger table
+            _, existing = open_binary_history()
+            records = np.concatenate([np.asarray(existing), records])
+            if journal:
+                journal.write_bytes(BINARY_HISTORY_FILE, _binary_history_bytes(banks.names, records))
             else:
-                if rate:
-                    print(f"    ✗ Rate {rate} out of valid range")
-                else:
-                    print(f"    ✗ No valid APY found for {bank_name}")
-        print(f"Bankrate: {len(my_banks)} tracked banks, {len(other_banks)} other banks")
-    except Exception as e:
-        print(f"Error scraping Bankrate: {str(e)}")
-        failed.append("Bankrate")
-    return my_banks, other_banks, failed
+                write_binary_history(BINARY_HISTORY_FILE, banks.names, records)
+            return
+        if len(banks) > len(names):
+            f.seek(BINARY_HEADER_SIZE + len(names) * BINARY_NAME_SIZE)
+            f.write(b''.join(_encode_bank_name(name) for name in banks.names[len(names):]))
+        f.seek(0, os.SEEK_END)
+        f.write(records.tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+        # Publish the new names only after the records that use them are on disk
+        f.seek(0)
+        f.write(BINARY_HEADER.pack(BINARY_MAGIC, 1, capacity, len(banks)))
+        f.flush()
+        os.fsync(f.fileno())
 
-def get_analysis_report(history, days=30):
-    """Calculates Consistency (#1 spot) and Stability (Mean Rate)."""
-    if not history:
-        return "No historical data yet."
+def convert_history_to_binary():
+    """Build the binary history from the configured backend's full history."""
+    banks = BankNameTable()
+    snapshots = [("tracked", entry) for entry in load_history()] + [("market", entry) for entry in load_market_history()]
+    snapshots.sort(key=lambda pair: entry_ts(pair[1]))
+    records = _binary_records(snapshots, banks)
+    write_binary_history(BINARY_HISTORY_FILE, banks.names, records)
+    print(f"✓ Wrote {len(records)} rate records ({len(banks)} banks) to {BINARY_HISTORY_FILE}, "
+          f"{os.path.getsize(BINARY_HISTORY_FILE) / 1024:.0f}KB")
+
+def binary_rate_matrix(source, since=None, path=BINARY_HISTORY_FILE):
+    """RateMatrix for one source straight from the memory-mapped records at or after `since`."""
+    names, records = open_binary_history(path)
+    if since is not None:
+        records = records[int(np.searchsorted(records['ts'], since, side='left')):]
+    records = records[records['source'] == BINARY_SOURCES[source]]
+    ts, rows = np.unique(records['ts'], return_inverse=True)
+    rates = np.full((len(ts), len(names)), np.nan, dtype=np.float32)
+    has_bank = records['bank'] != BINARY_NO_BANK
+    rates[rows[has_bank], records['bank'][has_bank]] = records['rate'][has_bank]
+    return RateMatrix(ts.astype(np.int64), rates, BankNameTable(names))
+
+def load_rate_matrices(since=None):
+    """
+    Tracked and market history (at or after `since`) as RateMatrix objects sharing one bank-name table.
+    Read from the memory-mapped binary history when it exists, else from the storage backend.
+    """
+    if os.path.exists(BINARY_HISTORY_FILE):
+        return binary_rate_matrix("tracked", since), binary_rate_matrix("market", since)
+    banks = BankNameTable()
+    tracked = RateMatrix.from_snapshots(load_history(since=since), "rates", banks)
+    market = RateMatrix.from_snapshots(load_market_history(since=since), "banks", banks)
+    return tracked, market
+
+def benchmark_history_load(days=30, repeat=5):
+    """
+    Time getting the last `days` of rates ready for analysis: a full json.load of the legacy files,
+    the configured storage backend, and the memory-mapped binary history.
+    """
+    def best_time(func):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
     
-    recent_history = history[-days:]
-    total_entries = len(recent_history)
+    latest = load_history(last=1)
+    # Window ends at the newest snapshot so every method returns the same rows
+    since = (entry_ts(latest[0]) if latest else int(time.time())) - days * 86400
     
-    winners = []
-    rate_totals = defaultdict(list) # To store all rates for averaging
+    def json_files():
+        history = add_epoch_timestamps(_load_json_list(HISTORY_FILE))
+        market_history = add_epoch_timestamps(_load_json_list(MARKET_RATES_HISTORY_FILE))
+        banks = BankNameTable()
+        return (RateMatrix.from_snapshots([entry for entry in history if entry['ts'] >= since], "rates", banks),
+                RateMatrix.from_snapshots([entry for entry in market_history if entry['ts'] >= since], "banks", banks))
     
-    for entry in recent_history:
-        rates = entry['rates']
-        # Find the winner for consistency
-        winner = max(rates, key=rates.get)
-        winners.append(winner)
-        # Store rates for stability mean
-        for bank, rate in rates.items():
-            rate_totals[bank].append(rate)
+    def storage_backend():
+        banks = BankNameTable()
+        return (RateMatrix.from_snapshots(load_history(since=since), "rates", banks),
+                RateMatrix.from_snapshots(load_market_history(since=since), "banks", banks))
+    
+    def binary_history():
+        return binary_rate_matrix("tracked", since), binary_rate_matrix("market", since)
+    
+    candidates = [("JSON files (json.load)", HISTORY_FILE, json_files),
+                  (f"{STORAGE_BACKEND} backend", None, storage_backend),
+                  ("Binary history (mmap)", BINARY_HISTORY_FILE, binary_history)]
+    print(f"\nLoading the last {days} days of tracked + market rates (best of {repeat}):")
+    for label, required_file, func in candidates:
+        if required_file and not os.path.exists(required_file):
+            print(f"{label:<28}skipped ({required_file} not found)")
+            continue
+        print(f"{label:<28}{best_time(func) * 1000:>9.2f}ms")
+
+def print_matrix_summary():
+    """Converter check: sizes of the history as snapshot dicts versus the interned rate matrices."""
+    history = load_history()
+    market_history = load_market_history()
+    tracked, market = load_rate_matrices()
     
-    # 1. Consistency Score
-    counts = Counter(winners)
+    def dict_bytes(entries, rates_key):
+        total = 0
+        for entry in entries:
+            rates = entry[rates_key]
+            total += sys.getsizeof(entry) + sys.getsizeof(rates) + sum(sys.getsizeof(apy) for apy in rates.values())
+            total += sum(sys.getsizeof(bank) for bank in rates)
+        return total
     
-    # 2. Stability Score (Average)
-    stability_data = []
-    for bank, rates_list in rate_totals.items():
-        avg_rate = sum(rates_list) / len(rates_list)
-        stability_data.append((bank, avg_rate))
+    names_bytes = sum(sys.getsizeof(name) for name in tracked.banks.names)
+    print(f"Bank name table: {len(tracked.banks)} names, {names_bytes / 1024:.0f}KB")
+    for label, entries, rates_key, matrix in (("Tracked", history, "rates", tracked), ("Market", market_history, "banks", market)):
+        print(f"{label}: {matrix.rates.shape[0]} snapshots x {matrix.rates.shape[1]} banks, "
+              f"{matrix.nbytes / 1024:.0f}KB as a matrix vs {dict_bytes(entries, rates_key) / 1024:.0f}KB as dicts")
+
+def analyze_rates(matrix, windows=ANALYSIS_WINDOWS):
+    """
+    Trailing-window statistics for every bank in a RateMatrix, as {days: DataFrame indexed by bank}.
+    Each window is one time-based rolling pass over the whole matrix, read at the latest snapshot:
+    mean, std (volatility), min, max, wins (snapshots at #1), share (of snapshots in the window),
+    rank (by mean) and trend (change of the exponentially weighted rate across the window).
+    """
+    if not len(matrix):
+        return {}
+    frame = matrix.to_frame()
+    winners = matrix.winners()
+    listed = np.flatnonzero(winners >= 0)
+    wins = np.zeros(matrix.rates.shape, dtype=np.float32)
+    wins[listed, winners[listed]] = 1
+    wins = pd.DataFrame(wins, index=frame.index, columns=frame.columns)
+    snapshots = pd.Series(1.0, index=frame.index)
+    ewm = frame.ewm(halflife=f'{EWM_HALFLIFE_DAYS} days', times=frame.index).mean()
+    end = frame.index[-1]
     
-    # Sort stability by highest average
-    stability_data.sort(key=lambda x: x[1], reverse=True)
+    results = {}
+    for days in windows:
+        window = f'{days}D'
+        rolling = frame.rolling(window, min_periods=1)
+        start = max(frame.index.searchsorted(end - pd.Timedelta(days=days), side='right') - 1, 0)
+        stats = pd.DataFrame({
+            "mean": rolling.mean().iloc[-1],
+            "std": rolling.std(ddof=0).iloc[-1],
+            "min": rolling.min().iloc[-1],
+            "max": rolling.max().iloc[-1],
+            "wins": wins.rolling(window).sum().iloc[-1],
+            # Banks first listed inside the window are measured from their first smoothed value
+            "trend": ewm.iloc[-1] - ewm.iloc[start:].bfill().iloc[0],
+        }).dropna(subset=["mean"])
+        stats["wins"] = stats["wins"].astype(int)
+        stats["share"] = stats["wins"] / snapshots.rolling(window).sum().iloc[-1]
+        stats["rank"] = stats["mean"].rank(ascending=False, method='min').astype(int)
+        stats.attrs["snapshots"] = int(snapshots.rolling(window).sum().iloc[-1])
+        results[days] = stats
+    return results
+
+def print_rate_analytics(windows=ANALYSIS_WINDOWS, top=10):
+    """Print the trailing-window statistics for the tracked banks and the top market banks."""
+    tracked, market = load_rate_matrices()
+    for label, matrix in (("Tracked banks", tracked), ("Market", market)):
+        for days, stats in analyze_rates(matrix, windows).items():
+            print(f"\n{label} - last {days} days ({stats.attrs['snapshots']} snapshots)")
+            print(f"{'Bank':<32}{'Mean':>8}{'Std':>8}{'Min':>8}{'Max':>8}{'#1':>6}{'Trend':>9}")
+            for bank, row in stats.sort_values('rank', kind='stable').head(top).iterrows():
+                print(f"{bank[:31]:<32}{row['mean']:>8.3f}{row['std']:>8.3f}{row['min']:>8.2f}{row['max']:>8.2f}"
+                      f"{row['share'] * 100:>5.0f}%{row['trend']:>+9.3f}")
+
+class AnalyticsState:
+    """Running per-bank aggregates for each trailing window, updated one snapshot at a time.
+
+    Each window keeps a deque of the snapshots inside it plus per-bank count, sum, sum of
+    squares and wins, so absorbing a snapshot and evicting the ones that slid out costs
+    O(banks). Windows end at the latest snapshot, like analyze_rates.
+    """
+
+    def __init__(self, windows=ANALYSIS_WINDOWS):
+        self.windows = sorted(windows)
+        self.last_ts = None
+        self.queues = {days: deque() for days in self.windows}
+        self.totals = {days: {} for days in self.windows}
+
+    @staticmethod
+    def _winner(rates):
+        # Highest rate; ties go to the alphabetically first bank, as in RateMatrix.winners
+        return min(rates, key=lambda bank: (-rates[bank], bank)) if rates else None
+
+    @staticmethod
+    def _apply(totals, winner, rates, sign):
+        for bank, rate in rates.items():
+            count, total, total_sq, wins = totals.get(bank, (0, 0.0, 0.0, 0))
+            count += sign
+            if count == 0:
+                del totals[bank]
+                continue
+            totals[bank] = [count, total + sign * rate, total_sq + sign * rate * rate, wins + (sign if bank == winner else 0)]
+
+    def add(self, entry):
+        snapshot = (entry_ts(entry), self._winner(entry['rates']), entry['rates'])
+        for days in self.windows:
+            window, totals = self.queues[days], self.totals[days]
+            window.append(snapshot)
+            self._apply(totals, snapshot[1], snapshot[2], 1)
+            cutoff = snapshot[0] - days * 86400
+            while window[0][0] <= cutoff:
+                _, winner, rates = window.popleft()
+                self._apply(totals, winner, rates, -1)
+        self.last_ts = snapshot[0]
+
+    def stats(self, days):
+        """Same columns as analyze_rates for the additive statistics: mean, std, wins, share, rank."""
+        snapshots = len(self.queues[days])
+        rows = {}
+        for bank, (count, total, total_sq, wins) in sorted(self.totals[days].items()):
+            mean = total / count
+            rows[bank] = {"mean": mean, "std": max(total_sq / count - mean * mean, 0) ** 0.5,
+                          "wins": wins, "share": wins / snapshots}
+        stats = pd.DataFrame.from_dict(rows, orient='index', columns=["mean", "std", "wins", "share"])
+        stats["rank"] = stats["mean"].rank(ascending=False, method='min').astype(int)
+        stats.attrs["snapshots"] = snapshots
+        return stats
+
+    def to_json(self):
+        # Smaller windows' queues are suffixes of the longest one, so only that one is stored
+        return {
+            "windows": self.windows,
+            "last_ts": self.last_ts,
+            "snapshots": [list(snapshot) for snapshot in self.queues[self.windows[-1]]],
+            "sizes": {str(days): len(self.queues[days]) for days in self.windows},
+            "totals": {str(days): self.totals[days] for days in self.windows},
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        state = cls(data["windows"])
+        snapshots = [tuple(snapshot) for snapshot in data["snapshots"]]
+        for days in state.windows:
+            size = data["sizes"][str(days)]
+            state.queues[days] = deque(snapshots[len(snapshots) - size:] if size else [])
+            state.totals[days] = data["totals"][str(days)]
+        state.last_ts = data["last_ts"]
+        return state
+
+
+def load_analytics_state():
+    """The persisted analytics state, or None if it is missing, unreadable or for other windows."""
+    if os.path.exists(ANALYTICS_STATE_FILE):
+        try:
+            with open(ANALYTICS_STATE_FILE, 'r') as f:
+                data = json.load(f)
+            if data.get("windows") == sorted(ANALYSIS_WINDOWS):
+                return AnalyticsState.from_json(data)
+        except (OSError, json.JSONDecodeError, KeyError, TypeError):
+            pass
+    return None
+
+def save_analytics_state(state):
+    atomic_write_json(ANALYTICS_STATE_FILE, state.to_json(), indent=None)
+
+def rebuild_analytics_state():
+    """Recompute the analytics state from the stored history (only the longest window's span is read)."""
+    state = AnalyticsState()
+    latest = load_history(last=1)
+    if latest:
+        for entry in load_history(since=entry_ts(latest[0]) - state.windows[-1] * 86400):
+            state.add(entry)
+    save_analytics_state(state)
+    print(f"✓ Rebuilt analytics state ({len(state.queues[state.windows[-1]])} snapshots)")
+    return state
+
+def sync_analytics_state():
+    """
+    Bring the persisted analytics state up to date with the stored history: absorb just the
+    newest snapshot when the state is one behind, otherwise rebuild it.
+    """
+    state = load_analytics_state()
+    latest = load_history(last=2)
+    if state is not None and latest:
+        if state.last_ts == entry_ts(latest[-1]):
+            return state
+        if len(latest) == 2 and state.last_ts == entry_ts(latest[0]):
+            state.add(latest[-1])
+            save_analytics_state(state)
+            return state
+    return rebuild_analytics_state()
+
+def check_analytics_state():
+    """Compare the persisted state with a full recomputation by analyze_rates; True when every window agrees."""
+    state = load_analytics_state()
+    latest = load_history(last=1)
+    if state is None or not latest or state.last_ts != entry_ts(latest[0]):
+        print("✗ Analytics state is missing or behind the stored history (run --rebuild-analytics)")
+        return False
+    matrix = RateMatrix.from_snapshots(load_history(since=state.last_ts - state.windows[-1] * 86400), "rates")
+    expected = analyze_rates(matrix, state.windows)
+    consistent = True
+    for days in state.windows:
+        actual, full = state.stats(days), expected[days].sort_index()
+        problems = []
+        if actual.attrs["snapshots"] != full.attrs["snapshots"]:
+            problems.append(f"{actual.attrs['snapshots']} snapshots vs {full.attrs['snapshots']}")
+        if list(actual.index) != list(full.index):
+            problems.append(f"banks differ: {sorted(set(actual.index) ^ set(full.index))}")
+        else:
+            if not (actual["wins"] == full["wins"]).all():
+                problems.append("win counts differ")
+            for column in ("mean", "std"):
+                drift = float((actual[column] - full[column]).abs().max())
+                if drift > 1e-4:
+                    problems.append(f"{column} off by up to {drift:.6f}")
+        if problems:
+            consistent = False
+            print(f"✗ {days}-day window: " + "; ".join(problems))
+        else:
+            print(f"✓ {days}-day window matches ({actual.attrs['snapshots']} snapshots, {len(actual)} banks)")
+    return consistent
+
+def get_analysis_report(history, days=30):
+    """
+    Calculates Consistency (#1 spot) and Stability (Mean Rate) over the `days` days up to the latest snapshot.
+    `history` is an AnalyticsState (read directly), a RateMatrix or a list of tracked-bank snapshots.
+    """
+    if isinstance(history, AnalyticsState):
+        stats = history.stats(days)
+    else:
+        matrix = history if isinstance(history, RateMatrix) else RateMatrix.from_snapshots(history, "rates")
+        # analyze_rates ends its windows at the latest snapshot, like the incremental state
+        stats = analyze_rates(matrix, [days]).get(days)
+    if stats is None or stats.empty:
+        return "No historical data yet."
+    stats = stats.sort_index()  # Equal values list alphabetically
 
-    report = f"\n*📊 Analysis (Last {total_entries} Snapshot(s))*\n"
+    report = f"\n*📊 Analysis (Last {days} Days, {stats.attrs['snapshots']} Snapshot(s))*\n"
     report += "------------------------------------------\n"
     
     report += "*🏆 Consistency Leaderboard (Most days at #1)*\n"
-    for bank, wins in counts.most_common():
-        pct = (wins / total_entries) * 100
-        report += f"• {bank}: {pct:.0f}% of the time\n"
+    for bank, row in stats[stats['wins'] > 0].sort_values('wins', ascending=False, kind='stable').iterrows():
+        report += f"• {bank}: {row['share'] * 100:.0f}% of the time\n"
 
-    report += "\n*⚖️ Stability Score (Average APY)*\n"
-    for bank, avg in stability_data:
-        report += f"• {bank}: {avg:.3f}%\n"
+    report += "\n*⚖️ Stability Score (Average APY, σ = volatility)*\n"
+    for bank, row in stats.sort_values('mean', ascending=False, kind='stable').iterrows():
+        report += f"• {bank}: {row['mean']:.3f}% (σ {row['std']:.3f})\n"
         
     return report
 
-def should_send_notification(main_tracked_rates, last_rates, other_rates, mode):
+def find_notable_mentions(main_tracked_rates, other_rates, previous_market_rates):
+    """
+    Market banks worth a mention: the biggest rate jumps since the last run, new top-10 entrants and
+    banks within 0.10% above the best tracked rate. Computed column-wise on a two-row (this run,
+    last run) RateMatrix, with differences rounded to the stored 4 decimals.
+    """
+    market = RateMatrix.from_rates(other_rates, previous_market_rates)
+    names = market.banks.names
+    current, previous = market.rates
+    notable_mentions = []
+    
+    # 1. Banks with biggest rate jumps (at least 0.05% increase), top 3
+    change = np.round(current - previous, 4)
+    jumps = np.flatnonzero(change > 0.05)
+    for bank_id in jumps[np.argsort(-change[jumps], kind='stable')][:3]:
+        notable_mentions.append(f"📈 *{names[bank_id]}*: {current[bank_id]:.2f}% (↑ +{change[bank_id]:.2f}%)")
+    
+    # 2. New banks that entered top 10, up to 2
+    if previous_market_rates:
+        previous_top_10 = set(market.top(1, 10))
+        for bank_id in [bank_id for bank_id in market.top(0, 10) if bank_id not in previous_top_10][:2]:
+            notable_mentions.append(f"🆕 *{names[bank_id]}*: {current[bank_id]:.2f}% (New to top 10!)")
+    
+    # 3. Banks very close to best tracked bank (within 0.10% above it), top 2
+    if main_tracked_rates:
+        gap = np.round(current - max(main_tracked_rates.values()), 4)
+        close = np.flatnonzero((gap >= 0) & (gap <= 0.10))
+        for bank_id in close[np.argsort(-current[close], kind='stable')][:2]:
+            notable_mentions.append(f"🎯 *{names[bank_id]}*: {current[bank_id]:.2f}% (Within 0.10% of your best!)")
+    
+    return notable_mentions
+
+def should_send_notification(main_tracked_rates, last_rates, other_rates, previous_market_rates, mode):
     """
-    Determines if a notification should be sent based on the notification mode.
+    Determines if a notification should be sent based on the notification mode. Smart mode compares
+    this run with the last one column-wise on two-row (current, previous) RateMatrix objects.
     
     Modes:
     - "always": Send notification every time (daily if scheduled daily)
@@ -1302,42 +3111,31 @@ def should_send_notification(main_tracked_rates, last_rates, other_rates, mode):
     if mode == "smart":
         reasons = []
         
-        # Check for significant drops in tracked banks
-        for bank, current_rate in main_tracked_rates.items():
-            if bank in last_rates:
-                drop = last_rates[bank] - current_rate
-                if drop >= SIGNIFICANT_DROP_THRESHOLD:
-                    reasons.append(f"🔴 {bank} dropped {drop:.2f}% (threshold: {SIGNIFICANT_DROP_THRESHOLD}%)")
+        # Check for significant drops in tracked banks (differences rounded to the stored 4 decimals)
+        tracked = RateMatrix.from_rates(main_tracked_rates, last_rates)
+        drops = np.round(tracked.rates[1] - tracked.rates[0], 4)
+        for bank_id in np.flatnonzero(drops >= SIGNIFICANT_DROP_THRESHOLD):
+            reasons.append(f"🔴 {tracked.banks.names[bank_id]} dropped {drops[bank_id]:.2f}% (threshold: {SIGNIFICANT_DROP_THRESHOLD}%)")
         
         # Check for new competitive threats (banks that newly cross the threshold)
         # Only alert if a competitor wasn't a threat before but is now
         if main_tracked_rates:
             best_tracked_rate = max(main_tracked_rates.values())
-            
-            # Get previous market rates to compare
-            previous_market_rates = {}
-            try:
-                if os.path.exists(MARKET_RATES_HISTORY_FILE):
-                    with open(MARKET_RATES_HISTORY_FILE, 'r') as f:
-                        market_history_data = json.load(f)
-                        if len(market_history_data) >= 1:
-                            previous_market_rates = market_history_data[-1].get("banks", {})
-            except:
-                pass
+            market = RateMatrix.from_rates(other_rates, previous_market_rates)
+            current_gap = np.round(market.rates[0] - best_tracked_rate, 4)
+            previous_gap = np.round(market.rates[1] - best_tracked_rate, 4)
             
             # Only alert on new threats or significant gap increases
-            for bank, rate in other_rates.items():
-                current_gap = rate - best_tracked_rate
-                if current_gap >= SIGNIFICANT_RISE_THRESHOLD:
-                    # Check if this is a new threat (wasn't above threshold before)
-                    if bank in previous_market_rates:
-                        previous_gap = previous_market_rates[bank] - best_tracked_rate
-                        # Only alert if gap increased by at least 0.10% or newly crossed threshold
-                        if previous_gap < SIGNIFICANT_RISE_THRESHOLD or current_gap - previous_gap >= 0.10:
-                            reasons.append(f"🔴 {bank} now {current_gap:.2f}% above your best (was {previous_gap:.2f}%)")
-                    else:
-                        # New bank we haven't seen before
-                        reasons.append(f"🔴 NEW: {bank} is {current_gap:.2f}% above your best!")
+            for bank_id in np.flatnonzero(current_gap >= SIGNIFICANT_RISE_THRESHOLD):
+                bank = market.banks.names[bank_id]
+                # Check if this is a new threat (wasn't above threshold before)
+                if np.isnan(previous_gap[bank_id]):
+                    # New bank we haven't seen before
+                    reasons.append(f"🔴 NEW: {bank} is {current_gap[bank_id]:.2f}% above your best!")
+                # Only alert if gap increased by at least 0.10% or newly crossed threshold
+                elif (previous_gap[bank_id] < SIGNIFICANT_RISE_THRESHOLD
+                      or round(current_gap[bank_id] - previous_gap[bank_id], 4) >= 0.10):
+                    reasons.append(f"🔴 {bank} now {current_gap[bank_id]:.2f}% above your best (was {previous_gap[bank_id]:.2f}%)")
         
         # Always send monthly report on 1st of month
         if now.day == 1:
@@ -1355,151 +3153,170 @@ def should_send_notification(main_tracked_rates, last_rates, other_rates, mode):
     # Default to always if mode not recognized
     return True, f"Unknown mode '{mode}' - defaulting to always"
 
-def run_tracker():
-    if not os.path.exists('data'): 
-        os.makedirs('data')
-    if not os.path.exists(HISTORY_FILE):
-        with open(HISTORY_FILE, 'w') as f: 
-            json.dump([], f)
+def record_bank_result(bank_name, rate, fetched_at, observations, failed_scrapes):
+    """Record a directly scraped bank's rate as a "direct" observation, or a failure for a main tracked bank."""
+    if rate is not None:
+        observations.append(("direct", bank_name, rate, fetched_at))
+    else:
+        if bank_name in MAIN_TRACKED_BANKS:
+            failed_scrapes.append(bank_name)
+
+def collect_rates_threaded():
+    """Phased collection: every bank in parallel, then each aggregate site in turn."""
+    observations = []  # (source, bank, rate, fetched_at) from bank pages and aggregate sites
+    failed_scrapes = []
     
+    # 1. Scrape every bank in parallel, static HTML first, falling back to a pooled Chrome driver
+    strategy_state = load_strategy_state()
+    browser_first = [bank for bank in LINKS if plan_strategies(bank, strategy_state)[0] == 'selenium']
+    pool_size = min(SELENIUM_POOL_SIZE, len(SELENIUM_CAPABLE_BANKS))
+    
+    print(f"\nScraping {len(LINKS)} banks ({len(browser_first)} expected to need Selenium, pool of up to {pool_size} Chrome driver(s))...")
+    pool = ChromeDriverPool(pool_size)
     try:
-        with open(HISTORY_FILE, 'r') as f:
-            history = json.load(f)
-    except json.JSONDecodeError:
-        history = []
-
-    # Load last rates to check for changes
-    last_rates = {}
-    if os.path.exists(LAST_RATES_FILE):
-        try:
-            with open(LAST_RATES_FILE, 'r') as f:
-                last_rates = json.load(f)
-        except:
-            pass
+        # Only launch Chrome up front for banks that are known to need it
+        if browser_first:
+            pool.prewarm(len(browser_first))
+        with ThreadPoolExecutor(max_workers=len(LINKS)) as executor:
+            future_to_bank = {executor.submit(scrape_bank_adaptive, pool, bank_name, url, strategy_state): bank_name
+                              for bank_name, url in LINKS.items()}
+            
+            for future in as_completed(future_to_bank):
+                bank_name, rate, strategy = future.result()
+                record_bank_result(bank_name, rate, int(time.time()), observations, failed_scrapes)
+    finally:
+        pool.close()
+        print("Closed Selenium driver pool")
+        save_strategy_state(strategy_state)
     
-    # Load market rates history
-    market_history = []
-    if os.path.exists(MARKET_RATES_HISTORY_FILE):
-        try:
-            with open(MARKET_RATES_HISTORY_FILE, 'r') as f:
-                market_history = json.load(f)
-        except:
-            pass
+    # 2. Scrape aggregate sources for main tracked banks that were missed and all other banks
+    print("\nScraping aggregate sources...")
+    aggregate_cards = {source: (cards, fetched_at)
+                       for source, cards, fetched_at in map(scrape_aggregate_source, AGGREGATE_FETCHERS)}
+    join_aggregate_results(aggregate_cards, observations, failed_scrapes)
+    
+    return observations, failed_scrapes
 
-    main_tracked_rates = {}  # Rates for main tracked banks (7 banks)
-    supplementary_rates = {}  # Rates for supplementary banks (Wealthfront, Betterment)
-    other_rates = {}  # Rates for other banks from aggregate sites
+async def collect_rates_async():
+    """
+    Overlapped collection: every bank and aggregate site runs as its own task, so the
+    Investopedia fetch and Bankrate's "See more" loop proceed while bank pages load.
+    Blocking scrapers run on a dedicated pool of ASYNC_MAX_CONCURRENCY worker threads. A source
+    that exceeds its SOURCE_TIMEOUTS entry is recorded as failed: its worker's HTTP, page-load and
+    selector waits are capped to the same deadline, it keeps its slot until it stops (or
+    SOURCE_CANCEL_GRACE runs out), and anything it produces afterwards is discarded. Alias matching
+    against tracked banks happens in a single join step once everything has finished.
+    """
+    observations = []
     failed_scrapes = []
+    finished_at = {}
     
-    print("Starting rate scraping...")
-    
-    # Helper function to scrape a single static bank
-    def scrape_static_bank(bank_name, url):
-        """Scrape a bank that only needs static HTML"""
-        print(f"Scraping {bank_name} (static)...")
-        rate = None
-        
-        match bank_name:
-            case "Wealthfront":
-                rate = scrape_wealthfront_page(bank_name, url)
-            case "Barclays":
-                rate = scrape_barclays_page(bank_name, url)
-            case "Apple":
-                rate = scrape_apple_page(bank_name, url)
-        
-        if rate is not None:
-            print(f"  ✓ {bank_name}: {rate}%")
-        else:
-            print(f"  ✗ {bank_name}: Failed to scrape")
-        
-        return bank_name, rate
+    limit = asyncio.Semaphore(ASYNC_MAX_CONCURRENCY)
+    executor = ThreadPoolExecutor(max_workers=ASYNC_MAX_CONCURRENCY, thread_name_prefix="source")
+    loop = asyncio.get_running_loop()
     
-    # 1. Scrape static banks in parallel (fast, no Selenium needed)
-    static_banks_to_scrape = {bank: url for bank, url in LINKS.items() if bank in STATIC_BANKS}
+    async def run_source(name, timeout, func, *args):
+        async with limit:
+            cancel = threading.Event()
+            work = loop.run_in_executor(executor, run_with_deadline, timeout, cancel, func, *args)
+            try:
+                result = await asyncio.wait_for(asyncio.shield(work), timeout)
+                finished_at[name] = int(time.time())
+                return result
+            except asyncio.TimeoutError:
+                print(f"  ⏰ {name}: gave up after {timeout}s")
+                cancel.set()
+                # Keep the slot until the worker notices the deadline, so timed-out sources can't pile up
+                await asyncio.wait([work], timeout=SOURCE_CANCEL_GRACE)
+                if work.done():
+                    work.exception()  # Expected SourceTimeout; retrieved so asyncio doesn't log it
+            except (Exception, SourceTimeout) as e:
+                print(f"  ✗ {name}: {str(e) or type(e).__name__}")
+            return None
     
-    if static_banks_to_scrape:
-        print(f"\nScraping {len(static_banks_to_scrape)} static banks in parallel...")
-        with ThreadPoolExecutor(max_workers=len(static_banks_to_scrape)) as executor:
-            future_to_bank = {executor.submit(scrape_static_bank, bank_name, url): bank_name 
-                             for bank_name, url in static_banks_to_scrape.items()}
-            
-            for future in as_completed(future_to_bank):
-                bank_name, rate = future.result()
-                
-                if rate is not None:
-                    if bank_name in MAIN_TRACKED_BANKS:
-                        main_tracked_rates[bank_name] = rate
-                    elif bank_name in SUPPLEMENTARY_BANKS:
-                        supplementary_rates[bank_name] = rate
-                else:
-                    if bank_name in MAIN_TRACKED_BANKS:
-                        failed_scrapes.append(bank_name)
+    strategy_state = load_strategy_state()
+    browser_first = [bank for bank in LINKS if plan_strategies(bank, strategy_state)[0] == 'selenium']
+    pool = ChromeDriverPool(min(SELENIUM_POOL_SIZE, len(SELENIUM_CAPABLE_BANKS)))
+    # Each bank updates its own copy of the strategy state, merged back only if it finished in time
+    bank_states = {bank_name: {bank_name: dict(strategy_state.get(bank_name, {}))} for bank_name in LINKS}
     
-    # 2. Scrape Selenium banks sequentially with ONE reused driver
-    selenium_banks_to_scrape = {bank: url for bank, url in LINKS.items() if bank in SELENIUM_BANKS}
+    print(f"\nScraping {len(LINKS)} banks and {len(AGGREGATE_FETCHERS)} aggregate sites concurrently "
+          f"(up to {ASYNC_MAX_CONCURRENCY} at a time)...")
+    try:
+        warmup = asyncio.create_task(asyncio.to_thread(pool.prewarm, len(browser_first))) if browser_first else None
+        # Aggregate sites are the slowest sources, so they queue for the semaphore ahead of the banks
+        aggregate_tasks = {source: asyncio.create_task(run_source(source, SOURCE_TIMEOUTS[source], scrape_aggregate_source, source))
+                           for source in AGGREGATE_FETCHERS}
+        bank_tasks = {bank_name: asyncio.create_task(run_source(bank_name, SOURCE_TIMEOUTS["bank"], scrape_bank_adaptive,
+                                                                pool, bank_name, url, bank_states[bank_name]))
+                      for bank_name, url in LINKS.items()}
+        
+        await asyncio.gather(*bank_tasks.values(), *aggregate_tasks.values())
+        if warmup is not None:
+            await warmup
+    finally:
+        # Abandoned workers are not waited for; they find the pool closed and their deadline passed
+        executor.shutdown(wait=False, cancel_futures=True)
+        pool.close()
+        print("Closed Selenium driver pool")
+        for bank_name in finished_at.keys() & bank_states.keys():
+            strategy_state[bank_name] = bank_states[bank_name][bank_name]
+        save_strategy_state(strategy_state)
     
-    if selenium_banks_to_scrape:
-        print(f"\nScraping {len(selenium_banks_to_scrape)} Selenium banks with reused driver...")
-        
-        # Create one driver for all Selenium banks
-        driver = create_chrome_driver()
-        
-        try:
-            for bank_name, url in selenium_banks_to_scrape.items():
-                print(f"Scraping {bank_name} (Selenium)...")
-                rate = None
-                
-                match bank_name:
-                    case "Ally":
-                        rate = scrape_ally_page(bank_name, url, driver=driver)
-                    case "Sofi":
-                        rate = scrape_sofi_page(bank_name, url, driver=driver)
-                    case "Capital One":
-                        rate = scrape_capitalone_page(bank_name, url, driver=driver)
-                    case "Marcus":
-                        rate = scrape_marcus_page(bank_name, url, driver=driver)
-                    case "Amex":
-                        rate = scrape_amex_page(bank_name, url, driver=driver)
-                    case "Betterment":
-                        rate = scrape_betterment_page(bank_name, url, driver=driver)
-                
-                if rate is not None:
-                    if bank_name in MAIN_TRACKED_BANKS:
-                        main_tracked_rates[bank_name] = rate
-                    elif bank_name in SUPPLEMENTARY_BANKS:
-                        supplementary_rates[bank_name] = rate
-                    print(f"  ✓ {bank_name}: {rate}%")
-                else:
-                    if bank_name in MAIN_TRACKED_BANKS:
-                        failed_scrapes.append(bank_name)
-                    print(f"  ✗ {bank_name}: Failed to scrape")
-        finally:
-            driver.quit()
-            print("Closed shared Selenium driver")
+    # Join step: bank results first, then aggregate matching against whatever is still missing
+    for bank_name, task in bank_tasks.items():
+        result = task.result()
+        record_bank_result(bank_name, result[1] if result else None, finished_at.get(bank_name), observations, failed_scrapes)
     
-    # 2. Scrape aggregate sources for main tracked banks that were missed and all other banks
-    print("\nScraping aggregate sources...")
+    aggregate_cards = {}
+    for source, task in aggregate_tasks.items():
+        result = task.result()
+        aggregate_cards[source] = result[1:] if result else (None, None)
+    join_aggregate_results(aggregate_cards, observations, failed_scrapes)
     
-    # Investopedia
-    inv_my_banks, inv_other_banks, investopedia_failed = scrape_investopedia(main_tracked_rates.keys())
-    main_tracked_rates.update(inv_my_banks)
-    other_rates.update(inv_other_banks)
-    failed_scrapes.extend(investopedia_failed)
+    return observations, failed_scrapes
+
+def run_tracker():
+    if not os.path.exists('data'): 
+        os.makedirs('data')
+    recover_journal()
+    migrate_history()
+
+    # Load last rates to check for changes
+    last_rates = load_json_file(LAST_RATES_FILE, {}, required=False)
     
-    # Bankrate
-    br_my_banks, br_other_banks, bankrate_failed = scrape_bankrate(main_tracked_rates.keys())
-    main_tracked_rates.update(br_my_banks)
+    print(f"Starting rate scraping ({RUN_MODE} mode)...")
     
-    # Merge other banks (keep highest rate if duplicate)
-    for bank, rate in br_other_banks.items():
-        if bank not in other_rates or rate > other_rates[bank]:
-            other_rates[bank] = rate
+    if RUN_MODE == "async":
+        observations, failed_scrapes = asyncio.run(collect_rates_async())
+    else:
+        observations, failed_scrapes = collect_rates_threaded()
     
-    failed_scrapes.extend(bankrate_failed)
+    with span("match", "reconcile", observations=len(observations)) as record:
+        # Key observations by canonical bank name so each institution is reconciled once across sources and spellings.
+        # Tracked banks were already matched by TRACKED_ALIAS_MATCHER; only the other cards go through the registry
+        identities = load_bank_identities()
+        observations = [(source, bank if bank in LINKS else identities.resolve(bank), rate, fetched_at)
+                        for source, bank, rate, fetched_at in observations]
+        
+        # Reconcile every source's quotes into one consensus rate per bank, weighting sources by their track record
+        weights = learn_source_weights(load_observation_frame(since=int(time.time()) - RECONCILE_HISTORY_DAYS * 86400))
+        consensus = reconcile_observations(observations, weights)
+        record["banks"] = len(consensus)
+    print(f"\nReconciled {len(observations)} observations into {len(consensus)} banks "
+          f"(source weights: {', '.join(f'{source} {weight:.2f}' for source, weight in weights.items())})")
+    main_tracked_rates = {bank: float(consensus.at[bank, 'rate']) for bank in MAIN_TRACKED_BANKS if bank in consensus.index}
+    supplementary_rates = {bank: float(consensus.at[bank, 'rate']) for bank in SUPPLEMENTARY_BANKS if bank in consensus.index}
+    # Market rates: every bank an aggregate site listed
+    other_rates = consensus.loc[consensus['listed'], 'rate'].astype(float).to_dict()
     
     # Remove banks from failed_scrapes if they were found by aggregate sources
     failed_scrapes = [bank for bank in failed_scrapes if bank not in main_tracked_rates]
     
+    print_http_timing_summary()
+    with span("persist", "http_cache"):
+        save_http_cache_index()
+    
     print(f"\nMain tracked banks collected: {len(main_tracked_rates)}")
     print(f"Supplementary banks collected: {len(supplementary_rates)}")
     print(f"Other market banks found: {len(other_rates)}")
@@ -1512,65 +3329,25 @@ def run_tracker():
     central = pytz.timezone("America/Chicago")
     central_now = datetime.now(central)
     timestamp = central_now.strftime("%Y-%m-%d %I:%M %p CT")
-    # Save current rates to last_rates.json (main tracked banks only)
-    with open(LAST_RATES_FILE, 'w') as f:
-        json.dump(main_tracked_rates, f, indent=4)
+    # Get previous market rates for comparison (before this run's snapshot is appended)
+    previous_market = load_market_history(last=1)
+    previous_market_rates = previous_market[-1]["banks"] if previous_market else {}
     
-    # Save to history (main tracked banks only)
-    history.append({"date": timestamp, "rates": main_tracked_rates})
-    with open(HISTORY_FILE, 'w') as f:
-        json.dump(history, f, indent=4)
+    # Save current rates to last_rates.json (main tracked banks only) and append to history (main
+    # tracked banks) and market rates history (all banks from aggregates) as one journaled commit
+    snapshot_ts = int(central_now.timestamp())
+    with span("persist", "snapshot", backend=STORAGE_BACKEND), PersistJournal(journaled_append_paths()) as journal:
+        journal.write_json(LAST_RATES_FILE, main_tracked_rates)
+        save_snapshot(snapshot_ts, timestamp, main_tracked_rates, other_rates, journal)
+        append_log_record(OBSERVATIONS_LOG_FILE, {"ts": snapshot_ts, "observations": [list(observation) for observation in observations]})
+        identities.save(journal)
+        if os.path.exists(BINARY_HISTORY_FILE):
+            append_binary_snapshot([("tracked", {"ts": snapshot_ts, "rates": main_tracked_rates}),
+                                    ("market", {"ts": snapshot_ts, "banks": other_rates})], journal)
+    with span("persist", "analytics"):
+        analytics_state = sync_analytics_state()
     
-    # Save market rates history (all banks from aggregates)
-    market_history.append({"date": timestamp, "banks": other_rates})
-    with open(MARKET_RATES_HISTORY_FILE, 'w') as f:
-        json.dump(market_history, f, indent=4)
-    
-    # Calculate notable mentions
-    notable_mentions = []
-    
-    # Get previous market rates for comparison
-    previous_market_rates = market_history[-2]["banks"] if len(market_history) >= 2 else {}
-    
-    # 1. Banks with biggest rate jumps (positive changes only)
-    rate_changes = []
-    for bank, rate in other_rates.items():
-        if bank in previous_market_rates:
-            change = rate - previous_market_rates[bank]
-            if change > 0.05:  # At least 0.05% increase
-                rate_changes.append((bank, rate, change))
-    rate_changes.sort(key=lambda x: x[2], reverse=True)
-    
-    # 2. New banks that entered top 10
-    sorted_other_rates = sorted(other_rates.items(), key=lambda x: x[1], reverse=True)
-    new_top_banks = []
-    if previous_market_rates:
-        previous_top_10 = sorted(previous_market_rates.items(), key=lambda x: x[1], reverse=True)[:10]
-        previous_top_10_names = [bank for bank , rate in previous_top_10]
-        new_top_banks = [(bank, rate) for bank, rate in sorted_other_rates[:10] 
-                        if bank not in previous_top_10_names]
-    
-    # 3. Banks very close to best tracked bank (within 0.10%)
-    if main_tracked_rates:
-        best_tracked_rate = max(main_tracked_rates.values())
-        close_competitors = [(bank, rate) for bank, rate in other_rates.items() 
-                           if abs(rate - best_tracked_rate) <= 0.10 and rate >= best_tracked_rate]
-        close_competitors.sort(key=lambda x: x[1], reverse=True)
-    else:
-        close_competitors = []
-    
-    # Build notable mentions list
-    if rate_changes[:3]:  # Top 3 biggest increases
-        for bank, rate, change in rate_changes[:3]:
-            notable_mentions.append(f"📈 *{bank}*: {rate:.2f}% (↑ +{change:.2f}%)")
-    
-    if new_top_banks:
-        for bank, rate in new_top_banks[:2]:  # Show up to 2 new entrants
-            notable_mentions.append(f"🆕 *{bank}*: {rate:.2f}% (New to top 10!)")
-    
-    if close_competitors[:2]:  # Top 2 close competitors
-        for bank, rate in close_competitors[:2]:
-            notable_mentions.append(f"🎯 *{bank}*: {rate:.2f}% (Within 0.10% of your best!)")
+    notable_mentions = find_notable_mentions(main_tracked_rates, other_rates, previous_market_rates)
 
     # Build Slack Message
     msg = f"🔔 *HYSA Rate Alert - {timestamp}*\n\n"
@@ -1618,15 +3395,17 @@ def run_tracker():
             for mention in notable_mentions:
                 msg += f"{mention}\n"
         
-        msg += f"\n_💾 Full market data ({total_market_banks} banks) saved to {MARKET_RATES_HISTORY_FILE}_\n"
+        market_file = {"ndjson": MARKET_RATES_LOG_FILE, "sqlite": SQLITE_DB_FILE, "parquet": PARQUET_DIR}.get(STORAGE_BACKEND, MARKET_RATES_HISTORY_FILE)
+        msg += f"\n_💾 Full market data ({total_market_banks} banks) saved to {market_file}_\n"
     
     # Add analysis report (only for main tracked banks)
-    msg += "\n" + get_analysis_report(history)
+    msg += "\n" + get_analysis_report(analytics_state)
 
     print("\n" + msg)
     
     # Smart notification logic
-    should_notify, reason = should_send_notification(main_tracked_rates, last_rates, other_rates, NOTIFICATION_MODE)
+    should_notify, reason = should_send_notification(main_tracked_rates, last_rates, other_rates, previous_market_rates,
+                                                     NOTIFICATION_MODE)
     
     print(f"\n{'='*50}")
     print(f"Notification Mode: {NOTIFICATION_MODE}")
@@ -1635,13 +3414,15 @@ def run_tracker():
     print(f"{'='*50}")
     
     if should_notify:
-        if SLACK_WEBHOOK_URL:
+        if SLACK_WEBHOOK_URL and not OFFLINE_REPLAY:
             # Add notification reason to message if in smart mode
             if NOTIFICATION_MODE == "smart":
                 msg = f"🚨 *ALERT TRIGGERED*: {reason}\n\n" + msg
             
             try:
-                response = requests.post(SLACK_WEBHOOK_URL, json={"text": msg})
+                with span("notify", "slack", bytes=len(msg.encode('utf-8'))) as record:
+                    response = requests.post(SLACK_WEBHOOK_URL, json={"text": msg})
+                    record["status"] = response.status_code
                 print(f"\n✅ Slack notification sent! Status: {response.status_code}")
             except Exception as e:
                 print(f"\n❌ Failed to send Slack notification: {str(e)}")
@@ -1651,5 +3432,225 @@ def run_tracker():
         print(f"\n🔕 Notification suppressed: {reason}")
 
 
+@contextmanager
+def offline_replay():
+    """
+    Run with every page served from the HTTP cache and no network, Chrome or Slack, in a scratch
+    copy of data/ so the replayed run exercises persistence without touching the real history.
+    """
+    global OFFLINE_REPLAY
+    if not os.path.exists(HTTP_CACHE_INDEX_FILE):
+        raise RuntimeError(f"Offline replay needs saved pages in {HTTP_CACHE_DIR} - run the tracker online once first")
+    scratch = tempfile.mkdtemp(prefix='hysa-replay-')
+    shutil.copytree('data', os.path.join(scratch, 'data'))
+    cwd = os.getcwd()
+    print(f"Offline replay from {HTTP_CACHE_DIR} in {scratch}")
+    OFFLINE_REPLAY = True
+    os.chdir(scratch)
+    try:
+        yield scratch
+    finally:
+        os.chdir(cwd)
+        OFFLINE_REPLAY = False
+        shutil.rmtree(scratch, ignore_errors=True)
+
+def _profile_label(func):
+    filename, line, name = func
+    if filename == '~':
+        return name.replace(';', ',')  # Built-ins, e.g. "<method 'read' of '_io.BufferedReader' objects>"
+    return f"{os.path.basename(filename)}:{name}:{line}".replace(';', ',')
+
+def write_collapsed_stacks(stats, path, max_depth=64, min_share=1e-4):
+    """
+    Write cProfile data as collapsed stacks ("a;b;c microseconds" per line) for flamegraph.pl or
+    speedscope. cProfile only keeps caller -> callee edges, so each function's own time is split
+    across the paths leading to it in proportion to the time spent on each edge. Paths under
+    `min_share` of the profiled time are left out.
+    """
+    callees = {}
+    threshold = sum(own_time for _, _, own_time, _, _ in stats.values()) * min_share
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, (_, _, _, edge_time) in callers.items():
+            callees.setdefault(caller, []).append((func, edge_time))
+    totals = {}
+    
+    def walk(func, stack, share):
+        own_time, total_time = stats[func][2], stats[func][3]
+        frames = stack + (_profile_label(func),)
+        totals[frames] = totals.get(frames, 0) + own_time * share
+        if len(frames) >= max_depth:
+            return
+        for callee, edge_time in callees.get(func, ()):
+            callee_total = stats[callee][3]
+            child_share = share * edge_time / callee_total if callee_total else 0.0
+            # Skip recursive re-entry and paths too small to matter
+            if _profile_label(callee) not in frames and callee_total * child_share >= threshold:
+                walk(callee, frames, child_share)
+    
+    for func, (_, _, _, _, callers) in stats.items():
+        if not callers:
+            walk(func, (), 1.0)
+    with open(path, 'w') as f:
+        for frames, seconds in totals.items():
+            if round(seconds * 1e6) > 0:
+                f.write(f"{';'.join(frames)} {round(seconds * 1e6)}\n")
+
+def print_hot_functions(stats, top=25):
+    """The `top` functions by own time, with call counts and cumulative time."""
+    rows = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:top]
+    total = sum(own_time for _, _, own_time, _, _ in stats.values())
+    print(f"\nTop {len(rows)} functions by own time ({total:.2f}s profiled):")
+    print(f"  {'Own':>8} {'Cumulative':>11} {'Calls':>9}  Function")
+    for func, (_, calls, own_time, total_time, _) in rows:
+        print(f"  {own_time:>7.3f}s {total_time:>10.3f}s {calls:>9}  {_profile_label(func)}")
+
+def profile_tracker(output=PROFILE_OUTPUT, top=25, memory=False):
+    """
+    Run the tracker under cProfile (and tracemalloc with `memory`), write `output`.prof for
+    pstats/snakeviz and `output`.folded collapsed stacks, and print the hottest functions.
+    """
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    thread_profilers = []
+    
+    def profile_thread(frame, event, arg):
+        # Worker threads (the scraping pool, asyncio.to_thread) get their own profiler, merged below.
+        # From Python 3.12 the main profiler already sees every thread and a second one can't start.
+        thread_profiler = cProfile.Profile()
+        try:
+            thread_profiler.enable()
+            thread_profilers.append(thread_profiler)
+        except ValueError:
+            sys.setprofile(None)
+    
+    profiler = cProfile.Profile()
+    if memory:
+        tracemalloc.start()
+    started = time.time()
+    threading.setprofile(profile_thread)
+    profiler.enable()
+    try:
+        run_tracker()
+    finally:
+        profiler.disable()
+        threading.setprofile(None)
+        if memory:
+            snapshot = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        save_run_metrics(started)
+        stats = pstats.Stats(profiler)
+        for thread_profiler in thread_profilers:
+            stats.add(thread_profiler)
+        stats.dump_stats(output + '.prof')
+        write_collapsed_stacks(stats.stats, output + '.folded')
+        print_hot_functions(stats.stats, top)
+        if memory:
+            print(f"\nPeak traced memory: {peak / 1024 / 1024:.1f} MB; largest live allocations at the end of the run:")
+            for stat in snapshot.statistics('lineno')[:10]:
+                print(f"  {stat.size / 1024:>9.1f} KB  {stat.traceback[0].filename}:{stat.traceback[0].lineno}")
+        print(f"\nProfiled {1 + len(thread_profilers)} thread(s). Wrote {output}.prof (pstats / snakeviz) "
+              f"and {output}.folded (flamegraph.pl / speedscope)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Track high-yield savings account rates.")
+    parser.add_argument('--benchmark-parse', action='store_true',
+                        help="benchmark HTML parsing on pages saved in the HTTP cache instead of running the tracker")
+    parser.add_argument('--migrate-history', action='store_true',
+                        help="load the existing history into the STORAGE_BACKEND store and exit")
+    parser.add_argument('--compact-market-history', action='store_true',
+                        help="re-encode the NDJSON market log as keyframes + deltas and exit")
+    parser.add_argument('--canonicalize-history', action='store_true',
+                        help=f"rewrite the market history under the canonical bank names in {BANK_IDENTITY_FILE} and exit")
+    parser.add_argument('--export-json', action='store_true',
+                        help="write the STORAGE_BACKEND history back out as the original JSON files and exit")
+    parser.add_argument('--export-parquet', action='store_true',
+                        help="rebuild the month-partitioned parquet archive from the STORAGE_BACKEND history and exit")
+    parser.add_argument('--matrix-summary', action='store_true',
+                        help="build the interned rate matrices from the history, print their size and exit")
+    parser.add_argument('--analytics', action='store_true',
+                        help="print rolling mean/std/min/max, days at #1 and trend for each --windows window and exit")
+    parser.add_argument('--windows', default=",".join(str(days) for days in ANALYSIS_WINDOWS),
+                        help="comma-separated trailing windows in days for --analytics (default: %(default)s)")
+    parser.add_argument('--rebuild-analytics', action='store_true',
+                        help="recompute the incremental analytics state from the stored history and exit")
+    parser.add_argument('--check-analytics', action='store_true',
+                        help="compare the incremental analytics state with a full recomputation and exit")
+    parser.add_argument('--convert-binary', action='store_true',
+                        help=f"write the history to the memory-mapped {BINARY_HISTORY_FILE} (kept up to date by later runs) and exit")
+    parser.add_argument('--benchmark-load', action='store_true',
+                        help="compare history load times for the JSON files, the storage backend and the binary history")
+    parser.add_argument('--bank-history', metavar='BANK',
+                        help="print one bank's recorded rates over the last --days days and exit")
+    parser.add_argument('--run-metrics', action='store_true',
+                        help=f"print mean and worst time per stage and bank from {RUN_METRICS_FILE} over the last --days days and exit")
+    parser.add_argument('--offline', action='store_true',
+                        help="replay the run from pages saved in the HTTP cache (no network, Chrome or Slack) "
+                             "in a scratch copy of data/")
+    parser.add_argument('--profile', action='store_true',
+                        help=f"run the tracker under cProfile, write {PROFILE_OUTPUT}.prof and .folded and print the hottest functions")
+    parser.add_argument('--profile-top', type=int, default=25, help="functions listed by --profile (default: 25)")
+    parser.add_argument('--profile-memory', action='store_true', help="also trace allocations with tracemalloc for --profile")
+    parser.add_argument('--days', type=int, default=90, help="window for --bank-history and --run-metrics (default: 90)")
+    args = parser.parse_args()
+    
+    if args.benchmark_parse:
+        benchmark_parsers()
+        return
+    if args.migrate_history:
+        migrate_history()
+        return
+    if args.compact_market_history:
+        compact_market_history()
+        return
+    if args.canonicalize_history:
+        canonicalize_market_history()
+        return
+    if args.export_json:
+        export_history_json()
+        return
+    if args.export_parquet:
+        export_history_parquet()
+        return
+    if args.matrix_summary:
+        print_matrix_summary()
+        return
+    if args.analytics:
+        print_rate_analytics([int(days) for days in args.windows.split(',')])
+        return
+    if args.rebuild_analytics:
+        rebuild_analytics_state()
+        return
+    if args.check_analytics:
+        sys.exit(0 if check_analytics_state() else 1)
+    if args.convert_binary:
+        convert_history_to_binary()
+        return
+    if args.benchmark_load:
+        benchmark_history_load()
+        return
+    if args.run_metrics:
+        print_run_metrics_history(args.days)
+        return
+    if args.bank_history:
+        central = pytz.timezone("America/Chicago")
+        bank = load_bank_identities().canonical.get(args.bank_history, args.bank_history)
+        for snapshot_ts, source, apy in load_bank_history(bank, args.days):
+            print(f"{datetime.fromtimestamp(snapshot_ts, central).strftime('%Y-%m-%d %I:%M %p CT')}  {source:<8}{apy:.2f}%")
+        return
+    
+    # Resolved up front: an offline replay runs in a scratch directory
+    profile_output = os.path.abspath(PROFILE_OUTPUT)
+    with offline_replay() if args.offline else nullcontext():
+        if args.profile:
+            profile_tracker(profile_output, top=args.profile_top, memory=args.profile_memory)
+            return
+        started = time.time()
+        try:
+            run_tracker()
+        finally:
+            save_run_metrics(started)
+
+
 if __name__ == "__main__":
-    run_tracker()
\ No newline at end of file
+    main()
\ No newline at end of file
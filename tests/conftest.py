@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scraper  # noqa: E402
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    """Run in an empty scratch data/ directory (every storage path in scraper.py is relative to it)."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(scraper, "STORAGE_BACKEND", "ndjson")
+    (tmp_path / "data").mkdir()
+    return tmp_path / "data"
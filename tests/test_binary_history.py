@@ -0,0 +1,146 @@
+import os
+
+import pytest
+
+import scraper
+
+BIN = scraper.BINARY_HISTORY_FILE
+
+
+def tracked(ts, **rates):
+    return {"ts": ts, "date": f"label {ts}", "rates": rates or {"Ally": 3.8, "Marcus": 3.9}}
+
+
+def market(ts, banks):
+    return {"ts": ts, "date": f"label {ts}", "banks": banks}
+
+
+def rows(matrix):
+    return [(int(ts), matrix.snapshot(row)) for row, ts in enumerate(matrix.ts)]
+
+
+def expected_rows(entries, rates_key):
+    return [(entry["ts"], entry[rates_key]) for entry in entries]
+
+
+def read_bytes(path=BIN):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+@pytest.fixture
+def history(data_dir):
+    history = [tracked(100), tracked(200, Ally=3.75, Marcus=3.9), tracked(300, Ally=3.75)]
+    market_history = [market(100, {"Ally": 3.8, "CIT Bank": 4.55}),
+                      market(200, {}),
+                      market(300, {"CIT Bank": 4.5, "Bask Bank": 4.65})]
+    for entry in history:
+        scraper.append_log_record(scraper.HISTORY_LOG_FILE, entry)
+    for entry in market_history:
+        scraper.append_market_snapshot(entry)
+    scraper.convert_history_to_binary()
+    return history, market_history
+
+
+def test_convert_round_trip(history):
+    history, market_history = history
+    assert rows(scraper.binary_rate_matrix("tracked")) == expected_rows(history, "rates")
+    assert rows(scraper.binary_rate_matrix("market")) == expected_rows(market_history, "banks")
+
+
+def test_load_rate_matrices_matches_the_backend(history):
+    from_binary = scraper.load_rate_matrices(since=200)
+    os.remove(BIN)
+    from_backend = scraper.load_rate_matrices(since=200)
+    for binary, backend in zip(from_binary, from_backend):
+        assert rows(binary) == rows(backend)
+
+
+def test_append_grows_records_and_names(history):
+    history, market_history = history
+    names, records = scraper.open_binary_history()
+    scraper.append_binary_snapshot([("tracked", tracked(400, Ally=3.7)),
+                                    ("market", market(400, {"Ally": 3.7, "Newcomer Bank": 5.0}))])
+    grown_names, grown_records = scraper.open_binary_history()
+    assert grown_names == names + ["Newcomer Bank"]
+    assert len(grown_records) == len(records) + 3
+    assert rows(scraper.binary_rate_matrix("market", since=300)) == [
+        (300, market_history[2]["banks"]), (400, {"Ally": 3.7, "Newcomer Bank": 5.0})]
+
+
+def test_full_name_table_is_rewritten_with_more_room(history):
+    history, market_history = history
+    banks = {f"Bank {i:03d}": round(4 + i / 1000, 3) for i in range(300)}
+    scraper.append_binary_snapshot([("market", market(400, banks))])
+    with open(BIN, 'rb') as f:
+        capacity, names = scraper._read_binary_header(f)
+    assert capacity == 1024
+    assert set(banks) <= set(names)
+    assert rows(scraper.binary_rate_matrix("market")) == expected_rows(market_history + [market(400, banks)], "banks")
+    assert rows(scraper.binary_rate_matrix("tracked")) == expected_rows(history, "rates")
+
+
+def test_journal_rolls_back_an_append(history):
+    before = read_bytes()
+    scraper.PersistJournal(scraper.journaled_append_paths())
+    scraper.append_binary_snapshot([("tracked", tracked(400, Ally=3.7))])
+    # The run dies after the append but before committing
+    scraper.recover_journal()
+    assert read_bytes() == before
+
+
+def test_journal_rolls_back_a_torn_append(history):
+    before = read_bytes()
+    scraper.PersistJournal(scraper.journaled_append_paths())
+    with open(BIN, 'ab') as f:
+        f.write(b'\x90\x01\x00\x00\x00\x00\x00\x00\x00')
+    scraper.recover_journal()
+    assert read_bytes() == before
+
+
+def test_rollback_keeps_new_names_but_drops_their_records(history):
+    names, records = scraper.open_binary_history()
+    records = records.tobytes()
+    scraper.PersistJournal(scraper.journaled_append_paths())
+    scraper.append_binary_snapshot([("market", market(400, {"Newcomer Bank": 5.0}))])
+    scraper.recover_journal()
+    # Names are published in place in the header, so they stay registered (with no records) after a rollback
+    rolled_back_names, rolled_back_records = scraper.open_binary_history()
+    assert rolled_back_names == names + ["Newcomer Bank"]
+    assert rolled_back_records.tobytes() == records
+
+
+def test_journal_rolls_back_a_staged_rewrite(history):
+    before = read_bytes()
+    journal = scraper.PersistJournal(scraper.journaled_append_paths())
+    scraper.append_binary_snapshot([("market", market(400, {f"Bank {i:03d}": 4.0 for i in range(300)}))], journal)
+    assert read_bytes() == before
+    journal.rollback()
+    assert read_bytes() == before
+    assert not os.path.exists(scraper.JOURNAL_FILE)
+
+
+def test_committed_rewrite_is_installed(history):
+    history, market_history = history
+    banks = {f"Bank {i:03d}": 4.0 for i in range(300)}
+    with scraper.PersistJournal(scraper.journaled_append_paths()) as journal:
+        scraper.append_binary_snapshot([("market", market(400, banks))], journal)
+    assert rows(scraper.binary_rate_matrix("market")) == expected_rows(market_history + [market(400, banks)], "banks")
+
+
+def test_long_and_multibyte_names(data_dir):
+    prefix = "First Community Bank and Trust of the Greater Metropolitan Area, "
+    long_names = [prefix + "Savings Division", prefix + "Online Division"]
+    multibyte = "Banco Popular de Puerto Rico — Cuenta de Ahorros en Línea Ñandú €€€"
+    names = long_names + [multibyte, "Ally"]
+    scraper.append_log_record(scraper.HISTORY_LOG_FILE, tracked(100, **{name: 4.0 + i / 10 for i, name in enumerate(names)}))
+    scraper.convert_history_to_binary()
+    stored = [scraper.binary_bank_name(name) for name in names]
+    assert all(len(name.encode('utf-8')) <= scraper.BINARY_NAME_SIZE for name in stored)
+    assert len(set(stored)) == len(names)
+    assert stored[-1] == "Ally"
+    assert stored[2].startswith("Banco Popular")
+    stored_names, _ = scraper.open_binary_history()
+    assert sorted(stored_names) == sorted(stored)
+    assert rows(scraper.binary_rate_matrix("tracked")) == [
+        (100, {scraper.binary_bank_name(name): 4.0 + i / 10 for i, name in enumerate(names)})]
@@ -0,0 +1,107 @@
+import os
+import random
+
+import pytest
+
+import scraper
+
+LOG = scraper.MARKET_RATES_LOG_FILE
+
+
+def market_snapshots(count=70, seed=7):
+    """Market snapshots with small drifts, removals, re-listings, one empty market and one mostly-changed one."""
+    rng = random.Random(seed)
+    banks = {f"Bank {i}": round(3.5 + i / 100, 2) for i in range(20)}
+    snapshots = []
+    for i in range(count):
+        banks = dict(banks)
+        if i == 25:
+            banks = {}
+        elif i == 26:
+            banks = {f"Bank {n}": 4.0 for n in range(20)}
+        elif i == 40:
+            banks = {bank: round(rate + 0.25, 2) for bank, rate in banks.items()}
+        else:
+            for bank in rng.sample(sorted(banks), min(2, len(banks))):
+                banks[bank] = round(banks[bank] + rng.choice((-0.05, 0.05)), 2)
+            if i % 9 == 4:
+                banks.pop(rng.choice(sorted(banks)))
+            if i % 11 == 6:
+                banks[f"New Bank {i}"] = 4.1
+        snapshots.append({"ts": 1700000000 + i * 86400, "date": f"day {i}", "banks": banks})
+    return snapshots
+
+
+@pytest.fixture
+def market(data_dir):
+    snapshots = market_snapshots()
+    for snapshot in snapshots:
+        scraper.append_market_snapshot(snapshot)
+    return snapshots
+
+
+def log_records():
+    return scraper.read_log_records(LOG)
+
+
+def test_round_trip(market):
+    assert scraper.read_market_log() == market
+
+
+def test_log_mostly_holds_deltas(market):
+    records = log_records()
+    assert records[0]["banks"] == market[0]["banks"]
+    deltas = [record for record in records if "banks" not in record]
+    assert len(deltas) > len(records) / 2
+    assert any(record.get("removed") for record in deltas)
+
+
+def test_keyframes_are_spaced_by_the_interval(market):
+    keyframes = [i for i, record in enumerate(log_records()) if "banks" in record]
+    gaps = [b - a for a, b in zip(keyframes, keyframes[1:])] + [len(market) - keyframes[-1]]
+    assert keyframes[0] == 0
+    assert max(gaps) <= scraper.MARKET_KEYFRAME_INTERVAL
+
+
+def test_mostly_changed_snapshot_is_a_keyframe(market):
+    records = log_records()
+    assert "banks" in records[26]
+    assert "banks" in records[40]
+
+
+@pytest.mark.parametrize("last", [1, 5, 31, 100])
+def test_last_window_replays_from_the_keyframe(market, last):
+    assert scraper.read_market_log(last=last) == market[-last:]
+
+
+@pytest.mark.parametrize("start", [3, 27, 45, 69])
+def test_since_window_starting_mid_delta(market, start):
+    assert "banks" not in log_records()[start]
+    assert scraper.read_market_log(since=market[start]["ts"]) == market[start:]
+    assert scraper.read_market_log(since=market[start]["ts"] - 1) == market[start:]
+
+
+def test_compaction_matches_encoding(market):
+    scraper._write_log(LOG, market)
+    scraper.compact_market_history()
+    assert log_records() == scraper.encode_market_snapshots(market)
+    assert scraper.read_market_log() == market
+    assert scraper.read_market_log(last=5) == market[-5:]
+
+
+def test_decode_inverts_encode():
+    snapshots = market_snapshots(count=90, seed=3)
+    assert scraper.decode_market_records(scraper.encode_market_snapshots(snapshots)) == snapshots
+
+
+def test_journal_rolls_back_a_partial_delta(market):
+    size = os.path.getsize(LOG)
+    scraper.PersistJournal(scraper.journaled_append_paths())
+    with open(LOG, 'ab') as f:
+        f.write(b'{"ts": 1800000000, "date": "day 70", "chan')
+    scraper.recover_journal()
+    assert os.path.getsize(LOG) == size
+    assert scraper.read_market_log(last=3) == market[-3:]
+    following = {"ts": 1800000000, "date": "day 70", "banks": dict(market[-1]["banks"], **{"Bank 1": 5.0})}
+    scraper.append_market_snapshot(following)
+    assert scraper.read_market_log(last=2) == [market[-1], following]
@@ -0,0 +1,123 @@
+import json
+import os
+
+import pytest
+
+import scraper
+
+LOG = scraper.HISTORY_LOG_FILE
+
+
+def snapshot(ts):
+    return {"ts": ts, "date": f"label {ts}", "rates": {"Ally": 3.8, "Marcus": round(3.6 + ts / 10000, 4)}}
+
+
+def read_offsets(path):
+    with open(scraper._log_index_path(path), 'rb') as f:
+        data = f.read()
+    return [scraper.LOG_OFFSET.unpack_from(data, i)[0] for i in range(0, len(data), scraper.LOG_OFFSET.size)]
+
+
+def line_offsets(path):
+    offsets, offset = [], 0
+    with open(path, 'rb') as f:
+        for line in f:
+            offsets.append(offset)
+            offset += len(line)
+    return offsets
+
+
+@pytest.fixture
+def log(data_dir):
+    entries = [snapshot(ts) for ts in (100, 200, 300, 400, 500)]
+    for entry in entries:
+        scraper.append_log_record(LOG, entry)
+    return entries
+
+
+def test_round_trip(log):
+    assert scraper.read_log_records(LOG) == log
+    assert scraper.count_log_records(LOG) == len(log)
+
+
+@pytest.mark.parametrize("last, since, expected", [
+    (2, None, [400, 500]),
+    (10, None, [100, 200, 300, 400, 500]),
+    (None, 250, [300, 400, 500]),
+    (None, 300, [300, 400, 500]),
+    (None, 501, []),
+    (3, 450, [500]),
+])
+def test_windowed_reads(log, last, since, expected):
+    assert [record["ts"] for record in scraper.read_log_records(LOG, last=last, since=since)] == expected
+
+
+def test_index_points_at_each_line(log):
+    assert read_offsets(LOG) == line_offsets(LOG)
+
+
+def test_write_log_replaces_log_and_index(log):
+    scraper._write_log(LOG, log[:2])
+    assert scraper.read_log_records(LOG) == log[:2]
+    assert read_offsets(LOG) == line_offsets(LOG)
+
+
+def test_torn_final_line_is_dropped(log):
+    # A crash part-way through writing a line leaves it without its newline (and without an index entry)
+    with open(LOG, 'ab') as f:
+        f.write(b'{"ts": 600, "date": "lab')
+    assert scraper.read_log_records(LOG) == log
+    scraper.append_log_record(LOG, snapshot(600))
+    assert scraper.read_log_records(LOG) == log + [snapshot(600)]
+    assert read_offsets(LOG) == line_offsets(LOG)
+
+
+def test_append_interrupted_before_index_is_reindexed(log):
+    # The line reached the log but the process died before its offset reached the index
+    with open(LOG, 'ab') as f:
+        f.write((json.dumps(snapshot(600)) + '\n').encode('utf-8'))
+    assert scraper.read_log_records(LOG, last=1) == [snapshot(600)]
+    assert read_offsets(LOG) == line_offsets(LOG)
+
+
+def test_uncommitted_journal_rolls_appends_back(log):
+    size = os.path.getsize(LOG)
+    scraper.PersistJournal(scraper.journaled_append_paths())
+    scraper.append_log_record(LOG, snapshot(600))
+    scraper.append_log_record(scraper.OBSERVATIONS_LOG_FILE, {"ts": 600, "observations": []})
+    # The run dies here, before committing: the next start rolls its appends back
+    scraper.recover_journal()
+    assert os.path.getsize(LOG) == size
+    assert scraper.read_log_records(LOG) == log
+    assert read_offsets(LOG) == line_offsets(LOG)
+    assert not os.path.exists(scraper.OBSERVATIONS_LOG_FILE)
+    assert not os.path.exists(scraper.JOURNAL_FILE)
+
+
+def test_journal_rolls_back_a_torn_append(log):
+    size = os.path.getsize(LOG)
+    scraper.PersistJournal(scraper.journaled_append_paths())
+    with open(LOG, 'ab') as f:
+        f.write(b'{"ts": 600, "da')
+    scraper.recover_journal()
+    assert os.path.getsize(LOG) == size
+    assert scraper.read_log_records(LOG) == log
+
+
+def test_committed_journal_is_finished_on_recovery(log, monkeypatch):
+    journal = scraper.PersistJournal(scraper.journaled_append_paths())
+    scraper.append_log_record(LOG, snapshot(600))
+    journal.write_json(scraper.LAST_RATES_FILE, {"Ally": 3.9})
+
+    def crash(staged):
+        raise OSError("killed while renaming staged files")
+
+    # The journal is marked committed, then the process dies before the staged file is renamed into place
+    with monkeypatch.context() as patch:
+        patch.setattr(scraper, "_roll_forward", crash)
+        with pytest.raises(OSError):
+            journal.commit()
+    scraper.recover_journal()
+    assert scraper.load_json_file(scraper.LAST_RATES_FILE, {}) == {"Ally": 3.9}
+    assert scraper.read_log_records(LOG) == log + [snapshot(600)]
+    assert not os.path.exists(scraper.JOURNAL_FILE)